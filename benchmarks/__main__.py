@@ -0,0 +1,191 @@
+"""
+Benchmarks the checker against synthetic environments.
+
+    python -m benchmarks --packages 2000 --edges 8 --output results.json
+    python -m benchmarks --baseline results.json
+"""
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import timeit
+
+from benchmarks.environment import EnvironmentConfig, generate_environment
+from pipconflictchecker.checker import Checker, format_conflicts, Validator
+from pipconflictchecker.distributions import DistInfoSource
+from pipconflictchecker.snapshot import EnvironmentSnapshot
+from pipconflictchecker.versions import version_cache
+
+# Bumped whenever the layout of the results file changes
+RESULTS_FORMAT_VERSION = 1
+
+# Phases in the order they run
+PHASES = ('scan', 'requirements', 'validation', 'reporting', 'validator')
+
+# Slowdowns smaller than this are timer noise and never count as a regression
+MIN_REGRESSION_SECONDS = 0.001
+
+
+def run_once(site_packages, validator_cases):
+    """
+    Runs every phase once against a fresh checker and returns the timings and counts
+    """
+    version_cache.clear()
+    timings = {}
+    timer = timeit.default_timer
+
+    # Find the distributions
+    start = timer()
+    distributions = DistInfoSource([site_packages]).get_distributions()
+    timings['scan'] = timer() - start
+
+    # Read the requirements of every distribution
+    start = timer()
+    snapshot = EnvironmentSnapshot.from_distributions(distributions)
+    timings['requirements'] = timer() - start
+
+    # Validate every edge
+    checker = Checker()
+    checker.snapshot = snapshot
+    start = timer()
+    conflicts = checker.get_conflicts()
+    timings['validation'] = timer() - start
+
+    # Build the report
+    start = timer()
+    format_conflicts(conflicts)
+    timings['reporting'] = timer() - start
+
+    # Validate edges one Validator at a time without any caching
+    start = timer()
+    for installed_version, specs in validator_cases:
+        Validator(installed_version, specs).is_valid()
+    timings['validator'] = timer() - start
+
+    counts = {
+        'distributions': len(distributions),
+        'edges': sum(len(requirements) for requirements in snapshot.requirements.values()),
+        'conflicts': len(conflicts),
+        'validator_cases': len(validator_cases),
+    }
+    return timings, counts
+
+
+def get_validator_cases(site_packages):
+    """
+    Returns the (installed version, specs) pairs of every edge in the environment
+    """
+    snapshot = EnvironmentSnapshot.from_distributions(DistInfoSource([site_packages]).get_distributions())
+    installed_versions = snapshot.get_installed_versions()
+    return [
+        (installed_versions[project_name], list(specs))
+        for project_name, requirements in snapshot.get_requirement_versions().items()
+        if project_name in installed_versions
+        for specs in requirements.values()
+    ]
+
+
+def run(config, repeat):
+    """
+    Generates the environment and returns the results of the best of repeat runs
+    """
+    directory = tempfile.mkdtemp(prefix='pipconflictchecker-bench-')
+    try:
+        generate_environment(directory, config)
+        validator_cases = get_validator_cases(directory)
+        runs = [run_once(directory, validator_cases) for _ in range(repeat)]
+    finally:
+        shutil.rmtree(directory)
+
+    return {
+        'version': RESULTS_FORMAT_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': config.to_dict(),
+        'repeat': repeat,
+        'counts': runs[0][1],
+        'timings': dict(
+            (phase, min(timings[phase] for timings, _ in runs))
+            for phase in PHASES
+        ),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints how each phase compares to the baseline and returns the phases that regressed
+    """
+    regressions = []
+    for phase in PHASES:
+        before = baseline['timings'].get(phase)
+        after = results['timings'][phase]
+        if not before:
+            continue
+        ratio = after / before
+        print(' {0:<14}{1:>10.2f}ms{2:>10.2f}ms{3:>8.2f}x'.format(phase, before * 1000, after * 1000, ratio))
+        if ratio > threshold and after - before > MIN_REGRESSION_SECONDS:
+            regressions.append(phase)
+    return regressions
+
+
+def get_argument_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmarks pipconflictchecker.')
+    parser.add_argument('--packages', type=int, default=500, help='Number of installed packages')
+    parser.add_argument('--edges', type=int, default=5, help='Requirements declared by each package')
+    parser.add_argument('--spec-complexity', type=int, default=2, help='Specs in each requirement')
+    parser.add_argument('--conflict-ratio', type=float, default=0.01, help='Fraction of requirements that conflict')
+    parser.add_argument('--metadata-size', type=int, default=0, help='Bytes of long description in each METADATA')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the environment generator')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs to take the best timing from')
+    parser.add_argument('--output', metavar='PATH', help='Write the results as JSON')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare against results written by --output')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=1.25,
+        help='Slowdown against the baseline that counts as a regression (default: %(default)s)'
+    )
+    return parser
+
+
+def main(args=None):
+    options = get_argument_parser().parse_args(args)
+    config = EnvironmentConfig(
+        packages=options.packages,
+        edges=options.edges,
+        spec_complexity=options.spec_complexity,
+        conflict_ratio=options.conflict_ratio,
+        metadata_size=options.metadata_size,
+        seed=options.seed,
+    )
+    results = run(config, max(options.repeat, 1))
+
+    # Print the results
+    print('Counts: {0}'.format(', '.join('{0}={1}'.format(*item) for item in sorted(results['counts'].items()))))
+    for phase in PHASES:
+        print(' {0:<14}{1:>10.2f}ms'.format(phase, results['timings'][phase] * 1000))
+
+    if options.output:
+        with open(options.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+
+    # Compare against the baseline
+    if options.baseline:
+        with open(options.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        print('Compared to {0}:'.format(options.baseline))
+        regressions = compare(results, baseline, options.threshold)
+        if regressions:
+            print('Regressed: {0}'.format(', '.join(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
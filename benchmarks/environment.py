@@ -0,0 +1,106 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import os
+import random
+
+# Text repeated to pad the long description of each package
+DESCRIPTION_LINE = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt.\n'
+
+
+class EnvironmentConfig(object):
+    """
+    Class that contains the size knobs of a synthetic environment
+    """
+    def __init__(self, packages=500, edges=5, spec_complexity=2, conflict_ratio=0.01, metadata_size=0, seed=0):
+        super(EnvironmentConfig, self).__init__()
+        self.packages = packages
+        self.edges = edges
+        self.spec_complexity = spec_complexity
+        self.conflict_ratio = conflict_ratio
+        self.metadata_size = metadata_size
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def get_project_name(index):
+    return 'bench-package-{0:05d}'.format(index)
+
+
+def get_specs(rng, version, complexity, conflict):
+    """
+    Returns a list of specs for a requirement on a project installed at version, where a conflicting
+    requirement never allows the installed version
+    """
+    major, minor, patch = version
+    specs = []
+    if conflict:
+        specs.append(('>=', '{0}.0'.format(major + 1)))
+    else:
+        specs.append(('>=', '{0}.0'.format(major)))
+
+    # Add more bounds that all allow the installed version
+    extra_specs = [
+        ('<', '{0}.0'.format(major + 1)),
+        ('!=', '{0}.{1}.{2}'.format(major, minor, patch + 1)),
+        ('>', '{0}.{1}'.format(major - 1, minor)),
+        ('<=', '{0}.{1}.{2}'.format(major, minor + 1, patch)),
+    ]
+    rng.shuffle(extra_specs)
+    specs.extend(extra_specs[:max(complexity - 1, 0)])
+    return specs
+
+
+def generate_environment(directory, config):
+    """
+    Writes a site-packages style directory of dist-info entries described by the config and returns
+    the number of requirement edges written
+    """
+    rng = random.Random(config.seed)
+    versions = [
+        (rng.randint(1, 9), rng.randint(0, 20), rng.randint(0, 20))
+        for _ in range(config.packages)
+    ]
+    description = ''
+    if config.metadata_size:
+        description = DESCRIPTION_LINE * (config.metadata_size // len(DESCRIPTION_LINE) + 1)
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    edge_count = 0
+    for index in range(config.packages):
+        project_name = get_project_name(index)
+        version = '{0}.{1}.{2}'.format(*versions[index])
+        lines = [
+            'Metadata-Version: 2.1',
+            'Name: {0}'.format(project_name),
+            'Version: {0}'.format(version),
+        ]
+
+        # Pick the projects this one requires
+        others = [other for other in range(config.packages) if other != index]
+        for other in rng.sample(others, min(config.edges, len(others))):
+            specs = get_specs(
+                rng,
+                versions[other],
+                config.spec_complexity,
+                rng.random() < config.conflict_ratio
+            )
+            lines.append('Requires-Dist: {0} ({1})'.format(
+                get_project_name(other),
+                ','.join('{0}{1}'.format(*spec) for spec in specs)
+            ))
+            edge_count += 1
+
+        # Write the metadata
+        dist_info = os.path.join(directory, '{0}-{1}.dist-info'.format(project_name.replace('-', '_'), version))
+        os.makedirs(dist_info)
+        with io.open(os.path.join(dist_info, 'METADATA'), 'w', encoding='utf-8') as metadata_file:
+            metadata_file.write('\n'.join(lines) + '\n\n' + description)
+
+    # Return the edge count
+    return edge_count
@@ -0,0 +1,197 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+# The numpy module, False until it is first needed and None when it is not installed
+_numpy = False
+
+# Smallest number of new edges that is worth importing NumPy and building arrays for
+MIN_BATCH_SIZE = 256
+
+# Number of release segments in an encoded version, longer releases are not encoded
+RELEASE_WIDTH = 8
+
+# Largest release segment that is encoded, so the difference of any two segments fits in an int64
+MAX_SEGMENT = 2 ** 62
+
+# Encoding of a missing bound, which is masked out
+EMPTY_CODE = (0,) * RELEASE_WIDTH
+
+
+def get_numpy():
+    """
+    Returns the numpy module or None if it is not installed, importing it on first use so importing the checker
+    stays fast
+    """
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy as _numpy
+        except ImportError:  # pragma: no cover
+            # NumPy is optional, every edge is validated by the scalar path without it
+            _numpy = None
+    return _numpy
+
+
+def encode_version(parsed_version):
+    """
+    Returns a final release version as a tuple of RELEASE_WIDTH integers that sorts like the version, padding the
+    release with zeros, or None if the version has an epoch, pre, post, dev or local part or cannot be encoded
+    """
+    release = getattr(parsed_version, 'release', None)
+    if not release or len(release) > RELEASE_WIDTH or max(release) > MAX_SEGMENT:
+        return None
+    if parsed_version.epoch or any(
+        part is not None
+        for part in (parsed_version.pre, parsed_version.post, parsed_version.dev, parsed_version.local)
+    ):
+        return None
+    return tuple(release) + (0,) * (RELEASE_WIDTH - len(release))
+
+
+class VersionTable(object):
+    """
+    Class that numbers the distinct versions of a batch and ranks their encodings, so comparing two versions
+    becomes comparing two integers. Index 0 stands for a missing bound.
+    """
+    def __init__(self):
+        super(VersionTable, self).__init__()
+
+        # parsed version => index of its encoding or None if it cannot be encoded
+        self.indexes = {}
+        self.codes = [EMPTY_CODE]
+
+    def get_index(self, parsed_version):
+        """
+        Returns the index of a version, encoding each distinct version only once, or None if it cannot be encoded
+        """
+        try:
+            return self.indexes[parsed_version]
+        except KeyError:
+            pass
+
+        code = encode_version(parsed_version)
+        index = None
+        if code is not None:
+            index = len(self.codes)
+            self.codes.append(code)
+        self.indexes[parsed_version] = index
+        return index
+
+    def get_ranks(self, numpy):
+        """
+        Returns an array of the rank of every encoding in version order, where equal versions share a rank
+        """
+        codes = numpy.array(self.codes, dtype=numpy.int64)
+        order = numpy.lexsort(codes.T[::-1])
+        sorted_codes = codes[order]
+        changes = numpy.any(sorted_codes[1:] != sorted_codes[:-1], axis=1)
+        ranks = numpy.empty(len(codes), dtype=numpy.int64)
+        ranks[order] = numpy.concatenate([[0], numpy.cumsum(changes)])
+        return ranks
+
+
+class IntervalTable(object):
+    """
+    Class that holds the bounds of the intervals of every distinct compiled spec of a batch as columns
+    """
+    def __init__(self, versions):
+        super(IntervalTable, self).__init__()
+        self.versions = versions
+
+        # id of a compiled spec => (first row, number of rows) or None if one of its bounds cannot be encoded
+        self.spans = {}
+        self.lower = []
+        self.lower_inclusive = []
+        self.upper = []
+        self.upper_inclusive = []
+
+    def get_span(self, compiled_spec):
+        """
+        Returns the (first row, number of rows) of the intervals of a compiled spec, adding them on first use, or
+        None if one of its bounds cannot be encoded
+        """
+        key = id(compiled_spec)
+        if key in self.spans:
+            return self.spans[key]
+
+        bounds = []
+        for interval in compiled_spec.intervals:
+            lower = self.versions.get_index(interval.lower) if interval.lower is not None else 0
+            upper = self.versions.get_index(interval.upper) if interval.upper is not None else 0
+            if lower is None or upper is None:
+                bounds = None
+                break
+            bounds.append((lower, interval.lower_inclusive, upper, interval.upper_inclusive))
+
+        span = None
+        if bounds is not None:
+            span = (len(self.lower), len(bounds))
+            for lower, lower_inclusive, upper, upper_inclusive in bounds:
+                self.lower.append(lower)
+                self.lower_inclusive.append(lower_inclusive)
+                self.upper.append(upper)
+                self.upper_inclusive.append(upper_inclusive)
+        self.spans[key] = span
+        return span
+
+
+def batch_in_ranges(pairs):
+    """
+    Determines for every (parsed installed version, compiled spec) pair if the version is in one of the ranges of
+    the spec, comparing the versions against every interval bound at once with NumPy. The result of a pair is None
+    when NumPy is missing, there are too few pairs to be worth it or one of its versions cannot be encoded, so it
+    has to be checked by the scalar path.
+    """
+    results = [None] * len(pairs)
+    if len(pairs) < MIN_BATCH_SIZE:
+        return results
+    numpy = get_numpy()
+    if numpy is None:
+        return results
+
+    # Number the versions and intervals of every pair that can be encoded
+    versions = VersionTable()
+    intervals = IntervalTable(versions)
+    batched = []
+    installed = []
+    starts = []
+    counts = []
+    for index, (parsed_version, compiled_spec) in enumerate(pairs):
+        if not compiled_spec.ranges:
+            results[index] = True
+            continue
+        installed_index = versions.get_index(parsed_version)
+        span = intervals.get_span(compiled_spec) if installed_index is not None else None
+        if span is None:
+            continue
+        batched.append(index)
+        installed.append(installed_index)
+        starts.append(span[0])
+        counts.append(span[1])
+    if not batched:
+        return results
+
+    # Expand the pairs into one row for each of their intervals
+    ranks = versions.get_ranks(numpy)
+    counts = numpy.array(counts, dtype=numpy.int64)
+    row_pairs = numpy.repeat(numpy.arange(len(batched)), counts)
+    row_offsets = numpy.arange(len(row_pairs)) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+    row_intervals = numpy.repeat(numpy.array(starts, dtype=numpy.int64), counts) + row_offsets
+
+    # Compare the rank of every installed version with the ranks of the bounds of its intervals
+    lower = numpy.array(intervals.lower, dtype=numpy.int64)[row_intervals]
+    upper = numpy.array(intervals.upper, dtype=numpy.int64)[row_intervals]
+    lower_inclusive = numpy.array(intervals.lower_inclusive, dtype=bool)[row_intervals]
+    upper_inclusive = numpy.array(intervals.upper_inclusive, dtype=bool)[row_intervals]
+    installed_ranks = ranks[numpy.array(installed, dtype=numpy.int64)][row_pairs]
+    lower_ranks = ranks[lower]
+    upper_ranks = ranks[upper]
+    above_lower = (lower == 0) | (installed_ranks > lower_ranks) | ((installed_ranks == lower_ranks) & lower_inclusive)
+    below_upper = (upper == 0) | (installed_ranks < upper_ranks) | ((installed_ranks == upper_ranks) & upper_inclusive)
+
+    # A pair is in its ranges when any of its disjoint intervals contains the version
+    contained = numpy.zeros(len(batched), dtype=bool)
+    contained[row_pairs[above_lower & below_upper]] = True
+    for index, is_contained in zip(batched, contained.tolist()):
+        results[index] = is_contained
+    return results
@@ -0,0 +1,146 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import threading
+
+from pipconflictchecker.distributions import get_metadata_directory, InstalledDistribution
+from pipconflictchecker.metadata import dump_requirement, load_requirement
+from pipconflictchecker.snapshot import read_distribution
+from pipconflictchecker.store import load_entries, save_entries
+
+# Bumped whenever the layout of the cache entries changes
+CACHE_FORMAT_VERSION = 3
+
+# Files that hold the metadata inside a dist-info or egg-info directory
+METADATA_FILE_NAMES = ('METADATA', 'PKG-INFO')
+
+
+def get_default_cache_path():
+    """
+    Returns the default location of the metadata cache file
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'pipconflictchecker', 'metadata.json')
+
+
+def get_metadata_path(dist):
+    """
+    Returns the path of the file holding a distribution's metadata or None if it is not on disk
+    """
+    egg_info = getattr(dist, 'egg_info', None)
+    if not egg_info:
+        return None
+    egg_info = get_metadata_directory(egg_info)
+
+    # Egg-info can be a single file, otherwise look for the metadata file inside the directory
+    if not os.path.isdir(egg_info):
+        return egg_info
+    for file_name in METADATA_FILE_NAMES:
+        path = os.path.join(egg_info, file_name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def get_stat_key(dist):
+    """
+    Returns the [mtime, size] of the metadata file of a distribution followed by those of the requires.txt next to
+    an egg-info PKG-INFO, or None if the metadata is not on disk
+    """
+    metadata_path = get_metadata_path(dist)
+    if not metadata_path:
+        return None
+    paths = [metadata_path]
+    requires_path = os.path.join(os.path.dirname(metadata_path), 'requires.txt')
+    if os.path.basename(metadata_path) == 'PKG-INFO' and os.path.isfile(requires_path):
+        paths.append(requires_path)
+
+    stat_key = []
+    try:
+        for path in paths:
+            stat = os.stat(path)
+            stat_key.extend([stat.st_mtime, stat.st_size])
+    except OSError:
+        return None
+    return stat_key
+
+
+class MetadataCache(object):
+    """
+    Class that persists the parsed metadata of each distribution keyed on the metadata path and the mtime and size
+    of its metadata files. Requirements are kept with their markers, which are evaluated whenever an entry is
+    used, so interpreters that share a site-packages directory and a cache each get their own requirements.
+    """
+    def __init__(self, path=None):
+        super(MetadataCache, self).__init__()
+        self.path = path or get_default_cache_path()
+
+        # metadata path => dict of the stat key and the name, version and requirements of the metadata
+        self.entries = {}
+
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+        # Distributions can be read from several threads at once
+        self.lock = threading.Lock()
+
+    def load(self):
+        """
+        Loads the cache file, starting empty if it is missing, unreadable or from another format version
+        """
+        self.entries = load_entries(self.path, CACHE_FORMAT_VERSION)
+        return self
+
+    def save(self):
+        """
+        Writes the cache file if anything changed, dropping entries whose metadata no longer exists
+        """
+        if not self.dirty:
+            return
+
+        self.entries = dict(
+            (path, entry) for path, entry in self.entries.items()
+            if os.path.exists(path)
+        )
+        save_entries(self.path, CACHE_FORMAT_VERSION, self.entries)
+        self.dirty = False
+
+    def read_distribution(self, dist):
+        """
+        Returns the same tuple as read_distribution, only parsing the metadata when one of its files changed
+        """
+        # Only distributions that read their own metadata files can be cached
+        stat_key = get_stat_key(dist) if isinstance(dist, InstalledDistribution) else None
+        if stat_key is None:
+            return read_distribution(dist)
+
+        # Check for an entry that still matches the metadata files
+        metadata_path = get_metadata_path(dist)
+        entry = self.entries.get(metadata_path)
+        if entry and entry['stat'] == stat_key:
+            with self.lock:
+                self.hits += 1
+            dist.set_metadata((
+                entry['name'],
+                entry['version'],
+                [load_requirement(data) for data in entry['requirements']]
+            ))
+            return read_distribution(dist)
+
+        # Parse the metadata and remember it
+        name, version, requirements = dist.get_metadata()
+        entry = {
+            'stat': stat_key,
+            'name': name,
+            'version': version,
+            'requirements': [dump_requirement(requirement) for requirement in requirements],
+        }
+        with self.lock:
+            self.misses += 1
+            self.entries[metadata_path] = entry
+            self.dirty = True
+
+        # Return the metadata with the markers that apply
+        return read_distribution(dist)
@@ -1,16 +1,34 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
-from pkg_resources import parse_version
-
-try:
-    from pip import get_installed_distributions  # pragma: no cover
-except ImportError:  # pragma: no cover
-    # pip >= 10.0.0
-    from pkg_resources import working_set  # pragma: no cover
-
-    def get_installed_distributions():  # pragma: no cover
-        return working_set
+import argparse
+import os
+import sys
+from collections import OrderedDict
+
+from pipconflictchecker.batch import batch_in_ranges
+from pipconflictchecker.cache import get_default_cache_path, MetadataCache
+from pipconflictchecker.constraints import ConstraintAnalyzer
+from pipconflictchecker.diff import diff_snapshots, get_readable_specs
+from pipconflictchecker.distributions import (
+    DISTRIBUTION_SOURCES, DistributionSource, get_distribution_source, get_installed_distributions
+)
+from pipconflictchecker.explain import DependencyPaths
+from pipconflictchecker.graph import DependencyGraph
+from pipconflictchecker.interpreter import InterpreterSource
+from pipconflictchecker.lockfile import LockfileSource
+from pipconflictchecker.parallel import thread_imap
+from pipconflictchecker.snapshot import EnvironmentSnapshot, read_distribution
+from pipconflictchecker.specs import CompiledSpec
+from pipconflictchecker.stats import format_stats, profile_call, Stats
+from pipconflictchecker.store import save_quietly
+from pipconflictchecker.suggest import VersionSuggester
+from pipconflictchecker.versions import parse_version, version_cache
+from pipconflictchecker.wheelhouse import INDEX_FILE_NAME, Wheelhouse, WheelhouseSource
+
+
+# Options that each pick an environment other than this interpreter's, at most one of which can be given
+ENVIRONMENT_OPTIONS = ('python', 'snapshot_in', 'wheelhouse')
 
 
 class Conflict(object):
@@ -39,7 +57,14 @@ class Validator(object):
     def __init__(self, installed_version, required_version_specs):
         super(Validator, self).__init__()
         self.installed_version = installed_version
-        self.required_version_specs = sorted(required_version_specs, key=lambda spec: parse_version(spec[1]))
+        self.parsed_installed_version = parse_version(installed_version)
+
+        # Accept either a compiled spec or any list of specs
+        if isinstance(required_version_specs, CompiledSpec):
+            self.compiled_spec = required_version_specs
+        else:
+            self.compiled_spec = CompiledSpec(required_version_specs)
+        self.required_version_specs = list(self.compiled_spec.specs)
 
     def is_valid(self):
         """
@@ -63,241 +88,831 @@ class Validator(object):
         """
         Determine if the installed version is in one of the required ranges
         """
-        # Get the ranges
-        ranges = self.get_required_version_ranges()
-
-        # If there are no ranges return true
-        if not len(ranges):
-            return True
-
-        # Set the default to false
-        in_ranges = False
-
-        # Keep a list of the results for determining if a version is within a range
-        results = []
-
-        # Loop over the ranges and determine if the installed version is in this range
-        for spec_range in ranges:
-            spec_results = []
-            for spec in spec_range:
-                if spec is not None:
-                    conditional = 'parse_version(self.installed_version) {0} parse_version(spec[1])'.format(
-                        spec[0]
-                    )
-                    spec_results.append(eval(conditional))
-
-            # If any spec was false the overall range is false
-            if False in spec_results:
-                results.append(False)
-            else:
-                results.append(True)
-
-        # If the installed version is within any of the ranges, the overall result is true
-        if True in results:
-            in_ranges = True
-
-        # Return the result
-        return in_ranges
+        return self.compiled_spec.in_ranges(self.parsed_installed_version)
 
     def in_exacts(self):
         """
         Determine if the installed version matches one of the exact versions
         """
-        # Set the default response to false
-        in_exacts = False
-
-        # Loop over the specs and check for an exact match
-        exacts = self.get_required_version_exacts()
-        for spec in exacts:
-            if spec[1] == self.installed_version:
-                in_exacts = True
-
-        # Return the response
-        return in_exacts
+        return self.compiled_spec.in_exacts(self.installed_version)
 
     def in_excludes(self):
         """
         Determine if the installed version matches one of the excluded versions
         """
-        # Set the default response to false
-        in_excludes = False
-
-        # Check installed version against the excluded versions
-        excludes = self.get_required_version_excludes()
-        for spec in excludes:
-            if spec[1] == self.installed_version:
-                in_excludes = True
-
-        # Return the response
-        return in_excludes
+        return self.compiled_spec.in_excludes(self.installed_version)
 
     def get_required_version_ranges(self):
         """
         Determines the ranges that a version has to exist within
         """
-        # List of all allowed ranges
-        ranges = []
-
-        # Keep track of the minimum required spec
-        min_spec = None
+        return list(self.compiled_spec.ranges)
 
-        # Keep track of the maximum required spec
-        max_spec = None
+    def get_required_version_exacts(self):
+        """
+        Returns a list of versions that must be exact
+        """
+        return [spec for spec in self.required_version_specs if spec.comparison == '==']
 
-        # Loop over all the required specs and calculate the ranges
-        for spec in self.required_version_specs:
-            comparison = spec[0]
+    def get_required_version_excludes(self):
+        """
+        Returns a list of versions that we need to exclude
+        """
+        return [spec for spec in self.required_version_specs if spec.comparison == '!=']
 
-            # Check if this should be the max
-            if comparison in ['<=', '<']:
-                max_spec = spec
 
-            # Check if this should be the min value
-            elif comparison in ['>=', '>']:
-                min_spec = spec
+class ValidationCache(object):
+    """
+    Class that remembers validation results keyed by installed version and frozen spec set. With batch set,
+    validate_all checks the ranges of new edges together with the batch engine.
+    """
+    def __init__(self, batch=False):
+        super(ValidationCache, self).__init__()
+        self.batch = batch
 
-            # Check if we have both a min and a max spec if so push it onto the ranges and reset
-            if min_spec and max_spec:
-                ranges.append((min_spec, max_spec))
-                min_spec = None
-                max_spec = None
+        # frozen spec set => compiled spec
+        self.compiled_specs = {}
 
-        # Add the last range if we need to
-        if min_spec or max_spec:
-            ranges.append((min_spec, max_spec))
+        # (installed version, frozen spec set) => is valid
+        self.results = {}
 
-        # Return the ranges
-        return ranges
+        self.hits = 0
+        self.misses = 0
 
-    def get_required_version_exacts(self):
+    def get_compiled_spec(self, specs):
         """
-        Returns a list of versions that must be exact
+        Returns the compiled spec for a spec set, compiling each distinct set only once
+        """
+        frozen_specs = frozenset(specs)
+        compiled_spec = self.compiled_specs.get(frozen_specs)
+        if compiled_spec is None:
+            compiled_spec = CompiledSpec(frozen_specs)
+            self.compiled_specs[frozen_specs] = compiled_spec
+        return compiled_spec
+
+    def is_valid(self, installed_version, specs):
         """
-        # List of exact versions
-        exacts = []
+        Checks that the installed version is valid within the specs, only validating each distinct edge once
+        """
+        key = (installed_version, frozenset(specs))
+        try:
+            is_valid = self.results[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return is_valid
+
+        # Validate and remember the result
+        self.misses += 1
+        compiled_spec = self.get_compiled_spec(key[1])
+        validator = Validator(installed_version=installed_version, required_version_specs=compiled_spec)
+        is_valid = validator.is_valid()
+        self.results[key] = is_valid
 
-        # Loop over all the required specs get the exacts
-        for spec in self.required_version_specs:
-            comparison = spec[0]
+        # Return the result
+        return is_valid
 
-            # Check if the comparison is exact
-            if comparison == '==':
-                exacts.append(spec)
+    def validate_all(self, edges):
+        """
+        Checks a list of (installed version, specs) edges at once and returns whether each is valid. When batch is
+        set the ranges of every distinct new edge are checked together by the batch engine if NumPy is available,
+        and edges it cannot encode are validated one Validator at a time, so the results are always the same as
+        is_valid.
+        """
+        keys = [(installed_version, frozenset(specs)) for installed_version, specs in edges]
+        missing = [key for key in OrderedDict.fromkeys(keys) if key not in self.results]
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        # Check the ranges of the new edges together
+        compiled_specs = [self.get_compiled_spec(specs) for _, specs in missing]
+        in_ranges = [None] * len(missing)
+        if self.batch:
+            in_ranges = batch_in_ranges([
+                (parse_version(installed_version), compiled_spec)
+                for (installed_version, _), compiled_spec in zip(missing, compiled_specs)
+            ])
+        for key, compiled_spec, in_range in zip(missing, compiled_specs, in_ranges):
+            installed_version = key[0]
+            if in_range is None:
+                validator = Validator(installed_version=installed_version, required_version_specs=compiled_spec)
+                self.results[key] = validator.is_valid()
+            else:
+                in_exacts = compiled_spec.in_exacts(installed_version)
+                self.results[key] = (in_range or in_exacts) and not compiled_spec.in_excludes(installed_version)
 
-        # Return the exact versions
-        return exacts
+        # Return the results in the order of the edges
+        return [self.results[key] for key in keys]
 
-    def get_required_version_excludes(self):
+    def get_stats(self):
         """
-        Returns a list of versions that we need to exclude
+        Returns a dict of the cache counters
         """
-        # List of excluded versions
-        excluded = []
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.results),
+            'compiled_specs': len(self.compiled_specs),
+            'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+        }
 
-        # Loop over all the required specs get the exacts
-        for spec in self.required_version_specs:
-            comparison = spec[0]
 
-            # Check if the comparison is exact
-            if comparison == '!=':
-                excluded.append(spec)
+def get_ready_edges(snapshot, pending, project_key, added_edges):
+    """
+    Returns the (normalized name of the required project, requirer) edges whose ends are both known after a
+    distribution was added, including the edges of the extras it requests and the edges that were waiting for it,
+    and records the edges that still wait for their required project as pending
+    """
+    edges = []
+    for requirer, required_key in sorted(set(added_edges)):
+        if required_key in snapshot.installed_names:
+            edges.append((required_key, requirer))
+        else:
+            pending.setdefault(required_key, set()).add(requirer)
+    edges.extend((project_key, requirer) for requirer in sorted(pending.pop(project_key, ())))
+    return edges
 
-        # Return the excluded version specs
-        return excluded
+
+def may_gain_specs(snapshot, edge):
+    """
+    Returns True if an extra of the requirer that nothing requested yet requires the project of a (normalized name of
+    the required project, requirer) edge, so a distribution read later can still add specs to the edge
+    """
+    required_key, requirer = edge
+    active_extras = snapshot.active_extras.get(snapshot.get_name_key(requirer), ())
+    for extra, requirements in snapshot.extra_requirements.get(requirer, {}).items():
+        if extra in active_extras:
+            continue
+        if any(snapshot.get_name_key(project_name) == required_key for project_name, _ in requirements):
+            return True
+    return False
+
+
+def hold_back_edges(snapshot, edges, yielded, held):
+    """
+    Returns the edges that were not yielded yet and whose specs are settled, and adds the edges an extra can still
+    change to held, taking out those that are settled now
+    """
+    ready_edges = []
+    for edge in edges:
+        if edge in yielded:
+            continue
+        if may_gain_specs(snapshot, edge):
+            held.add(edge)
+        else:
+            held.discard(edge)
+            ready_edges.append(edge)
+    return ready_edges
 
 
 class Checker(object):
     """
-    Class that contains all the checker methods that find dependency conflicts
+    Class that contains all the checker methods that find dependency conflicts. With batch set, get_conflicts
+    validates its edges with the batch engine.
     """
-    def get_requirement_versions(self):
+    def __init__(self, cache_path=None, source=None, jobs=1, stats=None, batch=False):
+        super(Checker, self).__init__()
+        self.source = source
+        self.jobs = jobs
+        self.snapshot = None
+        self.validation_cache = ValidationCache(batch=batch)
+
+        # Optional on disk cache of distribution metadata
+        self.metadata_cache = MetadataCache(cache_path).load() if cache_path else None
+
+        # Phase timings and counters, the shared version cache is measured from this point on
+        self.stats = stats if stats is not None else Stats()
+        self.version_cache_start = (version_cache.hits, version_cache.misses, version_cache.parse_seconds)
+
+    def get_source(self):
         """
-        Returns a dictionary of project_name => dict of projects that requires it with lists of requirements
+        Returns the source of the distributions, creating the named or default source on first use so its warnings
+        can be read after the scan
         """
-        distributions = get_installed_distributions()
-        dist_requirements = {}
+        self.source = get_distribution_source(self.source)
+        return self.source
 
-        # Compute the dist requirements and versions
-        for dist in distributions:
-            dist_requirement_dict = dist_requirements.get(dist.project_name, {})
-            dist_requirements[dist.project_name] = dist_requirement_dict
-            for requirement in dist.requires():
-                dist_requirement_dict = dist_requirements.get(requirement.project_name, {})
-                dist_requirement_list = dist_requirement_dict.get(dist.project_name, set())
-                for spec in requirement.specs:
-                    dist_requirement_list.add(spec)
-                dist_requirement_dict[dist.project_name] = dist_requirement_list
-                dist_requirements[requirement.project_name] = dist_requirement_dict
+    def get_snapshot(self):
+        """
+        Returns the environment snapshot, scanning the installed distributions only on first use
+        """
+        if self.snapshot is None:
+            with self.stats.phase('enumerate_distributions'):
+                distributions = list(get_installed_distributions(self.get_source(), jobs=self.jobs))
+            with self.stats.phase('read_metadata'):
+                self.snapshot = EnvironmentSnapshot.from_distributions(
+                    distributions,
+                    metadata_cache=self.metadata_cache,
+                    jobs=self.jobs
+                )
+                self.save_metadata_cache()
+            self.stats.count('distributions_scanned', len(distributions))
+            self.stats.count('edges_built', sum(len(required) for required in self.snapshot.requirements.values()))
+        return self.snapshot
+
+    def get_reader(self):
+        """
+        Returns the function that reads the DistributionMetadata of a distribution, which goes through the metadata
+        cache when there is one
+        """
+        return self.metadata_cache.read_distribution if self.metadata_cache is not None else read_distribution
 
-        # Return the dict
-        return dist_requirements
+    def save_metadata_cache(self):
+        """
+        Persists the metadata cache, a cache that cannot be written never fails the check
+        """
+        if self.metadata_cache is not None:
+            save_quietly(self.metadata_cache)
+
+    def get_requirement_versions(self):
+        """
+        Returns a dictionary of project_name => dict of projects that requires it with lists of requirements
+        """
+        return self.get_snapshot().get_requirement_versions()
 
     def get_installed_versions(self):
         """
         Returns a dict of project_name => version installed
         """
-        distributions = get_installed_distributions()
-        dist_versions = {}
-
-        # Build the installed versions dict
-        for dist in distributions:
-            dist_versions[dist.project_name] = dist.version
-
-        # Return the dict
-        return dist_versions
+        return self.get_snapshot().get_installed_versions()
 
     def get_conflicts(self):
         """
         Checks the requirements against the installed projects to find any version conflicts
         """
-        requirement_versions = self.get_requirement_versions()
-        installed_versions = self.get_installed_versions()
-
-        # Gets around pep8 complaining about unused import
-        assert parse_version
-
-        # Find any requirement conflicts
-        conflicts = []
-        for project_name, requirements in requirement_versions.items():
-            # If this requirement is not in the installed versions, just continue
-            if project_name not in installed_versions:
-                continue
-
-            # Get the installed version
-            installed_version = installed_versions[project_name]
-
-            # Loop over the required dictionaries and determine if we have any dependency conflicts
-            for required_project_name, specs in requirements.items():
-                # Create a validator
-                validator = Validator(installed_version=installed_version, required_version_specs=specs)
-                if not validator.is_valid():
-                    conflicts.append(Conflict(**{
-                        'project_name': project_name,
-                        'required_project_name': required_project_name,
-                        'installed_version': installed_version,
-                        'specs': specs
-                    }))
+        with self.stats.phase('build_edges'):
+            requirement_versions = self.get_requirement_versions()
+            installed_versions = self.get_installed_versions()
+
+        # Collect every edge whose required project is installed
+        edges = []
+        with self.stats.phase('validate'):
+            for project_name, requirements in requirement_versions.items():
+                # If this requirement is not in the installed versions, just continue
+                if project_name not in installed_versions:
+                    continue
+
+                # Get the installed version
+                installed_version = installed_versions[project_name]
+                for required_project_name, specs in requirements.items():
+                    edges.append((project_name, required_project_name, installed_version, specs))
+
+            # Validate them all at once and keep the dependency conflicts
+            results = self.validation_cache.validate_all([(edge[2], edge[3]) for edge in edges])
+            conflicts = [
+                Conflict(*edge)
+                for edge, is_valid in zip(edges, results)
+                if not is_valid
+            ]
+        self.stats.count('edges_checked', len(edges))
+        self.stats.count('conflicts', len(conflicts))
 
         # Return the conflicts
         return conflicts
 
+    def iter_conflicts(self):
+        """
+        Yields the conflicts as soon as they are found. When the environment has not been scanned yet, distributions
+        are read one at a time and each edge is validated as soon as both of its ends are known, so a consumer that
+        stops early also stops the scan. A scan that runs to the end becomes the checker's snapshot.
+        """
+        if self.snapshot is not None:
+            for conflict in self.get_conflicts():
+                yield conflict
+            return
+
+        with self.stats.phase('enumerate_distributions'):
+            distributions = list(get_installed_distributions(self.get_source(), jobs=self.jobs))
+        reader = self.get_reader()
+        snapshot = EnvironmentSnapshot()
+
+        # normalized name of a required project => requirers whose edge waits for the required project to be read
+        pending = {}
+
+        # (normalized name of the required project, requirer) edges whose conflict was yielded, and the edges held
+        # back because an extra requested later can still add specs to them. The held back edges are checked once
+        # every distribution was read, so the streamed conflicts match those of get_conflicts.
+        yielded = set()
+        held = set()
+        dist_metadatas = thread_imap(reader, distributions, self.jobs)
+        try:
+            while True:
+                with self.stats.phase('read_metadata'):
+                    dist_metadata = next(dist_metadatas, None)
+                if dist_metadata is None:
+                    break
+                project_key = snapshot.get_name_key(dist_metadata[0])
+                added_edges = snapshot.add_distribution(*dist_metadata)
+                self.stats.count('distributions_scanned')
+
+                # Validate the edges of the new distribution that were not yielded yet and cannot change anymore
+                ready_edges = hold_back_edges(
+                    snapshot,
+                    get_ready_edges(snapshot, pending, project_key, added_edges),
+                    yielded,
+                    held
+                )
+                for conflict in self.iter_edge_conflicts(snapshot, ready_edges, yielded):
+                    yield conflict
+
+            # Validate the edges of the extras that were never requested
+            for conflict in self.iter_edge_conflicts(snapshot, sorted(held), yielded):
+                yield conflict
+        finally:
+            dist_metadatas.close()
+            self.save_metadata_cache()
+
+        # Keep the complete scan
+        self.stats.count('edges_built', sum(len(required) for required in snapshot.requirements.values()))
+        self.snapshot = snapshot
+
+    def iter_edge_conflicts(self, snapshot, edges, yielded):
+        """
+        Yields the conflicts of (normalized name of the required project, requirer) edges of a snapshot and adds
+        the edges that conflict to yielded
+        """
+        for edge in edges:
+            required_key, requirer = edge
+            required_project_name = snapshot.installed_names[required_key]
+            self.stats.count('edges_checked')
+            with self.stats.phase('validate'):
+                conflict = self.check_edge(
+                    required_project_name,
+                    requirer,
+                    snapshot.installed_versions[required_project_name],
+                    set(snapshot.requirements[requirer][required_key])
+                )
+            if conflict is not None:
+                yielded.add(edge)
+                self.stats.count('conflicts')
+                yield conflict
+
+    def get_dependency_graph(self):
+        """
+        Returns a dependency graph of the environment with every edge checked, which can then check
+        changes to the environment incrementally. The graph shares the checker's snapshot.
+        """
+        graph = DependencyGraph(self, self.get_snapshot())
+        with self.stats.phase('validate'):
+            graph.check_all()
+        return graph
 
-# Main entry point for console script
-def main():
-    checker = Checker()
-    conflicts = checker.get_conflicts()
-    if conflicts:
-        print('-' * 50)
-        print(' Conflicts Detected')
-        print('-' * 50)
-        for conflict in conflicts:
-            output_string = (
-                ' - ',
-                '{project_name}({installed_version}) ',
-                '{required_project_name}({readable_specs})'
-            )
-            print(''.join(output_string).format(
-                **conflict.__dict__
+    def get_dependency_paths(self):
+        """
+        Returns the shortest dependency paths from the root projects of the environment to every installed project
+        """
+        snapshot = self.get_snapshot()
+        with self.stats.phase('explain'):
+            return DependencyPaths(snapshot)
+
+    def get_suggestions(self, path, conflicts):
+        """
+        Returns the newest version of each conflicting project in the directory of wheels at path that satisfies
+        every project requiring it
+        """
+        snapshot = self.get_snapshot()
+        with self.stats.phase('suggest'):
+            return VersionSuggester(snapshot, Wheelhouse(path), self.validation_cache).suggest(conflicts)
+
+    def get_unsatisfiable(self):
+        """
+        Returns the projects that no version could satisfy all of the requirers of, whatever version is installed
+        """
+        snapshot = self.get_snapshot()
+        with self.stats.phase('constraints'):
+            return ConstraintAnalyzer(snapshot, self.validation_cache).analyze()
+
+    def check_edge(self, project_name, required_project_name, installed_version, specs):
+        """
+        Returns the conflict for a single requirement edge or None if the installed version is valid
+        """
+        # Identical edges are answered by the validation cache
+        if self.validation_cache.is_valid(installed_version, specs):
+            return None
+        return Conflict(**{
+            'project_name': project_name,
+            'required_project_name': required_project_name,
+            'installed_version': installed_version,
+            'specs': specs
+        })
+
+    def get_stats(self):
+        """
+        Returns a dict of the phase timings and counters of everything this checker has done so far
+        """
+        stats = self.stats.to_dict()
+        hits, misses, parse_seconds = self.version_cache_start
+        stats['timings']['parse_versions'] = version_cache.parse_seconds - parse_seconds
+        stats['counts'].update({
+            'specs_compiled': len(self.validation_cache.compiled_specs),
+            'validator_evaluations': self.validation_cache.misses,
+            'validation_cache_hits': self.validation_cache.hits,
+            'validation_cache_misses': self.validation_cache.misses,
+            'version_cache_hits': version_cache.hits - hits,
+            'version_cache_misses': version_cache.misses - misses,
+        })
+        if self.metadata_cache is not None:
+            stats['counts']['metadata_cache_hits'] = self.metadata_cache.hits
+            stats['counts']['metadata_cache_misses'] = self.metadata_cache.misses
+        return stats
+
+
+def format_conflict(conflict, prefix=' - '):
+    """
+    Returns the report line for a single conflict
+    """
+    output_string = (
+        prefix,
+        '{project_name}({installed_version}) ',
+        '{required_project_name}({readable_specs})'
+    )
+    return ''.join(output_string).format(
+        **conflict.__dict__
+    )
+
+
+def format_path(path):
+    """
+    Returns the report line for the dependency path that leads to a conflict
+    """
+    return '   via {0}'.format(' -> '.join(path))
+
+
+def format_conflicts(conflicts):
+    """
+    Returns the lines of the conflict report
+    """
+    lines = [
+        '-' * 50,
+        ' Conflicts Detected',
+        '-' * 50,
+    ]
+    lines.extend(format_conflict(conflict) for conflict in conflicts)
+    return lines
+
+
+def format_suggestions(suggestions):
+    """
+    Returns the lines of the report of the versions that resolve the conflicts
+    """
+    lines = [
+        '-' * 50,
+        ' Suggestions',
+        '-' * 50,
+    ]
+    for suggestion in suggestions:
+        requirements = ', '.join(
+            '{0}({1})'.format(requirer, get_readable_specs(specs)) for requirer, specs in suggestion.requirements
+        )
+        if suggestion.version is None:
+            lines.append(' - {0}: no version in the wheelhouse satisfies {1}'.format(
+                suggestion.project_name,
+                requirements
             ))
-        return 1
-    return 0
+        else:
+            lines.append(' - {0}=={1} satisfies {2}'.format(suggestion.project_name, suggestion.version, requirements))
+    return lines
+
+
+def format_unsatisfiable(unsatisfiable):
+    """
+    Returns the lines of the report of the projects whose requirers can never be satisfied together
+    """
+    lines = [
+        '-' * 50,
+        ' Unsatisfiable Requirements',
+        '-' * 50,
+    ]
+    lines.extend(
+        ' - {0}: no version satisfies {1}'.format(item.project_name, ', '.join(
+            '{0}({1})'.format(requirer, get_readable_specs(specs)) for requirer, specs in item.requirements
+        ))
+        for item in unsatisfiable
+    )
+    return lines
+
+
+def format_diff(diff):
+    """
+    Returns the lines of the report of a snapshot diff
+    """
+    lines = [
+        '-' * 50,
+        ' Snapshot Diff',
+        '-' * 50,
+    ]
+    lines.extend(' + {0}({1})'.format(*change) for change in diff.added)
+    lines.extend(' - {0}({1})'.format(*change) for change in diff.removed)
+    for project_name, old_version, new_version in diff.changed:
+        if old_version == new_version:
+            lines.append(' ~ {0}({1}) requirements changed'.format(project_name, new_version))
+        else:
+            lines.append(' ~ {0}({1} -> {2})'.format(project_name, old_version, new_version))
+
+    # List the edges the changes touch
+    if diff.edges:
+        lines.append(' Affected edges:')
+        lines.extend(
+            '   {0} -> {1}({2})'.format(requirer, required_project_name, get_readable_specs(specs))
+            for requirer, required_project_name, specs in diff.edges
+        )
+
+    # List the conflicts the changes create and resolve
+    if diff.conflicts.created:
+        lines.append(' Conflicts created:')
+        lines.extend(format_conflict(conflict) for conflict in diff.conflicts.created)
+    if diff.conflicts.resolved:
+        lines.append(' Conflicts resolved:')
+        lines.extend(format_conflict(conflict) for conflict in diff.conflicts.resolved)
+    return lines
+
+
+def positive_int(value):
+    """
+    Argument type for options that need a whole number of at least one
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError('must be at least 1')
+    return number
+
+
+def get_argument_parser():
+    """
+    Returns the argument parser for the console script
+    """
+    parser = argparse.ArgumentParser(
+        prog='pipconflictchecker',
+        description='Checks installed packages against all package requirements for version conflicts.'
+    )
+    parser.add_argument(
+        '--cache',
+        nargs='?',
+        const=get_default_cache_path(),
+        default=None,
+        metavar='PATH',
+        help='Cache parsed distribution metadata between runs (default path: %(const)s)'
+    )
+    parser.add_argument(
+        '--source',
+        choices=sorted(DISTRIBUTION_SOURCES),
+        default=None,
+        help='Where to read the installed distributions from (default: dist-info, falling back to pkg_resources)'
+    )
+    parser.add_argument(
+        '--python',
+        metavar='PATH',
+        help='Check the packages installed into another interpreter, which needs nothing but the standard library'
+    )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=positive_int,
+        default=1,
+        metavar='N',
+        help='Read distribution metadata with N threads, which helps on slow or network filesystems'
+    )
+    parser.add_argument(
+        '--fail-fast',
+        action='store_true',
+        help='Stop scanning and validating at the first conflict'
+    )
+    parser.add_argument(
+        '--explain',
+        action='store_true',
+        help='Show the shortest chain of requirements from a top-level package to each conflict'
+    )
+    parser.add_argument(
+        '--suggest',
+        metavar='DIR',
+        help=(
+            'Suggest the newest version of each conflicting package in a directory of wheels, such as a wheelhouse '
+            'or --find-links directory, that every package requiring it accepts'
+        )
+    )
+    parser.add_argument(
+        '--unsatisfiable',
+        action='store_true',
+        help=(
+            'Also report the packages that no version could satisfy all of the requirers of, naming a minimal set '
+            'of requirers that clash'
+        )
+    )
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        help='Report the time spent in each phase and counts of the work done to stderr'
+    )
+    parser.add_argument(
+        '--profile',
+        metavar='PATH',
+        help='Write a cProfile and tracemalloc report of the run to PATH and the raw profile to PATH.prof'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep running and report conflicts as distributions are installed, upgraded or removed'
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=1.0,
+        metavar='SECONDS',
+        help='Seconds between polls in watch mode (default: %(default)s)'
+    )
+    parser.add_argument(
+        '-r',
+        '--requirements',
+        metavar='PATH',
+        help='Check the pinned versions of a requirements or lock file instead of the installed packages'
+    )
+    parser.add_argument(
+        '--wheelhouse',
+        metavar='DIR',
+        help=(
+            'Directory of wheels to read the pinned versions of --requirements from. On its own, checks the '
+            'newest version of every project in it'
+        )
+    )
+    parser.add_argument(
+        '--wheelhouse-index',
+        metavar='PATH',
+        help='Where to keep the index of the wheelhouse metadata (default: {0} inside the wheelhouse)'.format(
+            INDEX_FILE_NAME
+        )
+    )
+    parser.add_argument(
+        '--snapshot-out',
+        metavar='PATH',
+        help='Save the installed versions and requirements that were checked to a snapshot file (gzipped for .gz)'
+    )
+    parser.add_argument(
+        '--snapshot-in',
+        metavar='PATH',
+        help='Check a snapshot file written by --snapshot-out instead of scanning the environment'
+    )
+    parser.add_argument(
+        '--diff',
+        nargs=2,
+        metavar=('OLD', 'NEW'),
+        help='List the packages that changed between two snapshot files and the edges and conflicts they affect'
+    )
+    parser.add_argument(
+        '--fleet',
+        nargs='+',
+        metavar='PATH',
+        help=(
+            'Check many snapshot files or frozen package listings, or directories of them, checking identical '
+            'environments once with --jobs processes'
+        )
+    )
+    return parser
+
+
+def get_source(parser, options):
+    """
+    Returns the source of the distributions to check, which is another interpreter, a wheelhouse or the pinned
+    versions of a requirements file when those options are given and the named installed source otherwise
+    """
+    given = ['--{0}'.format(name.replace('_', '-')) for name in ENVIRONMENT_OPTIONS if getattr(options, name)]
+    if len(given) > 1:
+        parser.error('{0} cannot be used together'.format(' and '.join(given)))
+    if given and options.watch:
+        parser.error('{0} cannot be used with --watch'.format(given[0]))
+    if options.requirements and not options.wheelhouse:
+        parser.error('--requirements needs --wheelhouse')
+    if options.requirements and not os.path.isfile(options.requirements):
+        parser.error('{0} is not a file'.format(options.requirements))
+
+    if options.python:
+        return get_interpreter_source(parser, options.python)
+    if options.requirements:
+        return LockfileSource(options.requirements, options.wheelhouse, options.wheelhouse_index)
+    if options.wheelhouse:
+        return WheelhouseSource(options.wheelhouse, options.wheelhouse_index)
+    return options.source
+
+
+def get_interpreter_source(parser, python):
+    """
+    Returns the source of the distributions of another interpreter, exiting with a usage error if it cannot be read
+    """
+    source = InterpreterSource(python)
+    try:
+        source.load()
+    except (OSError, ValueError) as error:
+        parser.error('cannot read the distributions of {0}: {1}'.format(python, error))
+    return source
+
+
+def load_snapshot(parser, path):
+    """
+    Returns the snapshot saved at path, exiting with a usage error if it cannot be loaded
+    """
+    try:
+        return EnvironmentSnapshot.load(path)
+    except (IOError, OSError, ValueError) as error:
+        parser.error('cannot load snapshot {0}: {1}'.format(path, error))
+
+
+def run_diff(parser, old_path, new_path):
+    """
+    Prints the diff of two snapshot files and returns 1 if the changes create conflicts and 0 otherwise
+    """
+    diff = diff_snapshots(load_snapshot(parser, old_path), load_snapshot(parser, new_path), Checker())
+    for line in format_diff(diff):
+        print(line)
+    return 1 if diff.conflicts.created else 0
+
+
+def stream_conflicts(conflicts, fail_fast=False, paths=None):
+    """
+    Prints the conflict report as the conflicts arrive and returns them, stopping after the first one when
+    fail_fast is set. Each conflict is followed by its dependency path when paths are given.
+    """
+    found = []
+    for conflict in conflicts:
+        if not found:
+            for line in format_conflicts([]):
+                print(line)
+        print(format_conflict(conflict))
+        if paths is not None:
+            print(format_path(paths.explain(conflict)))
+        found.append(conflict)
+        if fail_fast:
+            break
+
+    # Stop a lazy check right away
+    if hasattr(conflicts, 'close'):
+        conflicts.close()
+    return found
+
+
+def run_check(checker, options):
+    """
+    Prints the conflicts as they are found, with their dependency paths, the versions that resolve them and the
+    requirements that can never be satisfied when asked. Returns True if any conflicts or unsatisfiable
+    requirements were found. Everything but the plain check needs the whole environment first.
+    """
+    paths = None
+    if options.profile:
+        conflicts = iter(profile_call(checker.get_conflicts, options.profile))
+    elif options.explain or options.suggest or options.unsatisfiable:
+        conflicts = iter(checker.get_conflicts())
+    else:
+        conflicts = checker.iter_conflicts()
+    if options.explain:
+        paths = checker.get_dependency_paths()
+    conflicts = stream_conflicts(conflicts, fail_fast=options.fail_fast, paths=paths)
+
+    # Suggest versions for the conflicts that were reported
+    if options.suggest and conflicts:
+        for line in format_suggestions(checker.get_suggestions(options.suggest, conflicts)):
+            print(line)
+
+    # Report the requirements that no upgrade can fix
+    unsatisfiable = checker.get_unsatisfiable() if options.unsatisfiable else []
+    if unsatisfiable:
+        for line in format_unsatisfiable(unsatisfiable):
+            print(line)
+    return bool(conflicts or unsatisfiable)
+
+
+def write_warnings(checker, stats=False):
+    """
+    Writes the warnings of the source and optionally the stats to stderr
+    """
+    lines = checker.source.get_warnings() if isinstance(checker.source, DistributionSource) else []
+    if stats:
+        lines.extend(format_stats(checker.get_stats()))
+    for line in lines:
+        sys.stderr.write('{0}\n'.format(line))
+
+
+# Main entry point for console script
+def main(args=None):
+    parser = get_argument_parser()
+    options = parser.parse_args(args)
+    if options.diff:
+        return run_diff(parser, *options.diff)
+    if options.fleet:
+        # Imported here since the fleet check builds on the checker
+        from pipconflictchecker.fleet import run_fleet
+        return run_fleet(options.fleet, options.jobs, options.wheelhouse, options.wheelhouse_index)
+
+    checker = Checker(cache_path=options.cache, source=get_source(parser, options), jobs=options.jobs)
+    if options.snapshot_in:
+        checker.snapshot = load_snapshot(parser, options.snapshot_in)
+    if options.watch:
+        # Imported here since the watcher builds on the checker
+        from pipconflictchecker.watch import Watcher
+        return Watcher(checker=checker).run(interval=options.interval)
+
+    found = run_check(checker, options)
+    if options.snapshot_out:
+        checker.get_snapshot().save(options.snapshot_out)
+
+    write_warnings(checker, stats=options.stats)
+    return 1 if found else 0
@@ -0,0 +1,123 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from collections import namedtuple
+from itertools import groupby
+from operator import itemgetter
+
+# A project no version of which can satisfy all of its requirers, with the (requirer, specs) of a minimal set of
+# requirers that clash: dropping any one of them leaves versions that satisfy the rest
+Unsatisfiable = namedtuple('Unsatisfiable', ['project_name', 'requirements'])
+
+
+def get_bound_events(interval_sets):
+    """
+    Returns the number of intervals that are unbounded below and the sorted (version, after, change) events of the
+    other bounds. A bound lies at a version or just after it, and where an interval ends at the same place another
+    starts the end sorts first.
+    """
+    coverage = 0
+    events = []
+    for intervals in interval_sets:
+        for interval in intervals:
+            if interval.lower is None:
+                coverage += 1
+            else:
+                events.append((interval.lower, not interval.lower_inclusive, 1))
+            if interval.upper is not None:
+                events.append((interval.upper, interval.upper_inclusive, -1))
+    events.sort()
+    return coverage, events
+
+
+def find_common_versions(interval_sets):
+    """
+    Sweeps the sorted bounds of every interval once and returns whether a range of versions is in an interval of
+    every set, and the single versions that are when no range is. Each set has to be a list of disjoint intervals,
+    so the sweep takes O(n log n) for n intervals.
+    """
+    coverage, events = get_bound_events(interval_sets)
+    required = len(interval_sets)
+    points = []
+    version = None
+    for position, changes in groupby(events, key=itemgetter(0, 1)):
+        # Nothing bounds the versions between the last place and this one, so they are all in every set if it was
+        if coverage == required and position != (version, True):
+            return True, []
+        version = position[0]
+        coverage += sum(change for _, _, change in changes)
+        if coverage == required and not position[1]:
+            points.append(version)
+
+    # Every set is unbounded above the last bound when it is still covered
+    if coverage == required:
+        return True, []
+    return False, points
+
+
+class ConstraintAnalyzer(object):
+    """
+    Class that merges the specs of every project that requires a project into one interval set to find the projects
+    that no version could ever satisfy, whatever is installed. Versions that the checker accepts outside of the
+    ranges, pinned with ==, and versions excluded with != are judged by the validation cache, so a project is only
+    reported when the checker would report a conflict for every possible version of it.
+    """
+    def __init__(self, snapshot, validation_cache):
+        super(ConstraintAnalyzer, self).__init__()
+        self.snapshot = snapshot
+        self.validation_cache = validation_cache
+
+    def get_requirements(self):
+        """
+        Returns a dict of the normalized name of every required project => list of (requirer, specs)
+        """
+        requirements = {}
+        for requirer, required in sorted(self.snapshot.requirements.items()):
+            for required_key, specs in required.items():
+                requirements.setdefault(required_key, []).append((requirer, sorted(specs)))
+        return requirements
+
+    def is_satisfiable(self, specs_list):
+        """
+        Determine if any version satisfies every one of the specs
+        """
+        compiled_specs = [self.validation_cache.get_compiled_spec(specs) for specs in specs_list]
+        has_range, points = find_common_versions([
+            compiled_spec.get_allowed_intervals() for compiled_spec in compiled_specs
+        ])
+        if has_range:
+            return True
+
+        # Only single versions are left, either where the ranges meet or pinned with ==
+        candidates = set('{0}'.format(point) for point in points)
+        for compiled_spec in compiled_specs:
+            candidates.update(compiled_spec.exacts)
+        return any(
+            all(self.validation_cache.is_valid(candidate, specs) for specs in specs_list)
+            for candidate in sorted(candidates)
+        )
+
+    def get_clashing_requirements(self, requirements):
+        """
+        Returns a minimal list of the (requirer, specs) requirements that cannot be satisfied together, dropping
+        every requirer the rest still clash without
+        """
+        clashing = list(requirements)
+        for requirement in requirements:
+            remaining = [other for other in clashing if other is not requirement]
+            if not self.is_satisfiable([specs for _, specs in remaining]):
+                clashing = remaining
+        return clashing
+
+    def analyze(self):
+        """
+        Returns the unsatisfiable projects by name
+        """
+        unsatisfiable = []
+        for required_key, requirements in self.get_requirements().items():
+            if not self.is_satisfiable([specs for _, specs in requirements]):
+                unsatisfiable.append(Unsatisfiable(
+                    self.snapshot.get_display_name(required_key),
+                    self.get_clashing_requirements(requirements)
+                ))
+        return sorted(unsatisfiable)
@@ -0,0 +1,84 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from collections import namedtuple
+
+from pipconflictchecker.graph import DependencyGraph
+
+# The differences between two snapshots. added and removed hold (project_name, version), changed holds
+# (project_name, old version, new version), edges holds the (requirer, required project_name, specs) edges
+# touching any of those projects and conflicts is the ConflictDelta the change causes.
+SnapshotDiff = namedtuple('SnapshotDiff', ['added', 'removed', 'changed', 'edges', 'conflicts'])
+
+
+def get_readable_specs(specs):
+    """
+    Returns the specs of an edge in a stable order for reports
+    """
+    return ','.join('{0}{1}'.format(*spec) for spec in sorted(specs))
+
+
+def get_state(snapshot, project_name):
+    """
+    Returns the installed version and requirements of a project, which differ between snapshots when it changed
+    """
+    return snapshot.installed_versions.get(project_name), snapshot.requirements.get(project_name)
+
+
+def get_affected_edges(snapshot, project_names):
+    """
+    Returns a dict of (requirer, required project_name) => specs of the edges in the snapshot that touch the projects,
+    matching the projects however the requirements spell their names
+    """
+    project_keys = set(snapshot.get_name_key(project_name) for project_name in project_names)
+    edges = {}
+    for requirer, requirements in snapshot.requirements.items():
+        for required_key, specs in requirements.items():
+            if snapshot.get_name_key(requirer) in project_keys or required_key in project_keys:
+                edges[(requirer, snapshot.get_display_name(required_key))] = specs
+    return edges
+
+
+def diff_snapshots(old, new, checker):
+    """
+    Returns the SnapshotDiff of two snapshots, checking only the edges of the changed projects with the checker
+    """
+    old_versions = old.installed_versions
+    new_versions = new.installed_versions
+    added = sorted(
+        (project_name, version) for project_name, version in new_versions.items()
+        if project_name not in old_versions
+    )
+    removed = sorted(
+        (project_name, version) for project_name, version in old_versions.items()
+        if project_name not in new_versions
+    )
+    changed = sorted(
+        (project_name, version, new_versions[project_name]) for project_name, version in old_versions.items()
+        if project_name in new_versions and get_state(old, project_name) != get_state(new, project_name)
+    )
+
+    # Collect the edges touching the changed projects before and after, preferring the new specs
+    project_names = set(change[0] for change in added + removed + changed)
+    edges = get_affected_edges(old, project_names)
+    edges.update(get_affected_edges(new, project_names))
+
+    # Find the conflicts the change creates and resolves without touching the old snapshot
+    graph = DependencyGraph(checker, old)
+    graph.check_all()
+    conflicts = graph.check_delta(
+        added=[
+            (project_name, version, list(new.requirements.get(project_name, {}).items()))
+            for project_name, version in added
+        ],
+        removed=[project_name for project_name, _ in removed],
+        upgraded=[
+            (project_name, version, list(new.requirements.get(project_name, {}).items()))
+            for project_name, _, version in changed
+        ],
+        commit=False
+    )
+
+    # Return the diff
+    edges = [edge + (specs,) for edge, specs in sorted(edges.items())]
+    return SnapshotDiff(added, removed, changed, edges, conflicts)
@@ -0,0 +1,253 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import re
+import sys
+
+from pipconflictchecker.markers import evaluate_marker, get_extra_key
+from pipconflictchecker.metadata import get_project_key, read_metadata, read_requires_txt, safe_name
+from pipconflictchecker.parallel import thread_map
+
+# Suffixes of the directory entries that hold distribution metadata
+METADATA_SUFFIXES = ('.dist-info', '.egg-info')
+
+# Suffix of an egg, a directory with its metadata in EGG-INFO or a zip file of one
+EGG_SUFFIX = '.egg'
+
+# Matches the name and version in a metadata entry name the same way pkg_resources does
+ENTRY_NAME_RE = re.compile(r'^(?P<name>[^-]+)(?:-(?P<version>[^-]+))?')
+
+
+def get_metadata_directory(egg_info):
+    """
+    Returns the metadata entry of an installed distribution, which is the EGG-INFO directory inside an egg
+    """
+    if egg_info.endswith(EGG_SUFFIX):
+        return os.path.join(egg_info, 'EGG-INFO')
+    return egg_info
+
+
+class InstalledDistribution(object):
+    """
+    Class that reads an installed distribution from its metadata directory on first use. It provides the
+    parts of the pkg_resources Distribution API the checker needs.
+    """
+    # Marker environment of the interpreter the distribution is installed into, None for this one
+    marker_environment = None
+
+    def __init__(self, egg_info):
+        super(InstalledDistribution, self).__init__()
+        self.egg_info = egg_info
+        self._metadata = None
+
+        # Error raised reading the metadata files, when they could not be read
+        self.metadata_error = None
+
+        # Like pkg_resources, take the name and version from the entry name when it has them
+        match = ENTRY_NAME_RE.match(os.path.splitext(os.path.basename(egg_info))[0])
+        self._project_name = safe_name(match.group('name')) if match else None
+        self._version = match.group('version') if match else None
+
+    def __repr__(self):
+        return 'InstalledDistribution({0!r})'.format(self.egg_info)
+
+    def get_metadata(self):
+        """
+        Returns the name, version and requirements, reading the metadata only once. Metadata that cannot be read,
+        such as that of an interrupted install, gives no requirements and leaves the name and version to the entry
+        name.
+        """
+        if self._metadata is None:
+            try:
+                self._metadata = self.read_metadata(get_metadata_directory(self.egg_info))
+            except (IOError, OSError) as error:
+                self.metadata_error = error
+                self._metadata = (None, None, [])
+        return self._metadata
+
+    def read_metadata(self, metadata_directory):
+        """
+        Returns the name, version and requirements declared in the metadata files of the entry
+        """
+        if metadata_directory.endswith('.dist-info'):
+            return read_metadata(os.path.join(metadata_directory, 'METADATA'))
+        if os.path.isdir(metadata_directory):
+            name, version, _ = read_metadata(os.path.join(metadata_directory, 'PKG-INFO'))
+            requires_path = os.path.join(metadata_directory, 'requires.txt')
+            requirements = read_requires_txt(requires_path) if os.path.isfile(requires_path) else []
+            return name, version, requirements
+        return read_metadata(metadata_directory)
+
+    def set_metadata(self, metadata):
+        """
+        Uses the name, version and requirements that were already read, such as from a cache, instead of reading
+        the metadata files
+        """
+        self._metadata = metadata
+
+    @property
+    def project_name(self):
+        return self._project_name or safe_name(self.get_metadata()[0] or '')
+
+    @property
+    def version(self):
+        return self._version or self.get_metadata()[1]
+
+    @property
+    def extras(self):
+        """
+        Returns the keys of the extras the distribution declares requirements for
+        """
+        return sorted(set(
+            get_extra_key(requirement.extra) for requirement in self.get_metadata()[2]
+            if requirement.extra is not None
+        ))
+
+    def requires(self, extras=()):
+        """
+        Returns the requirements of the distribution and of the given extras whose markers apply
+        """
+        extra_keys = set(get_extra_key(extra) for extra in extras)
+        requirements = []
+        for requirement in self.get_metadata()[2]:
+            if requirement.extra is not None and get_extra_key(requirement.extra) not in extra_keys:
+                continue
+            if requirement.marker is None or evaluate_marker(
+                requirement.marker,
+                requirement.extra,
+                self.marker_environment
+            ):
+                requirements.append(requirement)
+        return requirements
+
+
+class DistributionSource(object):
+    """
+    Base class for the places distributions can be read from
+    """
+    def get_distributions(self, jobs=1):
+        raise NotImplementedError
+
+    def get_warnings(self):
+        """
+        Returns a line for everything the last get_distributions call could not read completely
+        """
+        return []
+
+
+class DistInfoSource(DistributionSource):
+    """
+    Finds distributions by listing the dist-info, egg-info and egg entries of every path without importing
+    pkg_resources. Paths that are eggs themselves are read as well, only zipped eggs need pkg_resources.
+    """
+    def __init__(self, paths=None):
+        super(DistInfoSource, self).__init__()
+        self.paths = paths
+
+        # Distributions found by the last get_distributions call
+        self.distributions = []
+
+    def get_metadata_entries(self, path):
+        """
+        Returns the paths of the metadata entries and eggs in a path sorted by name, the path itself when it is an
+        egg, or an empty list if the path cannot be listed
+        """
+        if path.endswith(EGG_SUFFIX):
+            return [path]
+        try:
+            entries = os.listdir(path)
+        except (OSError, TypeError):
+            return []
+        return [
+            os.path.join(path, entry) for entry in sorted(entries)
+            if entry.endswith(METADATA_SUFFIXES) or entry.endswith(EGG_SUFFIX)
+        ]
+
+    def get_entry_distributions(self, entry):
+        """
+        Returns the distributions of a metadata entry, reading zipped eggs through pkg_resources
+        """
+        if entry.endswith(EGG_SUFFIX) and os.path.isfile(entry):
+            from pkg_resources import find_distributions
+            return list(find_distributions(entry, only=True))
+        return [InstalledDistribution(entry)]
+
+    def get_distributions(self, jobs=1):
+        """
+        Returns the distributions found on the paths, where the first path that provides a project wins. The
+        paths are listed with up to jobs threads and merged in path order so the result never depends on jobs.
+        """
+        paths = [path or '.' for path in (self.paths if self.paths is not None else sys.path)]
+        path_entries = thread_map(self.get_metadata_entries, paths, jobs)
+
+        distributions = []
+        seen = set()
+        for entries in path_entries:
+            for entry in entries:
+                key = get_project_key(os.path.splitext(os.path.basename(entry))[0].split('-')[0])
+                if key in seen:
+                    continue
+                seen.add(key)
+                distributions.extend(self.get_entry_distributions(entry))
+        self.distributions = distributions
+        return distributions
+
+    def get_warnings(self):
+        """
+        Returns a line for every distribution whose metadata could not be read
+        """
+        return [
+            'Cannot read the metadata of {0}, its requirements were not checked ({1})'.format(
+                dist.egg_info,
+                dist.metadata_error
+            )
+            for dist in self.distributions
+            if getattr(dist, 'metadata_error', None) is not None
+        ]
+
+
+class PkgResourcesSource(DistributionSource):
+    """
+    Finds distributions through the pkg_resources working set
+    """
+    def get_distributions(self, jobs=1):
+        from pkg_resources import working_set
+        return list(working_set)
+
+
+class DefaultSource(DistInfoSource):
+    """
+    Reads the dist-info entries of sys.path, falling back to the pkg_resources working set when there are none
+    """
+    def get_distributions(self, jobs=1):
+        distributions = super(DefaultSource, self).get_distributions(jobs)
+        if not distributions:
+            distributions = PkgResourcesSource().get_distributions()
+        return distributions
+
+
+# Map of source names to the classes that provide them
+DISTRIBUTION_SOURCES = {
+    'dist-info': DistInfoSource,
+    'pkg_resources': PkgResourcesSource,
+}
+
+
+def get_distribution_source(source=None):
+    """
+    Returns a source instance as it is, a new source for a source name or the default source for None
+    """
+    if isinstance(source, DistributionSource):
+        return source
+    if source is None:
+        return DefaultSource()
+    return DISTRIBUTION_SOURCES[source]()
+
+
+def get_installed_distributions(source=None, jobs=1):
+    """
+    Returns the installed distributions from the named source or a source instance, falling back to
+    pkg_resources when the default source finds nothing
+    """
+    return get_distribution_source(source).get_distributions(jobs)
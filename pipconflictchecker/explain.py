@@ -0,0 +1,102 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from collections import deque
+
+# Parent of a project the search has not reached yet
+UNVISITED = -1
+
+
+class DependencyPaths(object):
+    """
+    Class that numbers the installed projects of a snapshot and keeps their requirement edges as a compressed sparse
+    row adjacency list, two flat lists of integers, then finds the shortest path from a root project to every
+    project with a single breadth first search. Roots are the projects no other installed project requires. Building
+    the lists and the search both take time linear in the number of projects and edges.
+    """
+    def __init__(self, snapshot):
+        super(DependencyPaths, self).__init__()
+        self.snapshot = snapshot
+
+        # node => project_name and normalized name => node
+        self.names = sorted(snapshot.installed_versions)
+        self.nodes = dict((snapshot.get_name_key(project_name), node) for node, project_name in enumerate(self.names))
+
+        # The projects a node requires are targets[offsets[node]:offsets[node + 1]]
+        self.offsets = [0]
+        self.targets = []
+        for project_name in self.names:
+            self.targets.extend(sorted(set(
+                self.nodes[required_key]
+                for required_key in snapshot.requirements.get(project_name, {})
+                if required_key in self.nodes
+            )))
+            self.offsets.append(len(self.targets))
+
+        # node => the node it is reached from on a shortest path, or itself for the root of the path
+        self.parents = self.search()
+
+    def get_roots(self):
+        """
+        Returns the nodes no other node requires
+        """
+        required = [False] * len(self.names)
+        for node, target in self.iter_edges():
+            if target != node:
+                required[target] = True
+        return [node for node, is_required in enumerate(required) if not is_required]
+
+    def iter_edges(self):
+        """
+        Yields every (node, required node) edge
+        """
+        for node in range(len(self.names)):
+            for target in self.targets[self.offsets[node]:self.offsets[node + 1]]:
+                yield node, target
+
+    def search(self):
+        """
+        Searches breadth first from every root at once and returns the parent of every node. Projects that are only
+        required from inside a dependency cycle are reached from the first project of the cycle instead.
+        """
+        parents = [UNVISITED] * len(self.names)
+        roots = self.get_roots()
+        for root in roots:
+            parents[root] = root
+        self.visit(deque(roots), parents)
+        for node in range(len(self.names)):
+            if parents[node] == UNVISITED:
+                parents[node] = node
+                self.visit(deque([node]), parents)
+        return parents
+
+    def visit(self, queue, parents):
+        """
+        Visits every node reachable from the queued nodes that has not been visited yet
+        """
+        while queue:
+            node = queue.popleft()
+            for target in self.targets[self.offsets[node]:self.offsets[node + 1]]:
+                if parents[target] == UNVISITED:
+                    parents[target] = node
+                    queue.append(target)
+
+    def get_path(self, project_name):
+        """
+        Returns the project names on the shortest path from a root to an installed project, ending with the project
+        """
+        node = self.nodes.get(self.snapshot.get_name_key(project_name))
+        if node is None:
+            return [project_name]
+        path = [node]
+        while self.parents[node] != node:
+            node = self.parents[node]
+            path.append(node)
+        return [self.names[node] for node in reversed(path)]
+
+    def explain(self, conflict):
+        """
+        Returns the project names on the shortest path from a root through the requirer of a conflict to the
+        conflicting project
+        """
+        return self.get_path(conflict.required_project_name) + [conflict.project_name]
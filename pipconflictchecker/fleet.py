@@ -0,0 +1,197 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import hashlib
+import json
+import os
+from collections import namedtuple, OrderedDict
+
+from pipconflictchecker.checker import Checker, format_conflict, ValidationCache
+from pipconflictchecker.lockfile import LockfileSource
+from pipconflictchecker.parallel import process_map
+from pipconflictchecker.snapshot import EnvironmentSnapshot
+from pipconflictchecker.store import save_quietly
+from pipconflictchecker.wheelhouse import WheelhouseIndex
+
+# The paths of the identical environments that share a content hash and their conflicts
+FleetEnvironment = namedtuple('FleetEnvironment', ['content_hash', 'paths', 'conflicts'])
+
+# The checked environments in the order they were first seen, the (path, error) of unreadable ones and the
+# (path, warning) of everything the listings could not check completely
+FleetReport = namedtuple('FleetReport', ['environments', 'errors', 'warnings'])
+
+# Most common conflicts listed in the fleet summary
+SUMMARY_CONFLICTS = 10
+
+# Validation results shared by every environment a worker process checks
+worker_validation_cache = None
+
+
+def init_worker():
+    """
+    Starts a worker with an empty validation cache that lives as long as the worker, next to its version cache. The
+    many edges a fleet has to validate go through the batch engine.
+    """
+    global worker_validation_cache
+    worker_validation_cache = ValidationCache(batch=True)
+
+
+def check_environment(data):
+    """
+    Returns the conflicts of the snapshot dict of an environment, using the validation cache of the worker
+    """
+    checker = Checker()
+    checker.snapshot = EnvironmentSnapshot.from_dict(data)
+    checker.validation_cache = worker_validation_cache
+    return checker.get_conflicts()
+
+
+def get_content_hash(data):
+    """
+    Returns a hash of the snapshot dict of an environment that is the same for every identical environment
+    """
+    content = json.dumps(data, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+def iter_environment_paths(paths):
+    """
+    Yields the given files and the files directly inside the given directories
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for file_name in sorted(os.listdir(path)):
+            file_path = os.path.join(path, file_name)
+            if os.path.isfile(file_path):
+                yield file_path
+
+
+def load_environment(path, wheelhouse=None):
+    """
+    Returns the snapshot of a snapshot file, or of a frozen package listing with the metadata of its pins from the
+    wheelhouse index, along with the warnings of the listing. Raises ValueError for a listing when there is no
+    wheelhouse or it pins nothing.
+    """
+    try:
+        return EnvironmentSnapshot.load(path), []
+    except ValueError:
+        if wheelhouse is None:
+            raise ValueError('not a snapshot, frozen package listings need --wheelhouse')
+    source = LockfileSource(path, wheelhouse)
+    distributions = source.get_distributions()
+    if not distributions:
+        raise ValueError('not a snapshot or a frozen package listing, nothing is pinned')
+    return EnvironmentSnapshot.from_distributions(distributions), source.get_warnings()
+
+
+def check_fleet(paths, jobs=1, wheelhouse_path=None, index_path=None):
+    """
+    Loads every environment, groups identical ones by content hash and checks each distinct environment once
+    with up to jobs worker processes
+    """
+    wheelhouse = WheelhouseIndex(wheelhouse_path, index_path) if wheelhouse_path else None
+
+    # Group the environments, keeping one snapshot dict for each distinct one
+    groups = OrderedDict()
+    errors = []
+    warnings = []
+    for path in iter_environment_paths(paths):
+        try:
+            snapshot, path_warnings = load_environment(path, wheelhouse)
+        except (IOError, OSError, ValueError) as error:
+            errors.append((path, error))
+            continue
+        warnings.extend((path, warning) for warning in path_warnings)
+        data = snapshot.to_dict()
+        groups.setdefault(get_content_hash(data), (data, []))[1].append(path)
+    if wheelhouse is not None:
+        save_quietly(wheelhouse)
+
+    # Check the distinct environments
+    results = process_map(check_environment, [data for data, _ in groups.values()], jobs, init_worker)
+    environments = [
+        FleetEnvironment(content_hash, group_paths, conflicts)
+        for (content_hash, (_, group_paths)), conflicts in zip(groups.items(), results)
+    ]
+    return FleetReport(environments, errors, warnings)
+
+
+def get_conflict_key(conflict):
+    """
+    Returns a key that is the same for identical conflicts found in different environments
+    """
+    return (
+        conflict.project_name,
+        conflict.required_project_name,
+        conflict.installed_version,
+        frozenset(tuple(spec) for spec in conflict.specs)
+    )
+
+
+def format_fleet_report(report):
+    """
+    Returns the lines of the conflict report of every distinct environment with conflicts and a fleet-wide summary
+    """
+    lines = []
+    for environment in report.environments:
+        if not environment.conflicts:
+            continue
+        lines.extend([
+            '-' * 50,
+            ' Environment {0} ({1} hosts)'.format(environment.content_hash[:12], len(environment.paths)),
+            '-' * 50,
+        ])
+        lines.extend('   {0}'.format(path) for path in environment.paths)
+        lines.extend(format_conflict(conflict) for conflict in environment.conflicts)
+
+    # Count every conflict once for each host that has it
+    conflict_counts = OrderedDict()
+    for environment in report.environments:
+        for conflict in environment.conflicts:
+            key = get_conflict_key(conflict)
+            count = conflict_counts.get(key, (conflict, 0))[1]
+            conflict_counts[key] = (conflict, count + len(environment.paths))
+    conflicted = [environment for environment in report.environments if environment.conflicts]
+
+    # Summarize the fleet
+    lines.extend([
+        '-' * 50,
+        ' Fleet Summary',
+        '-' * 50,
+        ' Hosts: {0} ({1} distinct environments)'.format(
+            sum(len(environment.paths) for environment in report.environments),
+            len(report.environments)
+        ),
+        ' Hosts with conflicts: {0} ({1} distinct environments)'.format(
+            sum(len(environment.paths) for environment in conflicted),
+            len(conflicted)
+        ),
+    ])
+    if conflict_counts:
+        lines.append(' Most common conflicts:')
+        most_common = sorted(conflict_counts.values(), key=lambda item: -item[1])[:SUMMARY_CONFLICTS]
+        lines.extend(
+            format_conflict(conflict, prefix=' {0:>6} hosts: '.format(count))
+            for conflict, count in most_common
+        )
+    if report.errors:
+        lines.append(' Unreadable:')
+        lines.extend('   {0}: {1}'.format(path, error) for path, error in report.errors)
+    if report.warnings:
+        lines.append(' Warnings:')
+        lines.extend('   {0}: {1}'.format(path, warning) for path, warning in report.warnings)
+    return lines
+
+
+def run_fleet(paths, jobs=1, wheelhouse_path=None, index_path=None, output=print):
+    """
+    Checks the environments, writes the report to output and returns 1 if any environment has conflicts or
+    could not be read and 0 otherwise
+    """
+    report = check_fleet(paths, jobs, wheelhouse_path, index_path)
+    for line in format_fleet_report(report):
+        output(line)
+    return 1 if report.errors or any(environment.conflicts for environment in report.environments) else 0
@@ -0,0 +1,189 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from collections import namedtuple
+
+from pipconflictchecker.snapshot import EnvironmentSnapshot
+
+# The conflicts a change created and the conflicts it resolved
+ConflictDelta = namedtuple('ConflictDelta', ['created', 'resolved'])
+
+
+class DependencyGraph(object):
+    """
+    Class that keeps the requirement edges of an environment with forward and reverse indexes along with
+    the conflicts they currently have, so a change to a few projects only re-checks the edges touching them
+    """
+    def __init__(self, checker, snapshot=None):
+        super(DependencyGraph, self).__init__()
+        self.checker = checker
+
+        # Forward index, project_name => dict of the normalized name of each required project => specs
+        self.snapshot = snapshot if snapshot is not None else EnvironmentSnapshot()
+
+        # Reverse index, normalized name => set of project names that require it
+        self.required_by = {}
+        for project_name, requirements in self.snapshot.requirements.items():
+            for required_key in requirements:
+                self.required_by.setdefault(required_key, set()).add(project_name)
+
+        # (normalized name of the required project, required_project_name) => conflict
+        self.conflicts = {}
+
+    def get_edges(self, project_name):
+        """
+        Returns the (normalized name of the required project, required_project_name) edges a project takes part in
+        """
+        edges = set(
+            (required_key, project_name)
+            for required_key in self.snapshot.requirements.get(project_name, {})
+        )
+        project_key = self.snapshot.get_name_key(project_name)
+        edges.update(
+            (project_key, required_project_name)
+            for required_project_name in self.required_by.get(project_key, ())
+        )
+        return edges
+
+    def get_all_edges(self):
+        """
+        Returns every edge in the graph
+        """
+        return set(
+            (required_key, project_name)
+            for project_name, requirements in self.snapshot.requirements.items()
+            for required_key in requirements
+        )
+
+    def add_distribution(self, project_name, version, requirements, extra_requirements=None, requested_extras=None):
+        """
+        Adds a distribution to both indexes and returns the edges it takes part in, including the edges of
+        the extras it requests of projects that are already installed
+        """
+        edges = set()
+        for requirer, required_key in self.snapshot.add_distribution(
+            project_name,
+            version,
+            requirements,
+            extra_requirements,
+            requested_extras
+        ):
+            self.required_by.setdefault(required_key, set()).add(requirer)
+            edges.add((required_key, requirer))
+        return edges | self.get_edges(project_name)
+
+    def remove_distribution(self, project_name):
+        """
+        Removes a distribution from both indexes and returns the edges it took part in, including the edges of the
+        extras only it requested
+        """
+        edges = self.get_edges(project_name)
+        for requirer, required_key in self.snapshot.remove_distribution(project_name):
+            if required_key not in self.snapshot.requirements.get(requirer, {}):
+                self.required_by[required_key].discard(requirer)
+            edges.add((required_key, requirer))
+        return edges
+
+    def restore_state(self, state):
+        """
+        Puts back the projects saved with the snapshot's save_state along with the reverse index of their
+        requirements
+        """
+        projects = state[0]
+        for project_name in projects:
+            for required_key in self.snapshot.requirements.get(project_name, {}):
+                self.required_by[required_key].discard(project_name)
+        self.snapshot.restore_state(state)
+        for project_name in projects:
+            for required_key in self.snapshot.requirements.get(project_name, {}):
+                self.required_by.setdefault(required_key, set()).add(project_name)
+
+    def check_edges(self, edges):
+        """
+        Validates the edges again and returns the conflicts that were created and resolved
+        """
+        created = []
+        resolved = []
+        for edge in sorted(edges):
+            required_key, required_project_name = edge
+            conflict = None
+            specs = self.snapshot.requirements.get(required_project_name, {}).get(required_key)
+            project_name = self.snapshot.installed_names.get(required_key)
+            if specs is not None and project_name is not None:
+                conflict = self.checker.check_edge(
+                    project_name,
+                    required_project_name,
+                    self.snapshot.installed_versions[project_name],
+                    set(specs)
+                )
+
+            # Compare against the conflict this edge had before
+            previous = self.conflicts.pop(edge, None)
+            if conflict is not None:
+                self.conflicts[edge] = conflict
+                if previous is None or previous.__dict__ != conflict.__dict__:
+                    created.append(conflict)
+            elif previous is not None:
+                resolved.append(previous)
+
+        # Return the changes
+        return ConflictDelta(created, resolved)
+
+    def check_all(self):
+        """
+        Validates every edge and returns the conflicts that were created and resolved
+        """
+        return self.check_edges(self.get_all_edges() | set(self.conflicts))
+
+    def check_delta(self, added=(), removed=(), upgraded=(), commit=True):
+        """
+        Applies a change and returns only the conflicts it creates and resolves. Added projects are
+        (project_name, version, requirements) tuples or DistributionMetadata, removed projects are project names
+        and upgraded projects are (project_name, version) tuples, optionally with new requirements, or
+        DistributionMetadata. An upgrade that only gives new requirements keeps the extras of the project. When
+        commit is false the graph is left as it was, which checks a proposed change without applying it.
+        """
+        touched = set(removed)
+        touched.update(change[0] for change in added)
+        touched.update(change[0] for change in upgraded)
+
+        # Requesting an extra also adds requirements to the project that provides it, so those projects are saved
+        # along with the changed ones
+        previous_conflicts = dict(self.conflicts)
+        previous_state = None
+        if not commit:
+            previous_state = self.snapshot.save_state(touched | set(self.snapshot.extra_requirements))
+
+        # Apply the change, collecting every edge touching a changed project before and after
+        edges = set()
+        for project_name in removed:
+            edges.update(self.remove_distribution(project_name))
+        for change in upgraded:
+            project_name, version = change[:2]
+            if len(change) > 3:
+                metadata = change[2:]
+            else:
+                metadata = (
+                    list(change[2]) if len(change) > 2 else self.snapshot.declared_requirements.get(project_name, []),
+                    self.snapshot.extra_requirements.get(project_name),
+                    self.snapshot.requested_extras.get(project_name),
+                )
+            edges.update(self.remove_distribution(project_name))
+            edges.update(self.add_distribution(project_name, version, *metadata))
+        for change in added:
+            edges.update(self.add_distribution(*change))
+        delta = self.check_edges(edges)
+
+        # Put the graph back the way it was when the change is only proposed
+        if not commit:
+            self.restore_state(previous_state)
+            self.conflicts = previous_conflicts
+
+        # Return the created and resolved conflicts
+        return delta
+
+    def get_conflicts(self):
+        """
+        Returns the current conflicts
+        """
+        return [self.conflicts[edge] for edge in sorted(self.conflicts)]
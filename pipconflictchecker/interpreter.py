@@ -0,0 +1,82 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import inspect
+import json
+import subprocess
+
+from pipconflictchecker import payload
+from pipconflictchecker.distributions import DistributionSource, InstalledDistribution
+from pipconflictchecker.metadata import parse_metadata, parse_requires_txt
+
+
+def get_payload_source():
+    """
+    Returns the source of the payload that is run in the other interpreter
+    """
+    return inspect.getsource(payload)
+
+
+def run_payload(python):
+    """
+    Runs the payload in the interpreter and returns its dump, raising OSError if the interpreter cannot be started
+    and ValueError if the payload fails or its output cannot be read
+    """
+    process = subprocess.Popen([python, '-'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate(get_payload_source().encode('utf-8'))
+    if process.returncode != 0:
+        raise ValueError(stderr.decode('utf-8', 'replace').strip() or 'exit code {0}'.format(process.returncode))
+
+    dump = json.loads(stdout.decode('utf-8'))
+    if not isinstance(dump, dict) or dump.get('version') != payload.PAYLOAD_FORMAT_VERSION:
+        raise ValueError('Unexpected payload output')
+    return dump
+
+
+class RemoteDistribution(InstalledDistribution):
+    """
+    Class that provides a distribution of another interpreter from the metadata its payload dumped. Markers are
+    evaluated against the marker environment of that interpreter.
+    """
+    def __init__(self, egg_info, metadata_text, requires_text, marker_environment):
+        super(RemoteDistribution, self).__init__(egg_info)
+        self.metadata_text = metadata_text
+        self.requires_text = requires_text
+        self.marker_environment = marker_environment
+
+    def get_metadata(self):
+        """
+        Returns the name, version and requirements, parsing the dumped text only once
+        """
+        if self._metadata is None:
+            name, version, requirements = parse_metadata((self.metadata_text or '').splitlines(True))
+            if self.requires_text is not None:
+                requirements = parse_requires_txt(self.requires_text.splitlines())
+            self._metadata = (name, version, requirements)
+        return self._metadata
+
+
+class InterpreterSource(DistributionSource):
+    """
+    Reads the distributions installed into another interpreter by running a standard library only payload in it
+    that dumps all of their metadata in one message. Nothing needs to be installed into that interpreter.
+    """
+    def __init__(self, python):
+        super(InterpreterSource, self).__init__()
+        self.python = python
+        self.dump = None
+
+    def load(self):
+        """
+        Runs the payload once and returns its dump
+        """
+        if self.dump is None:
+            self.dump = run_payload(self.python)
+        return self.dump
+
+    def get_distributions(self, jobs=1):
+        dump = self.load()
+        return [
+            RemoteDistribution(egg_info, metadata_text, requires_text, dump['environment'])
+            for egg_info, metadata_text, requires_text in dump['distributions']
+        ]
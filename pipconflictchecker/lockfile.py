@@ -0,0 +1,157 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+
+from pipconflictchecker.distributions import DistributionSource, evaluate_marker
+from pipconflictchecker.metadata import get_project_key, open_metadata, parse_requirement
+from pipconflictchecker.store import save_quietly
+from pipconflictchecker.wheelhouse import WheelhouseIndex
+
+# Options that include another requirements file
+INCLUDE_OPTIONS = ('-r', '--requirement', '-c', '--constraint')
+
+
+def iter_requirement_lines(path, seen=None):
+    """
+    Yields the requirement lines of a pip requirements file with comments, continuations and options removed,
+    following -r and -c includes relative to the file that names them
+    """
+    seen = seen if seen is not None else set()
+    path = os.path.abspath(path)
+    if path in seen:
+        return
+    seen.add(path)
+
+    with open_metadata(path) as requirements_file:
+        lines = requirements_file.read().replace('\\\n', ' ').splitlines()
+
+    for line in lines:
+        # Comments start at a hash that begins the line or follows whitespace
+        if line.startswith('#'):
+            continue
+        line = line.split(' #', 1)[0].split('\t#', 1)[0].strip()
+        if not line:
+            continue
+
+        # Options either include another file or do not name a requirement
+        if line.startswith('-'):
+            option, _, value = line.replace('=', ' ', 1).partition(' ')
+            if option in INCLUDE_OPTIONS and value.strip():
+                include_path = os.path.join(os.path.dirname(path), value.strip())
+                for include_line in iter_requirement_lines(include_path, seen):
+                    yield include_line
+            continue
+
+        # Drop per requirement options such as --hash
+        yield line.split(' --', 1)[0].strip()
+
+
+def get_pinned_version(requirement):
+    """
+    Returns the version a requirement pins with a single == or === spec, or None if it is not pinned
+    """
+    if len(requirement.specs) != 1:
+        return None
+    comparison, version = requirement.specs[0]
+    if comparison not in ('==', '===') or version.endswith('*'):
+        return None
+    return version
+
+
+class PinnedDistribution(object):
+    """
+    Class that stands in for a pinned distribution whose metadata is not available. It provides its version
+    but declares no requirements.
+    """
+    def __init__(self, project_name, version):
+        super(PinnedDistribution, self).__init__()
+        self.project_name = project_name
+        self.version = version
+
+    def __repr__(self):
+        return 'PinnedDistribution({0!r}, {1!r})'.format(self.project_name, self.version)
+
+    def requires(self, extras=()):
+        return []
+
+
+class LockfileSource(DistributionSource):
+    """
+    Builds a virtual working set from the pinned versions of a requirements or lock file, reading the metadata
+    of every pin from the wheels in a local wheelhouse through its index instead of installing anything
+    """
+    def __init__(self, requirements_path, wheelhouse, index_path=None):
+        super(LockfileSource, self).__init__()
+        self.requirements_path = requirements_path
+
+        # The wheelhouse is a directory or an index that is shared with other sources
+        if isinstance(wheelhouse, WheelhouseIndex):
+            self.wheelhouse = wheelhouse
+        else:
+            self.wheelhouse = WheelhouseIndex(wheelhouse, index_path)
+
+        # (project_name, version) of the pins that have no wheel in the wheelhouse
+        self.missing = []
+
+        # Lines that do not pin a single version
+        self.unpinned = []
+
+        # Paths of the wheels of pins that could not be read, which a shared wheelhouse reports along with others
+        self.unreadable = []
+
+    def get_pins(self):
+        """
+        Returns the (project_name, version) pins that apply to this interpreter, keeping the first pin of a project
+        """
+        pins = []
+        seen = set()
+        for line in iter_requirement_lines(self.requirements_path):
+            requirement = parse_requirement(line)
+            if requirement is not None and requirement.marker and not evaluate_marker(requirement.marker):
+                continue
+            version = get_pinned_version(requirement) if requirement is not None else None
+            if version is None:
+                self.unpinned.append(line)
+                continue
+
+            key = get_project_key(requirement.project_name)
+            if key not in seen:
+                seen.add(key)
+                pins.append((requirement.project_name, version))
+        return pins
+
+    def get_distributions(self, jobs=1):
+        """
+        Returns a distribution for every pin, falling back to one without requirements when the wheelhouse
+        has no wheel for it
+        """
+        self.missing = []
+        self.unpinned = []
+        self.unreadable = []
+        self.wheelhouse.load()
+        distributions = []
+        for project_name, version in self.get_pins():
+            dist = self.wheelhouse.get_distribution(project_name, version)
+            if dist is None:
+                path = self.wheelhouse.find_wheel(project_name, version)
+                if path is None:
+                    self.missing.append((project_name, version))
+                else:
+                    self.unreadable.append(path)
+                dist = PinnedDistribution(project_name, version)
+            distributions.append(dist)
+        save_quietly(self.wheelhouse)
+        return distributions
+
+    def get_warnings(self):
+        """
+        Returns a line for every pin that could not be checked completely
+        """
+        lines = ['Skipped a requirement that does not pin a version: {0}'.format(line) for line in self.unpinned]
+        lines.extend(
+            'No wheel for {0}=={1}, its requirements were not checked'.format(project_name, version)
+            for project_name, version in self.missing
+        )
+        lines.extend(self.wheelhouse.get_warnings(self.unreadable))
+        return lines
@@ -0,0 +1,117 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import re
+
+# Stands in for a marker that could not be parsed
+INVALID_MARKER = object()
+
+
+def _load_marker_class():
+    """
+    Returns the packaging Marker class, importing it on first use, or None when no marker implementation is
+    available
+    """
+    global _load_marker_class
+    try:
+        from packaging.markers import Marker
+    except ImportError:  # pragma: no cover
+        try:
+            from pip._vendor.packaging.markers import Marker
+        except ImportError:
+            Marker = None
+
+    def _load_marker_class():
+        return Marker
+    return Marker
+
+
+def get_extra_key(extra):
+    """
+    Returns the key two spellings of the same extra share, such as Socks_Proxy and socks-proxy
+    """
+    return re.sub(r'[-_.]+', '-', extra).lower()
+
+
+class MarkerCache(object):
+    """
+    Class that parses each distinct marker string only once and remembers its result for every extra and marker
+    environment it is evaluated against. A few hundred distinct markers repeat across thousands of requirements,
+    so nearly every evaluation is a lookup.
+    """
+    def __init__(self):
+        super(MarkerCache, self).__init__()
+
+        # marker string => parsed marker
+        self.markers = {}
+
+        # (marker string, extra, environment key) => result
+        self.results = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_marker(self, marker):
+        """
+        Returns the parsed marker for a marker string, parsing each distinct string once
+        """
+        try:
+            return self.markers[marker]
+        except KeyError:
+            pass
+
+        marker_class = _load_marker_class()
+        try:
+            parsed_marker = marker_class(marker) if marker_class is not None else INVALID_MARKER
+        except Exception:
+            parsed_marker = INVALID_MARKER
+        self.markers[marker] = parsed_marker
+        return parsed_marker
+
+    def evaluate(self, marker, extra=None, environment=None):
+        """
+        Evaluates a marker against this interpreter or the given marker environment
+        """
+        key = (marker, extra or '', tuple(sorted(environment.items())) if environment else None)
+        try:
+            result = self.results[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return result
+
+        # Evaluate the marker and remember the result
+        self.misses += 1
+        parsed_marker = self.get_marker(marker)
+        result = True
+        if parsed_marker is not INVALID_MARKER:
+            marker_environment = dict(environment or {})
+            marker_environment['extra'] = extra or ''
+            try:
+                result = parsed_marker.evaluate(marker_environment)
+            except Exception:
+                pass
+        self.results[key] = result
+        return result
+
+    def clear(self):
+        """
+        Empties the cache and resets the counters
+        """
+        self.markers.clear()
+        self.results.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Process wide cache shared by everything that evaluates markers
+marker_cache = MarkerCache()
+
+
+def evaluate_marker(marker, extra=None, environment=None):
+    """
+    Evaluates an environment marker against this interpreter or the given marker environment through the shared
+    marker cache, treating it as true when it cannot be parsed or no marker implementation is available
+    """
+    return marker_cache.evaluate(marker, extra, environment)
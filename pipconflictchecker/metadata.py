@@ -0,0 +1,217 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import re
+
+# Matches the project name and optional extras at the start of a requirement line
+REQUIREMENT_RE = re.compile(r'^\s*(?P<name>[A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[(?P<extras>[^\]]*)\])?\s*(?P<rest>.*)$')
+
+# Matches a single comparison spec such as >=1.0
+SPEC_RE = re.compile(r'^\s*(?P<comparison>~=|===|==|!=|<=|>=|<|>)\s*(?P<version>[^\s,;)]+)\s*$')
+
+# Headers the checker needs from METADATA and PKG-INFO files
+METADATA_HEADERS = ('Name', 'Version', 'Requires-Dist')
+
+# Matches the runs of separators PEP 503 collapses into a single dash
+NORMALIZE_RE = re.compile(r'[-_.]+')
+
+# Matches the extra clause of an environment marker
+EXTRA_RE = re.compile(r'''\bextra\s*==\s*['"]([^'"]+)['"]''')
+
+
+def safe_name(name):
+    """
+    Converts a project name to the same form pkg_resources uses for project_name
+    """
+    return re.sub('[^A-Za-z0-9.]+', '-', name)
+
+
+def get_project_key(name):
+    """
+    Returns the PEP 503 normalized name two spellings of the same project name share, such as Foo_Bar and foo.bar
+    """
+    return NORMALIZE_RE.sub('-', safe_name(name)).lower()
+
+
+class Requirement(object):
+    """
+    Class that contains the parts of a requirement the checker uses
+    """
+    def __init__(self, project_name, specs, extras=(), marker=None, extra=None):
+        super(Requirement, self).__init__()
+        self.project_name = project_name
+        self.specs = specs
+        self.extras = extras
+        self.marker = marker
+
+        # The extra of the requiring distribution that pulls this requirement in, if any
+        self.extra = extra
+
+    def __repr__(self):
+        return 'Requirement({0!r}, {1!r})'.format(self.project_name, self.specs)
+
+
+def dump_requirement(requirement):
+    """
+    Returns a requirement as a compact list for an index or cache
+    """
+    return [
+        requirement.project_name,
+        [list(spec) for spec in requirement.specs],
+        list(requirement.extras),
+        requirement.marker,
+        requirement.extra,
+    ]
+
+
+def load_requirement(data):
+    """
+    Returns the requirement of a list written by dump_requirement
+    """
+    project_name, specs, extras, marker, extra = data
+    return Requirement(project_name, [tuple(spec) for spec in specs], tuple(extras), marker, extra)
+
+
+def parse_requirement(line, marker=None, extra=None):
+    """
+    Parses a requirement line from Requires-Dist or requires.txt, returning None for anything that is not one
+    """
+    line, _, line_marker = line.partition(';')
+    match = REQUIREMENT_RE.match(line)
+    if not match:
+        return None
+
+    # Combine a marker from the line with the marker of the requires.txt section it came from
+    line_marker = line_marker.strip() or None
+    if line_marker and marker:
+        marker = '({0}) and ({1})'.format(marker, line_marker)
+    else:
+        marker = line_marker or marker
+
+    # Pull the requiring extra out of the marker
+    if extra is None and marker:
+        extra_match = EXTRA_RE.search(marker)
+        if extra_match:
+            extra = extra_match.group(1)
+            if EXTRA_RE.sub('', marker).strip(' ()') == '':
+                marker = None
+
+    # Parse the specs, ignoring direct references
+    specs = []
+    rest = match.group('rest').strip()
+    if not rest.startswith('@'):
+        for spec in rest.strip('()').split(','):
+            spec_match = SPEC_RE.match(spec)
+            if spec_match:
+                specs.append((spec_match.group('comparison'), spec_match.group('version')))
+
+    # Build the requirement
+    extras = tuple(
+        safe_name(name.strip()).lower()
+        for name in (match.group('extras') or '').split(',')
+        if name.strip()
+    )
+    return Requirement(safe_name(match.group('name')), specs, extras=extras, marker=marker, extra=extra)
+
+
+def open_metadata(path):
+    """
+    Opens a metadata file for reading text regardless of its encoding errors
+    """
+    return io.open(path, encoding='utf-8', errors='replace')
+
+
+def parse_metadata_headers(lines, names=METADATA_HEADERS):
+    """
+    Returns a dict of header name => list of values for the wanted headers in the lines of a METADATA or
+    PKG-INFO file. Reading stops at the blank line that starts the description, so the size of an embedded
+    README does not matter.
+    """
+    headers = {}
+    values = None
+    for line in lines:
+        # A blank line ends the headers
+        if not line.rstrip('\r\n'):
+            break
+
+        # Continuation lines belong to the previous header
+        if line[0] in ' \t':
+            if values is not None:
+                values[-1] = '{0} {1}'.format(values[-1], line.strip())
+            continue
+
+        # Anything that is not a header also ends the headers
+        name, separator, value = line.partition(':')
+        if not separator:
+            break
+
+        # Only keep the headers that were asked for
+        name = name.strip()
+        if name in names:
+            values = headers.setdefault(name, [])
+            values.append(value.strip())
+        else:
+            values = None
+
+    # Return the headers
+    return headers
+
+
+def parse_metadata(lines):
+    """
+    Returns the name, version and requirements declared in the lines of a METADATA or PKG-INFO file
+    """
+    headers = parse_metadata_headers(lines)
+
+    requirements = []
+    for line in headers.get('Requires-Dist', []):
+        requirement = parse_requirement(line)
+        if requirement is not None:
+            requirements.append(requirement)
+
+    name = headers.get('Name', [None])[0]
+    version = headers.get('Version', [None])[0]
+    return name, version, requirements
+
+
+def read_metadata(path):
+    """
+    Returns the name, version and requirements declared in a METADATA or PKG-INFO file
+    """
+    with open_metadata(path) as metadata_file:
+        return parse_metadata(metadata_file)
+
+
+def parse_requires_txt(lines):
+    """
+    Returns the requirements listed in the lines of an egg-info requires.txt file
+    """
+    requirements = []
+    extra = None
+    marker = None
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        # Sections are [extra], [:marker] or [extra:marker]
+        if line.startswith('[') and line.endswith(']'):
+            extra, _, marker = line[1:-1].partition(':')
+            extra = safe_name(extra.strip()).lower() or None
+            marker = marker.strip() or None
+            continue
+
+        requirement = parse_requirement(line, marker=marker, extra=extra)
+        if requirement is not None:
+            requirements.append(requirement)
+
+    return requirements
+
+
+def read_requires_txt(path):
+    """
+    Returns the requirements listed in an egg-info requires.txt file
+    """
+    with open_metadata(path) as requires_file:
+        return parse_requires_txt(requires_file)
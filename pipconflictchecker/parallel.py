@@ -0,0 +1,59 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from multiprocessing.pool import Pool, ThreadPool
+
+
+def thread_map(function, items, jobs=1):
+    """
+    Calls the function on every item with up to jobs threads, returning the results in the order of the items
+    """
+    items = list(items)
+    if jobs <= 1 or len(items) <= 1:
+        return [function(item) for item in items]
+
+    pool = ThreadPool(min(jobs, len(items)))
+    try:
+        return pool.map(function, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def thread_imap(function, items, jobs=1):
+    """
+    Yields the result of calling the function on every item in the order of the items, with up to jobs threads
+    working ahead of the consumer. Closing the generator early stops the threads.
+    """
+    if jobs <= 1:
+        for item in items:
+            yield function(item)
+        return
+
+    pool = ThreadPool(jobs)
+    try:
+        for result in pool.imap(function, items):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def process_map(function, items, jobs=1, initializer=None):
+    """
+    Calls the function on every item with up to jobs worker processes, returning the results in the order of
+    the items. The initializer runs once in every worker, or once in this process when the items are mapped
+    serially. The function, items and results must be picklable.
+    """
+    items = list(items)
+    if jobs <= 1 or len(items) <= 1:
+        if initializer is not None:
+            initializer()
+        return [function(item) for item in items]
+
+    pool = Pool(min(jobs, len(items)), initializer=initializer)
+    try:
+        return pool.map(function, items)
+    finally:
+        pool.close()
+        pool.join()
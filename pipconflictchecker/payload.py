@@ -0,0 +1,162 @@
+"""
+Standard library only script that runs inside another interpreter to dump its installed distributions. It must
+keep working on every Python version the checker supports and must not import anything from pipconflictchecker.
+It writes a single JSON message holding the marker environment of the interpreter and, for every distribution,
+the path of its metadata entry or egg, the headers of its METADATA or PKG-INFO and the contents of its requires.txt.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import platform
+import re
+import sys
+import zipfile
+
+# Bumped whenever the layout of the dump changes
+PAYLOAD_FORMAT_VERSION = 1
+
+# Suffixes of the directory entries that hold distribution metadata
+METADATA_SUFFIXES = ('.dist-info', '.egg-info')
+
+# Suffix of an egg, a directory with its metadata in EGG-INFO or a zip file of one
+EGG_SUFFIX = '.egg'
+
+
+def format_full_version(info):
+    """
+    Returns a version_info style tuple as a PEP 508 full version
+    """
+    version = '{0}.{1}.{2}'.format(info[0], info[1], info[2])
+    if info[3] != 'final':
+        version = '{0}{1}{2}'.format(version, info[3][0], info[4])
+    return version
+
+
+def get_marker_environment():
+    """
+    Returns the PEP 508 marker environment of this interpreter
+    """
+    implementation = getattr(sys, 'implementation', None)
+    return {
+        'implementation_name': implementation.name if implementation else '',
+        'implementation_version': format_full_version(implementation.version) if implementation else '0',
+        'os_name': os.name,
+        'platform_machine': platform.machine(),
+        'platform_python_implementation': platform.python_implementation(),
+        'platform_release': platform.release(),
+        'platform_system': platform.system(),
+        'platform_version': platform.version(),
+        'python_full_version': platform.python_version(),
+        'python_version': '.'.join(platform.python_version_tuple()[:2]),
+        'sys_platform': sys.platform,
+    }
+
+
+def read_text(path, headers_only=False):
+    """
+    Returns the text of a metadata file, stopping at the blank line that ends the headers when asked, or None
+    if it cannot be read
+    """
+    lines = []
+    try:
+        with io.open(path, encoding='utf-8', errors='replace') as metadata_file:
+            for line in metadata_file:
+                if headers_only and not line.rstrip('\r\n'):
+                    break
+                lines.append(line)
+    except (IOError, OSError):
+        return None
+    return ''.join(lines)
+
+
+def get_entry_key(entry):
+    """
+    Returns the key two metadata entries of the same project share
+    """
+    name = re.sub('[^A-Za-z0-9.]+', '-', os.path.splitext(entry)[0].split('-')[0])
+    return name.replace('.', '-').lower()
+
+
+def read_zip_text(path, name, headers_only=False):
+    """
+    Returns the text of a file inside a zip file, stopping at the blank line that ends the headers when asked, or
+    None if it cannot be read
+    """
+    try:
+        with zipfile.ZipFile(path) as zip_file:
+            text = zip_file.read(name).decode('utf-8', 'replace')
+    except (IOError, OSError, KeyError, zipfile.BadZipfile):
+        return None
+    if headers_only:
+        text = re.split(r'\r?\n\r?\n', text, 1)[0] + '\n'
+    return text
+
+
+def dump_egg(egg):
+    """
+    Returns the [egg, metadata headers, requires.txt] dump of an egg directory or zipped egg
+    """
+    if os.path.isdir(egg):
+        dump = dump_distribution(os.path.join(egg, 'EGG-INFO'))
+        return [egg] + dump[1:]
+    metadata = read_zip_text(egg, 'EGG-INFO/PKG-INFO', headers_only=True)
+    return [egg, metadata, read_zip_text(egg, 'EGG-INFO/requires.txt') or '']
+
+
+def dump_distribution(egg_info):
+    """
+    Returns the [egg_info, metadata headers, requires.txt] dump of a metadata entry or egg
+    """
+    if egg_info.endswith(EGG_SUFFIX):
+        return dump_egg(egg_info)
+    if egg_info.endswith('.dist-info'):
+        return [egg_info, read_text(os.path.join(egg_info, 'METADATA'), headers_only=True), None]
+    if os.path.isdir(egg_info):
+        metadata = read_text(os.path.join(egg_info, 'PKG-INFO'), headers_only=True)
+        return [egg_info, metadata, read_text(os.path.join(egg_info, 'requires.txt')) or '']
+    return [egg_info, read_text(egg_info, headers_only=True), None]
+
+
+def get_distributions(paths):
+    """
+    Returns the dumps of the distributions on the paths, where the first path that provides a project wins
+    """
+    distributions = []
+    seen = set()
+    for path in paths:
+        # The empty path is the working directory the payload happens to run in
+        if not path:
+            continue
+        if path.endswith(EGG_SUFFIX):
+            path, entries = os.path.split(path)
+            entries = [entries]
+        else:
+            try:
+                entries = sorted(
+                    entry for entry in os.listdir(path)
+                    if entry.endswith(METADATA_SUFFIXES) or entry.endswith(EGG_SUFFIX)
+                )
+            except (OSError, TypeError):
+                continue
+
+        for entry in entries:
+            key = get_entry_key(entry)
+            if key not in seen:
+                seen.add(key)
+                distributions.append(dump_distribution(os.path.join(path, entry)))
+    return distributions
+
+
+def main(output=sys.stdout):
+    json.dump({
+        'version': PAYLOAD_FORMAT_VERSION,
+        'environment': get_marker_environment(),
+        'distributions': get_distributions(sys.path),
+    }, output)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,353 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import gzip
+import io
+import json
+from collections import namedtuple
+
+from pipconflictchecker.markers import get_extra_key
+from pipconflictchecker.metadata import get_project_key
+from pipconflictchecker.parallel import thread_map
+
+# Bumped whenever the layout of snapshot files changes
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+# The metadata of a distribution. requirements holds the (project_name, specs) requirements that always apply and
+# extra_requirements maps each extra the distribution provides to the (project_name, specs) requirements it adds.
+# requested_extras holds an (extra of this distribution or None, project_name, extra) entry for every extra this
+# distribution asks of another project, which only counts while its own extra is requested too.
+DistributionMetadata = namedtuple(
+    'DistributionMetadata',
+    ['project_name', 'version', 'requirements', 'extra_requirements', 'requested_extras']
+)
+
+
+def read_distribution(dist):
+    """
+    Returns the DistributionMetadata of a distribution, only keeping the requirements whose markers apply
+    """
+    base_requirements = dist.requires()
+    requirements = []
+    requested_extras = []
+    for requirement in base_requirements:
+        requirements.append((requirement.project_name, requirement.specs))
+        requested_extras.extend(
+            (None, requirement.project_name, get_extra_key(extra))
+            for extra in requirement.extras
+        )
+
+    # Read the requirements each extra adds on top of the ones that always apply
+    extra_requirements = {}
+    for extra in getattr(dist, 'extras', ()):
+        extra_key = get_extra_key(extra)
+        added = [requirement for requirement in dist.requires((extra,)) if requirement not in base_requirements]
+        extra_requirements[extra_key] = [(requirement.project_name, requirement.specs) for requirement in added]
+        requested_extras.extend(
+            (extra_key, requirement.project_name, get_extra_key(requested_extra))
+            for requirement in added
+            for requested_extra in requirement.extras
+        )
+    return DistributionMetadata(dist.project_name, dist.version, requirements, extra_requirements, requested_extras)
+
+
+class EnvironmentSnapshot(object):
+    """
+    Class that holds everything the checker needs to know about an environment, built in a single pass
+    """
+    def __init__(self):
+        super(EnvironmentSnapshot, self).__init__()
+
+        # project_name => version installed
+        self.installed_versions = {}
+
+        # project_name => dict of the normalized name of each required project => set of specs, including the
+        # requirements of the extras that are requested
+        self.requirements = {}
+
+        # Name index, every spelling of a name => its PEP 503 normalized name so each spelling is only normalized
+        # once, and normalized name => project_name of the installed distribution. Requirements are joined to the
+        # installed projects through it however either of them spells the name.
+        self.name_keys = {}
+        self.installed_names = {}
+
+        # normalized name => name shown for a project that is not installed, the first spelling that required it
+        self.display_names = {}
+
+        # project_name => list of (required project_name, specs) the project declares, without those of its extras
+        self.declared_requirements = {}
+
+        # project_name => dict of extra => list of (required project_name, specs) the extra adds
+        self.extra_requirements = {}
+
+        # project_name => list of (extra of the project or None, project_name, extra) it requests
+        self.requested_extras = {}
+
+        # normalized name => set of the extras requested of it, whether it is installed or not
+        self.active_extras = {}
+
+    @classmethod
+    def from_distributions(cls, distributions, metadata_cache=None, jobs=1):
+        """
+        Builds a snapshot by walking the distributions exactly once, reading through the metadata cache if given.
+        Metadata is read with up to jobs threads and added in the order of the distributions.
+        """
+        reader = metadata_cache.read_distribution if metadata_cache is not None else read_distribution
+        snapshot = cls()
+        for dist_metadata in thread_map(reader, distributions, jobs):
+            snapshot.add_distribution(*dist_metadata)
+
+        # Return the snapshot
+        return snapshot
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds a snapshot from a dict written by to_dict, raising ValueError if it is not one
+        """
+        if not isinstance(data, dict) or data.get('version') != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError('Not a version {0} snapshot'.format(SNAPSHOT_FORMAT_VERSION))
+
+        snapshot = cls()
+        try:
+            for project_name, (version, requirements) in data['distributions'].items():
+                snapshot.add_distribution(project_name, version, [
+                    (required_project_name, [tuple(spec) for spec in specs])
+                    for required_project_name, specs in requirements.items()
+                ])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            raise ValueError('Malformed snapshot')
+
+        # Return the snapshot
+        return snapshot
+
+    @classmethod
+    def load(cls, path):
+        """
+        Loads a snapshot file written by save, raising ValueError if it is not one
+        """
+        opener = gzip.open if path.endswith('.gz') else io.open
+        with opener(path, 'rb') as snapshot_file:
+            return cls.from_dict(json.loads(snapshot_file.read().decode('utf-8')))
+
+    def to_dict(self):
+        """
+        Returns the installed versions and requirement edges as a dict of plain lists and dicts
+        """
+        return {
+            'version': SNAPSHOT_FORMAT_VERSION,
+            'distributions': dict(
+                (project_name, [version, dict(
+                    (self.get_display_name(required_key), sorted(list(spec) for spec in specs))
+                    for required_key, specs in self.requirements.get(project_name, {}).items()
+                )])
+                for project_name, version in self.installed_versions.items()
+            ),
+        }
+
+    def save(self, path):
+        """
+        Writes the snapshot to a compact JSON file, compressed with gzip when the path ends with .gz
+        """
+        data = json.dumps(self.to_dict(), separators=(',', ':'), sort_keys=True).encode('utf-8')
+        opener = gzip.open if path.endswith('.gz') else io.open
+        with opener(path, 'wb') as snapshot_file:
+            snapshot_file.write(data)
+
+    def add_distribution(self, project_name, version, requirements, extra_requirements=None, requested_extras=None):
+        """
+        Records an installed distribution with the requirements it declares and the requirements of its extras,
+        and returns the (requirer, required project_name) edges that were added. Requesting an extra of a project
+        adds the requirements of that extra to it, whichever of the two is added first.
+        """
+        self.installed_versions[project_name] = version
+        self.installed_names[self.get_name_key(project_name)] = project_name
+        requirements = list(requirements)
+        self.declared_requirements.setdefault(project_name, []).extend(requirements)
+        edges = self.merge_requirements(project_name, requirements)
+        if extra_requirements:
+            self.extra_requirements.setdefault(project_name, {}).update(extra_requirements)
+        if requested_extras:
+            self.requested_extras.setdefault(project_name, []).extend(requested_extras)
+
+        # Apply the extras requested of this project and the extras it requests, following the chain of requests
+        queue = [(project_name, None)] + [
+            (project_name, extra) for extra in self.active_extras.get(self.get_name_key(project_name), ())
+        ]
+        while queue:
+            requirer, extra = queue.pop()
+            if extra is not None:
+                edges.extend(self.merge_requirements(
+                    requirer,
+                    self.extra_requirements.get(requirer, {}).get(extra, ())
+                ))
+            for requiring_extra, required_project_name, required_extra in self.requested_extras.get(requirer, ()):
+                required_key = self.get_name_key(required_project_name)
+                active_extras = self.active_extras.setdefault(required_key, set())
+                if requiring_extra != extra or required_extra in active_extras:
+                    continue
+                active_extras.add(required_extra)
+                if required_key in self.installed_names:
+                    queue.append((self.installed_names[required_key], required_extra))
+
+        # Return the added edges
+        return edges
+
+    def merge_requirements(self, project_name, requirements):
+        """
+        Merges requirements into those of a project in case the same project is seen more than once, and returns
+        the (project_name, normalized name of the required project) edges
+        """
+        dist_requirements = self.requirements.setdefault(project_name, {})
+        edges = []
+        for required_project_name, specs in requirements:
+            required_key = self.get_name_key(required_project_name)
+            self.display_names.setdefault(required_key, required_project_name)
+            dist_requirements.setdefault(required_key, set()).update(specs)
+            edges.append((project_name, required_key))
+        return edges
+
+    def get_name_key(self, name):
+        """
+        Returns the normalized name of a project name, normalizing each spelling only once
+        """
+        try:
+            return self.name_keys[name]
+        except KeyError:
+            pass
+        key = self.name_keys[name] = get_project_key(name)
+        return key
+
+    def get_installed_name(self, name):
+        """
+        Returns the project_name of the installed distribution of a project however the name is spelled, or None
+        if it is not installed
+        """
+        return self.installed_names.get(self.get_name_key(name))
+
+    def get_display_name(self, key):
+        """
+        Returns the name to show for a normalized name, the installed project_name when there is one
+        """
+        return self.installed_names.get(key) or self.display_names.get(key, key)
+
+    def remove_distribution(self, project_name):
+        """
+        Forgets an installed distribution along with the extras no other project requests any more, and returns
+        the (requirer, normalized name of the required project) edges that were removed or lost specs
+        """
+        self.installed_versions.pop(project_name, None)
+        if self.get_installed_name(project_name) == project_name:
+            del self.installed_names[self.get_name_key(project_name)]
+        self.declared_requirements.pop(project_name, None)
+        self.extra_requirements.pop(project_name, None)
+        requested_extras = self.requested_extras.pop(project_name, None)
+        edges = [(project_name, required_key) for required_key in self.requirements.pop(project_name, {})]
+        if requested_extras:
+            edges.extend(self.refresh_active_extras())
+        return edges
+
+    def get_requested_extras(self):
+        """
+        Returns a dict of normalized name => set of the extras the installed projects request of it, following
+        the chain of requests
+        """
+        active_extras = {}
+        queue = [(project_name, None) for project_name in self.installed_versions]
+        while queue:
+            requirer, extra = queue.pop()
+            for requiring_extra, required_project_name, required_extra in self.requested_extras.get(requirer, ()):
+                required_key = self.get_name_key(required_project_name)
+                extras = active_extras.setdefault(required_key, set())
+                if requiring_extra != extra or required_extra in extras:
+                    continue
+                extras.add(required_extra)
+                if required_key in self.installed_names:
+                    queue.append((self.installed_names[required_key], required_extra))
+        return active_extras
+
+    def refresh_active_extras(self):
+        """
+        Works out the extras that are still requested and takes the requirements of the extras that no longer are
+        back out of the projects that provide them. Returns the (requirer, normalized name of the required project)
+        edges that lost specs.
+        """
+        active_extras = self.get_requested_extras()
+        edges = []
+        for required_key, extras in self.active_extras.items():
+            project_name = self.installed_names.get(required_key)
+            if project_name is None or extras <= active_extras.get(required_key, set()):
+                continue
+
+            # Merge the declared requirements and those of the extras left again
+            previous = self.requirements.pop(project_name, {})
+            self.merge_requirements(project_name, self.declared_requirements.get(project_name, ()))
+            for extra in active_extras.get(required_key, ()):
+                self.merge_requirements(project_name, self.extra_requirements.get(project_name, {}).get(extra, ()))
+            requirements = self.requirements[project_name]
+            edges.extend(
+                (project_name, key) for key, specs in previous.items()
+                if requirements.get(key) != specs
+            )
+        self.active_extras = active_extras
+        return edges
+
+    def save_state(self, project_names):
+        """
+        Returns a copy of everything recorded about the projects and of the extras requested in the environment,
+        which restore_state puts back after the projects were changed
+        """
+        projects = dict(
+            (project_name, (
+                self.installed_versions.get(project_name),
+                list(self.declared_requirements.get(project_name, ())),
+                dict((key, set(specs)) for key, specs in self.requirements.get(project_name, {}).items()),
+                dict(self.extra_requirements.get(project_name, {})),
+                list(self.requested_extras.get(project_name, ())),
+            ))
+            for project_name in project_names
+        )
+        active_extras = dict((key, set(extras)) for key, extras in self.active_extras.items())
+        return projects, active_extras
+
+    def restore_state(self, state):
+        """
+        Puts back the projects and extras saved by save_state, forgetting the projects that were not installed then
+        """
+        projects, active_extras = state
+        for project_name, project_state in projects.items():
+            version, declared_requirements, requirements, extra_requirements, requested_extras = project_state
+            self.remove_distribution(project_name)
+            if version is None:
+                continue
+            self.installed_versions[project_name] = version
+            self.installed_names[self.get_name_key(project_name)] = project_name
+            self.declared_requirements[project_name] = declared_requirements
+            self.requirements[project_name] = requirements
+            if extra_requirements:
+                self.extra_requirements[project_name] = extra_requirements
+            if requested_extras:
+                self.requested_extras[project_name] = requested_extras
+        self.active_extras = active_extras
+
+    def get_requirement_versions(self):
+        """
+        Returns a dictionary of project_name => dict of projects that requires it with lists of requirements.
+        Required projects are keyed by the project_name they are installed under, however they were required.
+        """
+        requirement_versions = {}
+        for project_name, requirements in self.requirements.items():
+            requirement_versions.setdefault(project_name, {})
+            for required_key, specs in requirements.items():
+                required_by = requirement_versions.setdefault(self.get_display_name(required_key), {})
+                required_by[project_name] = set(specs)
+
+        # Return the dict
+        return requirement_versions
+
+    def get_installed_versions(self):
+        """
+        Returns a dict of project_name => version installed
+        """
+        return dict(self.installed_versions)
@@ -0,0 +1,273 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from bisect import bisect_right
+from collections import namedtuple
+
+from pipconflictchecker.versions import parse_version
+
+# Comparisons that bound a range, the others only ever match version strings exactly
+RANGE_COMPARISONS = ('<', '<=', '>', '>=')
+
+
+class Comparator(tuple):
+    """
+    A (comparison, version) spec with the version of its range bound parsed once. It still
+    behaves like the plain spec tuple so it can be used anywhere a spec is expected.
+    """
+    def __new__(cls, comparison, version):
+        comparator = super(Comparator, cls).__new__(cls, (comparison, version))
+
+        # Bounds of == and != are not parsed since they are matched as strings and may be wildcards like 2.0.*
+        comparator.parsed_version = parse_version(version) if comparison in RANGE_COMPARISONS else None
+        return comparator
+
+    @property
+    def comparison(self):
+        return self[0]
+
+    @property
+    def version(self):
+        return self[1]
+
+
+def compile_specs(specs):
+    """
+    Compiles a list of specs into comparators, leaving any already compiled specs alone
+    """
+    return [
+        spec if isinstance(spec, Comparator) else Comparator(*spec)
+        for spec in specs
+    ]
+
+
+def get_version_ranges(specs):
+    """
+    Pairs the sorted min and max specs into the ranges that a version has to exist within
+    """
+    # List of all allowed ranges
+    ranges = []
+
+    # Keep track of the minimum and maximum required specs
+    min_spec = None
+    max_spec = None
+
+    # Loop over all the required specs and calculate the ranges
+    for spec in specs:
+        comparison = spec[0]
+
+        # Check if this should be the max
+        if comparison in ['<=', '<']:
+            max_spec = spec
+
+        # Check if this should be the min value
+        elif comparison in ['>=', '>']:
+            min_spec = spec
+
+        # Check if we have both a min and a max spec if so push it onto the ranges and reset
+        if min_spec and max_spec:
+            ranges.append((min_spec, max_spec))
+            min_spec = None
+            max_spec = None
+
+    # Add the last range if we need to
+    if min_spec or max_spec:
+        ranges.append((min_spec, max_spec))
+
+    # Return the ranges
+    return ranges
+
+
+class Interval(namedtuple('Interval', ['lower', 'lower_inclusive', 'upper', 'upper_inclusive'])):
+    """
+    A range of parsed versions where a bound of None means the range is unbounded on that side
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_range(cls, spec_range):
+        min_spec, max_spec = spec_range
+        return cls(
+            lower=min_spec.parsed_version if min_spec else None,
+            lower_inclusive=bool(min_spec) and min_spec.comparison == '>=',
+            upper=max_spec.parsed_version if max_spec else None,
+            upper_inclusive=bool(max_spec) and max_spec.comparison == '<=',
+        )
+
+    def get_sort_key(self):
+        """
+        Sorts unbounded intervals first, then by lower bound with inclusive bounds before exclusive ones
+        """
+        if self.lower is None:
+            return (False,)
+        return (True, self.lower, not self.lower_inclusive)
+
+    def is_empty(self):
+        if self.lower is None or self.upper is None:
+            return False
+        if self.lower == self.upper:
+            return not (self.lower_inclusive and self.upper_inclusive)
+        return self.lower > self.upper
+
+    def overlaps_next(self, interval):
+        """
+        Determine if an interval starting at or after this one touches or overlaps it
+        """
+        if self.upper is None or interval.lower is None:
+            return True
+        if interval.lower == self.upper:
+            return self.upper_inclusive or interval.lower_inclusive
+        return interval.lower < self.upper
+
+    def merge(self, interval):
+        """
+        Returns the union of this interval and an overlapping interval that starts at or after it
+        """
+        if self.upper is None or interval.upper is None:
+            return self._replace(upper=None, upper_inclusive=False)
+        if interval.upper > self.upper:
+            return self._replace(upper=interval.upper, upper_inclusive=interval.upper_inclusive)
+        if interval.upper == self.upper:
+            return self._replace(upper_inclusive=self.upper_inclusive or interval.upper_inclusive)
+        return self
+
+    def intersect(self, interval):
+        """
+        Returns the versions this interval has in common with another, which may be an empty interval
+        """
+        lower, lower_inclusive = self.lower, self.lower_inclusive
+        if interval.lower is not None and (lower is None or interval.lower > lower):
+            lower, lower_inclusive = interval.lower, interval.lower_inclusive
+        elif interval.lower is not None and interval.lower == lower:
+            lower_inclusive = lower_inclusive and interval.lower_inclusive
+
+        upper, upper_inclusive = self.upper, self.upper_inclusive
+        if interval.upper is not None and (upper is None or interval.upper < upper):
+            upper, upper_inclusive = interval.upper, interval.upper_inclusive
+        elif interval.upper is not None and interval.upper == upper:
+            upper_inclusive = upper_inclusive and interval.upper_inclusive
+        return Interval(lower, lower_inclusive, upper, upper_inclusive)
+
+    def ends_before(self, interval):
+        """
+        Determine if this interval ends before another one does
+        """
+        if self.upper is None:
+            return False
+        if interval.upper is None or self.upper < interval.upper:
+            return True
+        return self.upper == interval.upper and interval.upper_inclusive and not self.upper_inclusive
+
+    def contains(self, parsed_version):
+        if self.lower is not None:
+            if parsed_version < self.lower or (parsed_version == self.lower and not self.lower_inclusive):
+                return False
+        if self.upper is not None:
+            if parsed_version > self.upper or (parsed_version == self.upper and not self.upper_inclusive):
+                return False
+        return True
+
+
+def normalize_intervals(intervals):
+    """
+    Sorts intervals and merges them into a list of disjoint intervals, dropping empty ones
+    """
+    intervals = sorted(
+        [interval for interval in intervals if not interval.is_empty()],
+        key=lambda interval: interval.get_sort_key()
+    )
+
+    # Merge every interval into the previous one when they touch
+    normalized = []
+    for interval in intervals:
+        if normalized and normalized[-1].overlaps_next(interval):
+            normalized[-1] = normalized[-1].merge(interval)
+        else:
+            normalized.append(interval)
+
+    # Return the disjoint intervals
+    return normalized
+
+
+def intersect_intervals(intervals, other_intervals):
+    """
+    Returns the disjoint intervals of the versions two sorted lists of disjoint intervals have in common, walking
+    both lists once
+    """
+    intersection = []
+    index = 0
+    other_index = 0
+    while index < len(intervals) and other_index < len(other_intervals):
+        interval = intervals[index]
+        other_interval = other_intervals[other_index]
+        common = interval.intersect(other_interval)
+        if not common.is_empty():
+            intersection.append(common)
+
+        # Move past the interval that ends first, it cannot overlap anything after the other one
+        if interval.ends_before(other_interval):
+            index += 1
+        else:
+            other_index += 1
+
+    # Return the common intervals
+    return intersection
+
+
+# Interval of every version
+UNBOUNDED = Interval(lower=None, lower_inclusive=False, upper=None, upper_inclusive=False)
+
+
+class CompiledSpec(object):
+    """
+    A set of specs normalized into sorted disjoint intervals plus hashed exact and excluded versions. It does
+    not depend on any installed version so one instance can check any number of candidate versions.
+    """
+    def __init__(self, specs):
+        super(CompiledSpec, self).__init__()
+        compiled_specs = compile_specs(specs)
+        bounds = sorted(
+            [spec for spec in compiled_specs if spec.parsed_version is not None],
+            key=lambda spec: spec.parsed_version
+        )
+        bounds.extend(sorted(spec for spec in compiled_specs if spec.parsed_version is None))
+        self.specs = tuple(bounds)
+        self.ranges = get_version_ranges(self.specs)
+        self.intervals = normalize_intervals([Interval.from_range(spec_range) for spec_range in self.ranges])
+        self.exacts = frozenset(spec.version for spec in self.specs if spec.comparison == '==')
+        self.excludes = frozenset(spec.version for spec in self.specs if spec.comparison == '!=')
+
+        # Only the first interval can be unbounded below, so keep the bounded lower bounds for bisecting
+        self.lower_bounds = [interval.lower for interval in self.intervals if interval.lower is not None]
+        self.unbounded_offset = len(self.intervals) - len(self.lower_bounds)
+
+    def in_ranges(self, parsed_version):
+        """
+        Determine if a parsed version is in one of the ranges
+        """
+        if not self.ranges:
+            return True
+
+        # Find the last interval starting at or before the version, it is the only one that can contain it
+        index = bisect_right(self.lower_bounds, parsed_version) - 1 + self.unbounded_offset
+        if index < 0:
+            return False
+        return self.intervals[index].contains(parsed_version)
+
+    def get_allowed_intervals(self):
+        """
+        Returns the intervals a version has to be in, which is every version when there are no ranges
+        """
+        return self.intervals if self.ranges else [UNBOUNDED]
+
+    def in_exacts(self, version):
+        """
+        Determine if a version matches one of the exact versions
+        """
+        return version in self.exacts
+
+    def in_excludes(self, version):
+        """
+        Determine if a version matches one of the excluded versions
+        """
+        return version in self.excludes
@@ -0,0 +1,108 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import cProfile
+import pstats
+import timeit
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    # Python 2
+    tracemalloc = None
+
+# Number of functions and allocation sites listed in a profile report
+PROFILE_LIMIT = 30
+
+
+class Stats(object):
+    """
+    Class that collects the wall time of each phase of a check and counts of the work done
+    """
+    def __init__(self):
+        super(Stats, self).__init__()
+        self.timings = OrderedDict()
+        self.counts = OrderedDict()
+
+        # Time spent in nested phases of each open phase
+        self.nested_seconds = []
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Adds the wall time spent inside the with block to the named phase. Time spent in a phase nested inside
+        another only counts towards the inner phase, so the phases always add up to the total.
+        """
+        start = timeit.default_timer()
+        self.nested_seconds.append(0.0)
+        try:
+            yield
+        finally:
+            seconds = timeit.default_timer() - start
+            self.add_time(name, seconds - self.nested_seconds.pop())
+            if self.nested_seconds:
+                self.nested_seconds[-1] += seconds
+
+    def add_time(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def count(self, name, amount=1):
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def to_dict(self):
+        return {
+            'timings': OrderedDict(self.timings),
+            'counts': OrderedDict(self.counts),
+        }
+
+
+def format_stats(stats):
+    """
+    Returns the lines of the report for a dict of timings and counts
+    """
+    lines = [
+        '-' * 50,
+        ' Stats',
+        '-' * 50,
+    ]
+    for name, seconds in stats['timings'].items():
+        lines.append(' {0:<32}{1:>12.2f}ms'.format(name.replace('_', ' '), seconds * 1000))
+    for name, amount in stats['counts'].items():
+        lines.append(' {0:<32}{1:>14}'.format(name.replace('_', ' '), amount))
+    return lines
+
+
+def profile_call(function, path):
+    """
+    Calls the function under cProfile and tracemalloc, writes a text report to path and the raw
+    profile to path.prof, and returns what the function returned
+    """
+    profiler = cProfile.Profile()
+    if tracemalloc is not None:
+        tracemalloc.start()
+    try:
+        result = profiler.runcall(function)
+        memory = None
+        if tracemalloc is not None:
+            memory = (tracemalloc.get_traced_memory()[1], tracemalloc.take_snapshot())
+    finally:
+        if tracemalloc is not None:
+            tracemalloc.stop()
+
+    # Keep the raw profile so it can be loaded with pstats later
+    profiler.dump_stats('{0}.prof'.format(path))
+
+    # Write the readable report
+    with open(path, 'w') as report_file:
+        if memory is not None:
+            peak, snapshot = memory
+            report_file.write('tracemalloc peak: {0} bytes\n\n'.format(peak))
+            for statistic in snapshot.statistics('lineno')[:PROFILE_LIMIT]:
+                report_file.write('{0}\n'.format(statistic))
+            report_file.write('\n')
+        pstats.Stats(profiler, stream=report_file).sort_stats('cumulative').print_stats(PROFILE_LIMIT)
+
+    # Return the result of the call
+    return result
@@ -0,0 +1,46 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import json
+import os
+
+
+def load_entries(path, format_version):
+    """
+    Returns the entries of a JSON store file, or an empty dict if the file is missing, unreadable or from another
+    format version
+    """
+    try:
+        with open(path) as store_file:
+            data = json.load(store_file)
+    except (IOError, OSError, ValueError):
+        return {}
+
+    if isinstance(data, dict) and data.get('version') == format_version:
+        return data.get('entries', {})
+    return {}
+
+
+def save_entries(path, format_version, entries):
+    """
+    Writes the entries to a JSON store file, creating its directory if needed
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    # Write to a temporary file first so a concurrent run never sees a partial file
+    temp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+    with open(temp_path, 'w') as store_file:
+        json.dump({'version': format_version, 'entries': entries}, store_file, separators=(',', ':'))
+    os.rename(temp_path, path)
+
+
+def save_quietly(store):
+    """
+    Persists a metadata cache or a wheelhouse index, a store that cannot be written never fails the check
+    """
+    try:
+        store.save()
+    except (IOError, OSError):
+        pass
@@ -0,0 +1,121 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from bisect import bisect_left, bisect_right
+from collections import namedtuple, OrderedDict
+
+from pipconflictchecker.specs import intersect_intervals, UNBOUNDED
+from pipconflictchecker.versions import parse_version
+
+# The newest candidate version of a conflicting project that every requirer accepts, or None if there is none,
+# and the (requirer, specs) of every project that requires it
+Suggestion = namedtuple('Suggestion', ['project_name', 'version', 'requirements'])
+
+
+def get_index_range(parsed_versions, interval):
+    """
+    Returns the (start, stop) indexes of the sorted parsed versions that are inside the interval
+    """
+    start = 0
+    stop = len(parsed_versions)
+    if interval.lower is not None:
+        search = bisect_left if interval.lower_inclusive else bisect_right
+        start = search(parsed_versions, interval.lower)
+    if interval.upper is not None:
+        search = bisect_right if interval.upper_inclusive else bisect_left
+        stop = search(parsed_versions, interval.upper)
+    return start, stop
+
+
+class VersionSuggester(object):
+    """
+    Class that finds the newest version of a conflicting project in a wheelhouse that satisfies every project that
+    requires it. The ranges of all the requirers are intersected first and the sorted candidate versions are binary
+    searched for the intersection, then each candidate is validated the same way the checker validates installed
+    versions, so a suggestion never conflicts with what the checker would report.
+    """
+    def __init__(self, snapshot, wheelhouse, validation_cache):
+        super(VersionSuggester, self).__init__()
+        self.snapshot = snapshot
+        self.wheelhouse = wheelhouse
+        self.validation_cache = validation_cache
+
+        # normalized name => (versions, parsed versions, version => index) of the wheels of a project in version
+        # order
+        self.candidates = {}
+
+    def get_candidates(self, project_name):
+        """
+        Returns the versions, parsed versions and index of each version of the wheels of a project in version
+        order, sorting them once
+        """
+        key = self.snapshot.get_name_key(project_name)
+        if key not in self.candidates:
+            versions = sorted(self.wheelhouse.get_wheels().get(key, {}), key=parse_version)
+            self.candidates[key] = (
+                versions,
+                [parse_version(version) for version in versions],
+                dict((version, index) for index, version in enumerate(versions))
+            )
+        return self.candidates[key]
+
+    def get_requirements(self, project_name):
+        """
+        Returns the (requirer, specs) of every project that requires a project
+        """
+        key = self.snapshot.get_name_key(project_name)
+        return sorted(
+            (requirer, sorted(requirements[key]))
+            for requirer, requirements in self.snapshot.requirements.items()
+            if key in requirements
+        )
+
+    def is_satisfying(self, version, specs_list):
+        """
+        Determine if a version satisfies every one of the specs
+        """
+        return all(self.validation_cache.is_valid(version, specs) for specs in specs_list)
+
+    def find_version(self, project_name, specs_list):
+        """
+        Returns the newest candidate version of a project that satisfies every one of the specs or None
+        """
+        versions, parsed_versions, indexes = self.get_candidates(project_name)
+        compiled_specs = [self.validation_cache.get_compiled_spec(specs) for specs in specs_list]
+
+        # Only versions in the ranges of every requirer can satisfy all of them
+        intervals = [UNBOUNDED]
+        for compiled_spec in compiled_specs:
+            intervals = intersect_intervals(intervals, compiled_spec.get_allowed_intervals())
+        found = None
+        for interval in reversed(intervals):
+            start, stop = get_index_range(parsed_versions, interval)
+            found = next(
+                (index for index in range(stop - 1, start - 1, -1) if self.is_satisfying(versions[index], specs_list)),
+                None
+            )
+            if found is not None:
+                break
+
+        # Versions pinned with == satisfy a requirer even outside of its ranges
+        pinned = set()
+        for compiled_spec in compiled_specs:
+            pinned.update(compiled_spec.exacts)
+        for version in pinned:
+            index = indexes.get(version)
+            if index is not None and (found is None or index > found) and self.is_satisfying(version, specs_list):
+                found = index
+
+        # Return the newest version found
+        return versions[found] if found is not None else None
+
+    def suggest(self, conflicts):
+        """
+        Returns a suggestion for every distinct conflicting project in the order of the conflicts
+        """
+        suggestions = []
+        for project_name in OrderedDict.fromkeys(conflict.project_name for conflict in conflicts):
+            requirements = self.get_requirements(project_name)
+            version = self.find_version(project_name, [specs for _, specs in requirements])
+            suggestions.append(Suggestion(project_name, version, requirements))
+        return suggestions
@@ -0,0 +1,88 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from mock import patch
+from unittest import TestCase
+from pipconflictchecker import batch
+from pipconflictchecker.batch import batch_in_ranges, encode_version, get_numpy
+from pipconflictchecker.specs import CompiledSpec
+from pipconflictchecker.versions import parse_version
+
+# Installed versions and spec sets that cover every comparison, unbounded and empty ranges and versions that
+# cannot be encoded
+VERSIONS = ['0.9', '1.0', '1.0.0', '1.5', '2.0', '2.0.1', '3', '10.0', '1.0rc1', '2.0.post1', '1!0.5']
+SPECS = [
+    [],
+    [('>=', '1.0')],
+    [('>', '1.0')],
+    [('<', '2.0')],
+    [('<=', '2.0')],
+    [('>=', '1.0'), ('<', '2.0')],
+    [('>', '1.0.0'), ('<=', '2')],
+    [('<', '1.0'), ('>=', '2.0'), ('<', '3')],
+    [('<', '1.0'), ('>', '2.0')],
+    [('==', '1.0')],
+    [('!=', '1.5'), ('>=', '1.0')],
+    [('>=', '1.0rc1')],
+    [('<', '2.0.post1')],
+]
+
+
+class EncodeVersionTest(TestCase):
+    def test_encode_version(self):
+        self.assertEqual(encode_version(parse_version('1.2')), (1, 2, 0, 0, 0, 0, 0, 0))
+        self.assertEqual(encode_version(parse_version('1.2')), encode_version(parse_version('1.2.0')))
+        self.assertLess(encode_version(parse_version('1.2')), encode_version(parse_version('1.10')))
+
+    def test_not_encoded(self):
+        versions = ['1.0rc1', '1.0.post0', '1.0.dev0', '1.0+local', '1!1.0', '1.2.3.4.5.6.7.8.9']
+        versions.append('1.{0}'.format(2 ** 63))
+        for version in versions:
+            self.assertIsNone(encode_version(parse_version(version)), version)
+
+        # Assert versions without a release are not encoded
+        self.assertIsNone(encode_version(('00000001', '*final')))
+
+
+class BatchInRangesTest(TestCase):
+    def get_pairs(self):
+        return [
+            (parse_version(version), CompiledSpec(specs))
+            for version in VERSIONS
+            for specs in SPECS
+        ]
+
+    @patch('pipconflictchecker.batch.MIN_BATCH_SIZE', 0)
+    def test_matches_scalar(self):
+        pairs = self.get_pairs()
+        results = batch_in_ranges(pairs)
+
+        # Assert every encoded pair matches the scalar check and only unencodable ones are left over
+        for (parsed_version, compiled_spec), result in zip(pairs, results):
+            if result is None:
+                versions = [parsed_version] + [spec.parsed_version for spec in compiled_spec.specs]
+                self.assertIn(None, [encode_version(version) for version in versions])
+            else:
+                self.assertEqual(result, compiled_spec.in_ranges(parsed_version), (parsed_version, compiled_spec.specs))
+        self.assertIn(True, results)
+        self.assertIn(False, results)
+
+    @patch('pipconflictchecker.batch.MIN_BATCH_SIZE', 0)
+    def test_nothing_to_compare(self):
+        self.assertEqual(batch_in_ranges([
+            (parse_version('1.0'), CompiledSpec([])),
+            (parse_version('1.0rc1'), CompiledSpec([('>=', '1.0')])),
+        ]), [True, None])
+
+    def test_small_batch(self):
+        self.assertEqual(batch_in_ranges(self.get_pairs()[:2]), [None, None])
+
+    @patch('pipconflictchecker.batch.MIN_BATCH_SIZE', 0)
+    def test_without_numpy(self):
+        with patch.object(batch, '_numpy', None):
+            self.assertIsNone(get_numpy())
+            self.assertEqual(batch_in_ranges(self.get_pairs()[:2]), [None, None])
+
+    def test_get_numpy(self):
+        with patch.object(batch, '_numpy', False):
+            self.assertIsNotNone(get_numpy())
+            self.assertIs(get_numpy(), batch._numpy)
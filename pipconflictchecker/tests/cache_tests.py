@@ -0,0 +1,230 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import json
+import os
+import shutil
+import tempfile
+from mock import Mock, patch
+from pip._vendor.pkg_resources import Distribution, Requirement
+from unittest import TestCase
+from pipconflictchecker.cache import (
+    CACHE_FORMAT_VERSION, get_default_cache_path, get_metadata_path, get_stat_key, MetadataCache
+)
+from pipconflictchecker.distributions import InstalledDistribution
+from pipconflictchecker.snapshot import DistributionMetadata
+
+
+class CacheTestCase(TestCase):
+    def setUp(self):
+        super(CacheTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def create_distribution(self, file_name='METADATA', content='Name: test\nRequires-Dist: req (>=1.0)\n'):
+        # Create the metadata directory on disk
+        entry_name = 'test-1.0.egg-info' if file_name == 'PKG-INFO' else 'test-1.0.dist-info'
+        egg_info = os.path.join(self.directory, entry_name)
+        if not os.path.isdir(egg_info):
+            os.makedirs(egg_info)
+        with open(os.path.join(egg_info, file_name), 'w') as metadata_file:
+            metadata_file.write(content)
+        return InstalledDistribution(egg_info)
+
+
+class GetMetadataPathTest(CacheTestCase):
+    def test_dist_info(self):
+        dist = self.create_distribution()
+        self.assertEqual(get_metadata_path(dist), os.path.join(dist.egg_info, 'METADATA'))
+
+    def test_egg_info_directory(self):
+        dist = self.create_distribution(file_name='PKG-INFO')
+        self.assertEqual(get_metadata_path(dist), os.path.join(dist.egg_info, 'PKG-INFO'))
+
+    def test_egg(self):
+        egg = os.path.join(self.directory, 'test-1.0-py3.8.egg')
+        os.makedirs(os.path.join(egg, 'EGG-INFO'))
+        open(os.path.join(egg, 'EGG-INFO', 'PKG-INFO'), 'w').close()
+        dist = Mock(Distribution)
+        dist.egg_info = egg
+        self.assertEqual(get_metadata_path(dist), os.path.join(egg, 'EGG-INFO', 'PKG-INFO'))
+
+    def test_egg_info_file(self):
+        dist = Mock(Distribution)
+        dist.egg_info = os.path.join(self.directory, 'test-1.0.egg-info')
+        self.assertEqual(get_metadata_path(dist), dist.egg_info)
+
+    def test_no_metadata(self):
+        dist = self.create_distribution(file_name='RECORD')
+        self.assertIsNone(get_metadata_path(dist))
+
+        # Assert distributions without an egg info are not on disk
+        dist.egg_info = None
+        self.assertIsNone(get_metadata_path(dist))
+
+    @patch.dict(os.environ, {'XDG_CACHE_HOME': '/tmp/cache'})
+    def test_default_cache_path(self):
+        self.assertEqual(get_default_cache_path(), '/tmp/cache/pipconflictchecker/metadata.json')
+
+
+class GetStatKeyTest(CacheTestCase):
+    def test_get_stat_key(self):
+        dist = self.create_distribution()
+        stat = os.stat(os.path.join(dist.egg_info, 'METADATA'))
+        self.assertEqual(get_stat_key(dist), [stat.st_mtime, stat.st_size])
+
+    def test_egg_info_requires_txt(self):
+        dist = self.create_distribution(file_name='PKG-INFO', content='Name: test\n')
+        self.assertEqual(len(get_stat_key(dist)), 2)
+
+        # Assert the requires.txt of an egg-info directory is part of the key
+        requires_path = os.path.join(dist.egg_info, 'requires.txt')
+        with open(requires_path, 'w') as requires_file:
+            requires_file.write('req>=1.0\n')
+        stat = os.stat(requires_path)
+        self.assertEqual(get_stat_key(dist)[2:], [stat.st_mtime, stat.st_size])
+
+    @patch('pipconflictchecker.cache.get_metadata_path')
+    def test_removed(self, mock_get_metadata_path):
+        # The metadata file is removed after it was found
+        mock_get_metadata_path.return_value = os.path.join(self.directory, 'removed', 'METADATA')
+        self.assertIsNone(get_stat_key(self.create_distribution()))
+
+    def test_not_on_disk(self):
+        self.assertIsNone(get_stat_key(InstalledDistribution(os.path.join(self.directory, 'test-1.0.egg-info'))))
+        self.assertIsNone(get_stat_key(InstalledDistribution(os.path.join(self.directory, 'test-1.0.dist-info'))))
+        self.assertIsNone(get_stat_key(self.create_distribution(file_name='RECORD')))
+
+
+class MetadataCacheTest(CacheTestCase):
+    def test_read_distribution_cold_and_warm(self):
+        path = os.path.join(self.directory, 'cache', 'metadata.json')
+        dist = self.create_distribution(content=(
+            'Name: test\n'
+            'Provides-Extra: socks\n'
+            'Requires-Dist: req (>=1.0)\n'
+            'Requires-Dist: pysocks[Fast] (>=1.5) ; extra == "socks"\n'
+        ))
+
+        # Read the distribution into a cold cache and save it
+        cache = MetadataCache(path).load()
+        expected = DistributionMetadata(
+            'test',
+            '1.0',
+            [('req', [('>=', '1.0')])],
+            {'socks': [('pysocks', [('>=', '1.5')])]},
+            [('socks', 'pysocks', 'fast')]
+        )
+        self.assertEqual(cache.read_distribution(dist), expected)
+        self.assertEqual(cache.misses, 1)
+        cache.save()
+
+        # Assert a warm cache does not read the metadata again
+        cache = MetadataCache(path).load()
+        with patch('pipconflictchecker.distributions.read_metadata') as mock_read_metadata:
+            self.assertEqual(cache.read_distribution(InstalledDistribution(dist.egg_info)), expected)
+        self.assertEqual(cache.hits, 1)
+        self.assertFalse(mock_read_metadata.called)
+
+    def test_read_distribution_markers(self):
+        path = os.path.join(self.directory, 'metadata.json')
+        self.create_distribution(content=(
+            'Name: test\n'
+            'Requires-Dist: enum34 ; python_version < "3"\n'
+            'Requires-Dist: req (>=1.0) ; python_version >= "3"\n'
+        ))
+        cache = MetadataCache(path)
+        python2 = InstalledDistribution(os.path.join(self.directory, 'test-1.0.dist-info'))
+        python2.marker_environment = {'python_version': '2.7'}
+        self.assertEqual(cache.read_distribution(python2).requirements, [('enum34', [])])
+        cache.save()
+
+        # Assert another interpreter sharing the directory and the cache gets the requirements of its own markers
+        cache = MetadataCache(path).load()
+        python3 = InstalledDistribution(python2.egg_info)
+        python3.marker_environment = {'python_version': '3.8'}
+        self.assertEqual(cache.read_distribution(python3).requirements, [('req', [('>=', '1.0')])])
+        self.assertEqual(cache.hits, 1)
+
+    def test_read_distribution_changed_metadata(self):
+        dist = self.create_distribution()
+        cache = MetadataCache(os.path.join(self.directory, 'metadata.json'))
+        cache.read_distribution(dist)
+
+        # Rewrite the metadata with a different size
+        self.create_distribution(content='Name: test\nVersion: 1.0\n')
+        metadata = cache.read_distribution(InstalledDistribution(dist.egg_info))
+
+        # Assert the distribution was read again
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(metadata.requirements, [])
+
+    def test_read_distribution_changed_requires_txt(self):
+        dist = self.create_distribution(file_name='PKG-INFO', content='Name: test\n')
+        cache = MetadataCache(os.path.join(self.directory, 'metadata.json'))
+        self.assertEqual(cache.read_distribution(dist).requirements, [])
+
+        # Assert adding a requires.txt to the egg-info directory makes the entry stale
+        with open(os.path.join(dist.egg_info, 'requires.txt'), 'w') as requires_file:
+            requires_file.write('req>=1.0\n')
+        metadata = cache.read_distribution(InstalledDistribution(dist.egg_info))
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(metadata.requirements, [('req', [('>=', '1.0')])])
+
+    def test_read_distribution_not_on_disk(self):
+        dist = InstalledDistribution(os.path.join(self.directory, 'missing-1.0.dist-info'))
+        dist.set_metadata(('missing', '1.0', []))
+        cache = MetadataCache(os.path.join(self.directory, 'metadata.json'))
+
+        # Assert the distribution is read but not cached
+        self.assertEqual(cache.read_distribution(dist)[0], 'missing')
+        self.assertFalse(cache.entries)
+        self.assertFalse(cache.dirty)
+
+        # Assert the same happens for a distribution that does not read its own metadata files
+        requirement = Mock(Requirement)
+        requirement.project_name = 'req'
+        requirement.specs = [('>=', '1.0')]
+        requirement.extras = ()
+        pkg_resources_dist = Mock(Distribution)
+        pkg_resources_dist.project_name = 'test'
+        pkg_resources_dist.version = '1.0'
+        pkg_resources_dist.extras = []
+        pkg_resources_dist.egg_info = self.create_distribution().egg_info
+        pkg_resources_dist.requires.return_value = [requirement]
+        self.assertEqual(cache.read_distribution(pkg_resources_dist)[2], [('req', [('>=', '1.0')])])
+        self.assertFalse(cache.entries)
+
+    def test_load_bad_files(self):
+        path = os.path.join(self.directory, 'metadata.json')
+
+        # Assert a missing file gives an empty cache
+        self.assertEqual(MetadataCache(path).load().entries, {})
+
+        # Assert an unreadable file gives an empty cache
+        with open(path, 'w') as cache_file:
+            cache_file.write('not json')
+        self.assertEqual(MetadataCache(path).load().entries, {})
+
+        # Assert a file from another format version gives an empty cache
+        with open(path, 'w') as cache_file:
+            json.dump({'version': CACHE_FORMAT_VERSION + 1, 'entries': {'a': {}}}, cache_file)
+        self.assertEqual(MetadataCache(path).load().entries, {})
+
+    def test_save(self):
+        path = os.path.join(self.directory, 'metadata.json')
+        cache = MetadataCache(path)
+
+        # Assert nothing is written when nothing changed
+        cache.save()
+        self.assertFalse(os.path.exists(path))
+
+        # Assert missing metadata is dropped and an existing file is replaced
+        cache.read_distribution(self.create_distribution())
+        cache.entries['/missing/METADATA'] = {}
+        with open(path, 'w') as cache_file:
+            cache_file.write('{}')
+        cache.save()
+        with open(path) as cache_file:
+            data = json.load(cache_file)
+        self.assertEqual(list(data['entries']), [os.path.join(self.directory, 'test-1.0.dist-info', 'METADATA')])
+        self.assertFalse(cache.dirty)
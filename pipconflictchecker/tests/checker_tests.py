@@ -1,9 +1,25 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
+import os
+import shutil
+import tempfile
 from mock import patch, Mock
 from pip._vendor.pkg_resources import Distribution, Requirement
 from unittest import TestCase
-from pipconflictchecker.checker import Checker, main, Validator
+from pipconflictchecker.batch import batch_in_ranges
+from pipconflictchecker.cache import get_default_cache_path
+from pipconflictchecker.constraints import Unsatisfiable
+from pipconflictchecker.checker import (
+    Checker, Conflict, format_diff, format_suggestions, format_unsatisfiable, main, stream_conflicts, ValidationCache,
+    Validator
+)
+from pipconflictchecker.diff import SnapshotDiff
+from pipconflictchecker.distributions import DefaultSource
+from pipconflictchecker.graph import ConflictDelta
+from pipconflictchecker.snapshot import EnvironmentSnapshot
+from pipconflictchecker.specs import Comparator
+from pipconflictchecker.suggest import Suggestion
+from pipconflictchecker.versions import version_cache
 
 
 class ValidatorTest(TestCase):
@@ -23,6 +39,31 @@ class ValidatorTest(TestCase):
         self.assertTrue(validator.required_version_specs[0], specs[1])
         self.assertTrue(validator.required_version_specs[1], specs[0])
 
+    def test_init_precompiled_specs(self):
+        specs = [
+            Comparator('<=', '2.0'),
+            Comparator('>=', '1.0')
+        ]
+        validator = Validator('1.5', specs)
+
+        # Assert that the compiled specs were used as is
+        self.assertIs(validator.required_version_specs[0], specs[1])
+        self.assertIs(validator.required_version_specs[1], specs[0])
+        self.assertTrue(validator.is_valid())
+
+    def test_shared_version_cache(self):
+        version_cache.clear()
+        specs = [
+            ('>=', '1.0'),
+            ('<', '2.0')
+        ]
+        Validator('1.0', specs).is_valid()
+        Validator('1.0', specs).is_valid()
+
+        # Assert each distinct version was only parsed once across validators
+        self.assertEqual(version_cache.misses, 2)
+        self.assertTrue(version_cache.hits)
+
     def test_ranges_no_max(self):
         installed_version = '1.0'
         specs = [
@@ -311,6 +352,65 @@ class ValidatorTest(TestCase):
         self.assertFalse(validator.is_valid())
 
 
+class ValidationCacheTest(TestCase):
+    """
+    Tests the validation result cache
+    """
+    def test_is_valid(self):
+        cache = ValidationCache()
+        self.assertTrue(cache.is_valid('1.0', [('>=', '1.0')]))
+        self.assertFalse(cache.is_valid('0.9', [('>=', '1.0')]))
+
+        # Assert identical edges are served from the cache regardless of spec order
+        self.assertTrue(cache.is_valid('1.0', {('>=', '1.0')}))
+        self.assertTrue(cache.is_valid('1.5', [('<', '2.0'), ('>=', '1.0')]))
+        self.assertTrue(cache.is_valid('1.5', [('>=', '1.0'), ('<', '2.0')]))
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 3)
+
+    def test_validate_all(self):
+        edges = [
+            (version, specs)
+            for version in ['0.9', '1.0', '1.5', '2.0', '2.0rc1', '3']
+            for specs in [[('>=', '1.0'), ('<', '2.0')], [('==', '2.0rc1')], [('!=', '1.5')], [('>', '2.0rc1')]]
+        ]
+        expected = [Validator(version, specs).is_valid() for version, specs in edges]
+
+        # Assert the batch and scalar paths both give the results of a Validator for every edge
+        for min_batch_size in [0, len(edges) + 1]:
+            with patch('pipconflictchecker.batch.MIN_BATCH_SIZE', min_batch_size):
+                cache = ValidationCache(batch=True)
+                self.assertEqual(cache.validate_all(edges), expected)
+        self.assertEqual(ValidationCache().validate_all(edges), expected)
+
+        # Assert repeated edges are served from the cache
+        self.assertEqual(cache.validate_all(edges[:2] + edges[:1]), expected[:2] + expected[:1])
+        self.assertEqual(cache.hits, 3)
+        self.assertEqual(cache.misses, len(edges))
+        self.assertTrue(cache.is_valid(*edges[0]) is expected[0])
+
+    def test_get_compiled_spec(self):
+        cache = ValidationCache()
+        compiled_spec = cache.get_compiled_spec([('>=', '1.0')])
+
+        # Assert the same spec set reuses the compiled spec
+        self.assertIs(cache.get_compiled_spec({('>=', '1.0')}), compiled_spec)
+
+    def test_get_stats(self):
+        cache = ValidationCache()
+        self.assertEqual(cache.get_stats()['hit_rate'], 0.0)
+
+        cache.is_valid('1.0', [('>=', '1.0')])
+        cache.is_valid('1.0', [('>=', '1.0')])
+        self.assertEqual(cache.get_stats(), {
+            'hits': 1,
+            'misses': 1,
+            'size': 1,
+            'compiled_specs': 1,
+            'hit_rate': 0.5,
+        })
+
+
 class CheckerTest(TestCase):
     """
     Tests the checker functionality
@@ -334,6 +434,7 @@ class CheckerTest(TestCase):
         mock_req = Mock(Requirement)
         mock_req.return_value.specs = [('>=', '1.0')]
         mock_req.return_value.project_name = 'req'
+        mock_req.return_value.extras = ()
 
         # Create some fake distributions
         mock_dist = Mock(Distribution)
@@ -342,6 +443,7 @@ class CheckerTest(TestCase):
             mock_req()
         ]
         mock_dist.return_value.project_name = 'test'
+        mock_dist.return_value.extras = []
         mock_get_installed_dists.return_value = [
             mock_dist(),
             mock_dist()
@@ -356,6 +458,77 @@ class CheckerTest(TestCase):
         # Assert that the req dist has requirements
         self.assertTrue(len(distributions['req']))
 
+    @patch('pipconflictchecker.checker.get_installed_distributions')
+    def test_get_snapshot_scans_once(self, mock_get_installed_dists):
+        mock_get_installed_dists.return_value = []
+
+        # Ask for every view of the environment
+        checker = Checker()
+        checker.get_requirement_versions()
+        checker.get_installed_versions()
+        checker.get_conflicts()
+
+        # Assert the distributions were only enumerated once
+        self.assertEqual(mock_get_installed_dists.call_count, 1)
+        self.assertIs(checker.get_snapshot(), checker.snapshot)
+
+    def test_get_source(self):
+        # Assert the default source is created once so its warnings can be read after the scan
+        checker = Checker()
+        source = checker.get_source()
+        self.assertIsInstance(source, DefaultSource)
+        self.assertIs(checker.get_source(), source)
+        self.assertIs(checker.source, source)
+
+    @patch('pipconflictchecker.checker.get_installed_distributions')
+    @patch('pipconflictchecker.checker.MetadataCache')
+    def test_get_snapshot_metadata_cache(self, mock_metadata_cache, mock_get_installed_dists):
+        mock_get_installed_dists.return_value = []
+
+        # Create the checker with a cache path
+        checker = Checker(cache_path='/tmp/metadata.json')
+        checker.get_snapshot()
+
+        # Assert the cache was loaded and saved
+        mock_metadata_cache.assert_called_once_with('/tmp/metadata.json')
+        metadata_cache = mock_metadata_cache.return_value.load.return_value
+        self.assertIs(checker.metadata_cache, metadata_cache)
+        metadata_cache.save.assert_called_once_with()
+
+    @patch('pipconflictchecker.checker.get_installed_distributions')
+    @patch('pipconflictchecker.checker.MetadataCache')
+    def test_get_snapshot_metadata_cache_not_writable(self, mock_metadata_cache, mock_get_installed_dists):
+        mock_get_installed_dists.return_value = []
+        mock_metadata_cache.return_value.load.return_value.save.side_effect = OSError
+
+        # Assert the check still works
+        checker = Checker(cache_path='/tmp/metadata.json')
+        self.assertIsNotNone(checker.get_snapshot())
+
+    @patch('pipconflictchecker.checker.batch_in_ranges', wraps=batch_in_ranges)
+    def test_get_conflicts_batch(self, mock_batch_in_ranges):
+        # Assert the batch engine is only used when asked for and gives the same conflicts
+        conflicts = Checker().get_conflicts()
+        self.assertFalse(mock_batch_in_ranges.called)
+        batch_conflicts = Checker(batch=True).get_conflicts()
+        self.assertTrue(mock_batch_in_ranges.called)
+        self.assertEqual(
+            [conflict.__dict__ for conflict in batch_conflicts],
+            [conflict.__dict__ for conflict in conflicts]
+        )
+
+    def test_get_conflicts_jobs_match_serial(self):
+        serial_checker = Checker()
+        parallel_checker = Checker(jobs=4)
+
+        # Assert the parallel scan gives exactly the same results as the serial one
+        self.assertEqual(parallel_checker.get_installed_versions(), serial_checker.get_installed_versions())
+        self.assertEqual(parallel_checker.get_requirement_versions(), serial_checker.get_requirement_versions())
+        self.assertEqual(
+            [conflict.__dict__ for conflict in parallel_checker.get_conflicts()],
+            [conflict.__dict__ for conflict in serial_checker.get_conflicts()]
+        )
+
     def test_get_installed_versions(self):
         checker = Checker()
         distributions = checker.get_installed_versions()
@@ -491,12 +664,9 @@ class CheckerTest(TestCase):
         # Assert we found the conflicts
         self.assertEqual(len(conflicts), 0)
 
-    def test_main_no_conflicts(self):
-        self.assertFalse(main())
-
     @patch('pipconflictchecker.checker.Checker.get_requirement_versions')
     @patch('pipconflictchecker.checker.Checker.get_installed_versions')
-    def test_main_with_conflicts(self, mock_installed, mock_requirement):
+    def test_get_conflicts_duplicate_edges_cached(self, mock_installed, mock_requirement):
         # Create some fake installed versions
         mock_installed.return_value = {
             'one': '1.0',
@@ -504,15 +674,502 @@ class CheckerTest(TestCase):
             'three': '3.0'
         }
 
-        # Create some fake requirements
+        # Create some fake requirements where two projects declare the same constraint
         mock_requirement.return_value = {
             'one': {
-                'three': [('>=', '2.0')]
-            },
-            'two': {
-                'three': [('>=', '3.0')]
+                'two': {('>=', '2.0')},
+                'three': {('>=', '2.0')}
             }
         }
 
+        # Create the checker and get the conflicts
+        checker = Checker()
+        conflicts = checker.get_conflicts()
+
+        # Assert both edges conflict but only one was validated
+        self.assertEqual(len(conflicts), 2)
+        self.assertEqual(checker.validation_cache.misses, 1)
+        self.assertEqual(checker.validation_cache.hits, 1)
+
+    @patch('pipconflictchecker.checker.get_installed_distributions')
+    def test_get_stats(self, mock_get_installed_dists):
+        snapshot = EnvironmentSnapshot()
+        snapshot.add_distribution('one', '1.0', [])
+        snapshot.add_distribution('two', '1.0', [('one', [('>=', '2.0')])])
+        snapshot.add_distribution('three', '1.0', [('one', [('>=', '2.0')])])
+        mock_get_installed_dists.return_value = []
+
+        # Run the check against the snapshot
+        checker = Checker()
+        checker.snapshot = snapshot
+        checker.get_conflicts()
+        stats = checker.get_stats()
+
+        # Assert the phases were timed and the work was counted
+        self.assertEqual(set(stats['timings']), set(['build_edges', 'validate', 'parse_versions']))
+        self.assertEqual(stats['counts']['edges_checked'], 2)
+        self.assertEqual(stats['counts']['conflicts'], 2)
+        self.assertEqual(stats['counts']['specs_compiled'], 1)
+        self.assertEqual(stats['counts']['validator_evaluations'], 1)
+        self.assertEqual(stats['counts']['validation_cache_hits'], 1)
+        self.assertNotIn('metadata_cache_hits', stats['counts'])
+
+    @patch('pipconflictchecker.checker.get_installed_distributions')
+    @patch('pipconflictchecker.checker.MetadataCache')
+    def test_get_stats_scan(self, mock_metadata_cache, mock_get_installed_dists):
+        mock_get_installed_dists.return_value = []
+        mock_metadata_cache.return_value.load.return_value.hits = 3
+        mock_metadata_cache.return_value.load.return_value.misses = 1
+        checker = Checker(cache_path='/tmp/metadata.json')
+        checker.get_snapshot()
+        stats = checker.get_stats()
+
+        # Assert the scan was timed and the metadata cache was counted
+        self.assertIn('enumerate_distributions', stats['timings'])
+        self.assertIn('read_metadata', stats['timings'])
+        self.assertEqual(stats['counts']['distributions_scanned'], 0)
+        self.assertEqual(stats['counts']['metadata_cache_hits'], 3)
+        self.assertEqual(stats['counts']['metadata_cache_misses'], 1)
+
+    def test_main_no_conflicts(self):
+        self.assertFalse(main([]))
+
+    @patch('pipconflictchecker.checker.sys.stderr')
+    @patch('pipconflictchecker.checker.Checker')
+    def test_main_stats(self, mock_checker, mock_stderr):
+        mock_checker.return_value.get_conflicts.return_value = []
+        mock_checker.return_value.get_stats.return_value = {'timings': {'validate': 0.1}, 'counts': {'edges': 1}}
+        self.assertEqual(main(['--stats']), 0)
+
+        # Assert the stats were written to stderr
+        output = ''.join(call[0][0] for call in mock_stderr.write.call_args_list)
+        self.assertIn(' Stats', output)
+        self.assertIn('validate', output)
+
+    @patch('pipconflictchecker.checker.profile_call')
+    @patch('pipconflictchecker.checker.Checker')
+    def test_main_profile(self, mock_checker, mock_profile_call):
+        mock_profile_call.return_value = []
+        self.assertEqual(main(['--profile', '/tmp/profile.txt']), 0)
+
+        # Assert the check ran under the profiler
+        mock_profile_call.assert_called_once_with(mock_checker.return_value.get_conflicts, '/tmp/profile.txt')
+
+    @patch('pipconflictchecker.checker.Checker')
+    def test_main_jobs(self, mock_checker):
+        mock_checker.return_value.get_conflicts.return_value = []
+        main(['--jobs', '4'])
+        mock_checker.assert_called_with(cache_path=None, source=None, jobs=4)
+
+    @patch('sys.stderr')
+    def test_main_jobs_invalid(self, mock_stderr):
+        with self.assertRaises(SystemExit):
+            main(['--jobs', '0'])
+
+    @patch('pipconflictchecker.checker.Checker')
+    def test_main_cache(self, mock_checker):
+        mock_checker.return_value.get_conflicts.return_value = []
+
+        # Assert the default cache path is used when none is given
+        main(['--cache'])
+        mock_checker.assert_called_with(cache_path=get_default_cache_path(), source=None, jobs=1)
+
+        # Assert an explicit path is used
+        main(['--cache', '/tmp/metadata.json'])
+        mock_checker.assert_called_with(cache_path='/tmp/metadata.json', source=None, jobs=1)
+
+    @patch('pipconflictchecker.checker.get_installed_distributions')
+    def test_main_with_conflicts(self, mock_get_installed_dists):
+        # Create some fake distributions where one requires a newer three than is installed
+        mock_get_installed_dists.return_value = [
+            make_distribution('one', '1.0', [('three', [('>=', '4.0')])]),
+            make_distribution('two', '2.0', [('three', [('>=', '3.0')])]),
+            make_distribution('three', '3.0'),
+        ]
+
         # Assert we get a proper error return code
-        self.assertEqual(main(), 1)
+        self.assertEqual(main([]), 1)
+
+    @patch('pipconflictchecker.checker.print', create=True)
+    @patch('pipconflictchecker.checker.get_installed_distributions')
+    def test_main_fail_fast(self, mock_get_installed_dists, mock_print):
+        mock_get_installed_dists.return_value = [
+            make_distribution('one', '1.0', [('three', [('>=', '4.0')])]),
+            make_distribution('two', '2.0', [('three', [('>=', '5.0')])]),
+            make_distribution('three', '3.0'),
+        ]
+
+        # Assert only the first conflict is reported
+        self.assertEqual(main(['--fail-fast']), 1)
+        printed = [call[0][0] for call in mock_print.call_args_list]
+        self.assertEqual(len([line for line in printed if 'three' in line]), 1)
+
+    @patch('pipconflictchecker.checker.print', create=True)
+    @patch('pipconflictchecker.checker.get_installed_distributions')
+    def test_main_explain(self, mock_get_installed_dists, mock_print):
+        # app pulls in three through two, which requires a newer three than is installed
+        mock_get_installed_dists.return_value = [
+            make_distribution('app', '1.0', [('two', [])]),
+            make_distribution('two', '2.0', [('three', [('>=', '4.0')])]),
+            make_distribution('three', '3.0'),
+        ]
+        checker = Checker()
+        with patch('pipconflictchecker.checker.Checker', return_value=checker):
+            self.assertEqual(main(['--explain']), 1)
+
+        # Assert the conflict is followed by the path from the top-level package and the search was timed
+        printed = [call[0][0] for call in mock_print.call_args_list]
+        self.assertEqual(printed[-2:], [' - three(3.0) two(>=4.0)', '   via app -> two -> three'])
+        self.assertIn('explain', checker.stats.timings)
+
+    @patch('pipconflictchecker.checker.print', create=True)
+    @patch('pipconflictchecker.checker.get_installed_distributions')
+    def test_main_suggest(self, mock_get_installed_dists, mock_print):
+        mock_get_installed_dists.return_value = [
+            make_distribution('one', '1.0', [('three', [('>=', '4.0')])]),
+            make_distribution('two', '2.0', [('three', [('<', '5.0')])]),
+            make_distribution('three', '3.0'),
+        ]
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for version in ['3.0', '4.1', '5.0']:
+            open(os.path.join(directory, 'three-{0}-py3-none-any.whl'.format(version)), 'w').close()
+        checker = Checker()
+        with patch('pipconflictchecker.checker.Checker', return_value=checker):
+            self.assertEqual(main(['--suggest', directory]), 1)
+
+        # Assert the newest version both requirers accept was suggested after the conflicts
+        printed = [call[0][0] for call in mock_print.call_args_list]
+        self.assertEqual(printed[-4:-1], ['-' * 50, ' Suggestions', '-' * 50])
+        self.assertEqual(printed[-1], ' - three==4.1 satisfies one(>=4.0), two(<5.0)')
+        self.assertIn('suggest', checker.stats.timings)
+
+    @patch('pipconflictchecker.checker.print', create=True)
+    def test_main_suggest_no_conflicts(self, mock_print):
+        with patch('pipconflictchecker.checker.get_installed_distributions', return_value=[]):
+            self.assertEqual(main(['--suggest', '/missing']), 0)
+        self.assertFalse(mock_print.called)
+
+    def test_format_suggestions(self):
+        lines = format_suggestions([
+            Suggestion('three', None, [('one', [('>=', '4.0')]), ('two', [('<', '4.0'), ('>', '1.0')])]),
+        ])
+        self.assertEqual(lines[-1], ' - three: no version in the wheelhouse satisfies one(>=4.0), two(<4.0,>1.0)')
+
+    @patch('pipconflictchecker.checker.print', create=True)
+    @patch('pipconflictchecker.checker.get_installed_distributions')
+    def test_main_unsatisfiable(self, mock_get_installed_dists, mock_print):
+        # Nothing installed conflicts, but no version of four could ever satisfy one and two together
+        mock_get_installed_dists.return_value = [
+            make_distribution('one', '1.0', [('four', [('>=', '4.0')]), ('three', [('>=', '3.0')])]),
+            make_distribution('two', '2.0', [('four', [('<', '3.0')])]),
+            make_distribution('three', '3.0'),
+        ]
+        checker = Checker()
+        with patch('pipconflictchecker.checker.Checker', return_value=checker):
+            self.assertEqual(main(['--unsatisfiable']), 1)
+
+        # Assert the clash was reported and timed
+        printed = [call[0][0] for call in mock_print.call_args_list]
+        self.assertEqual(printed, format_unsatisfiable([
+            Unsatisfiable('four', [('one', [('>=', '4.0')]), ('two', [('<', '3.0')])]),
+        ]))
+        self.assertIn('constraints', checker.stats.timings)
+
+    @patch('pipconflictchecker.checker.print', create=True)
+    def test_main_unsatisfiable_none(self, mock_print):
+        with patch('pipconflictchecker.checker.get_installed_distributions', return_value=[]):
+            self.assertEqual(main(['--unsatisfiable']), 0)
+        self.assertFalse(mock_print.called)
+
+    def test_format_unsatisfiable(self):
+        lines = format_unsatisfiable([
+            Unsatisfiable('four', [('one', [('>=', '4.0')]), ('two', [('<', '4.0'), ('>', '1.0')])]),
+        ])
+        self.assertEqual(lines[1], ' Unsatisfiable Requirements')
+        self.assertEqual(lines[-1], ' - four: no version satisfies one(>=4.0), two(<4.0,>1.0)')
+
+
+def make_requirement(project_name, specs, extras=()):
+    requirement = Mock(Requirement)
+    requirement.project_name = project_name
+    requirement.specs = specs
+    requirement.extras = extras
+    return requirement
+
+
+def make_distribution(project_name, version, requirements=(), extras=None):
+    """
+    Returns a fake distribution that declares the (project_name, specs[, extras]) requirements and a dict of extra
+    => requirements of its extras
+    """
+    dist = Mock(Distribution)
+    dist.project_name = project_name
+    dist.version = version
+    extra_requires = dict(
+        (extra, [make_requirement(*requirement) for requirement in extra_requirements])
+        for extra, extra_requirements in (extras or {}).items()
+    )
+    dist.extras = sorted(extra_requires)
+    requires = [make_requirement(*requirement) for requirement in requirements]
+    dist.requires.side_effect = lambda extras=(): requires + [
+        requirement for extra in extras for requirement in extra_requires[extra]
+    ]
+    return dist
+
+
+class IterConflictsTest(TestCase):
+    def setUp(self):
+        super(IterConflictsTest, self).setUp()
+        patcher = patch('pipconflictchecker.checker.get_installed_distributions')
+        self.mock_get_installed_dists = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # one is read before three, which it conflicts with, and two after it
+        self.mock_get_installed_dists.return_value = [
+            make_distribution('one', '1.0', [('three', [('>=', '4.0')])]),
+            make_distribution('three', '3.0'),
+            make_distribution('two', '2.0', [('three', [('<', '3.0')]), ('one', [('==', '1.0')])]),
+        ]
+
+    def test_iter_conflicts(self):
+        checker = Checker()
+        conflicts = list(checker.iter_conflicts())
+
+        # Assert the edge waiting for three and the edge read after it were both checked
+        self.assertEqual(
+            sorted((conflict.project_name, conflict.required_project_name) for conflict in conflicts),
+            [('three', 'one'), ('three', 'two')]
+        )
+        self.assertEqual(checker.stats.counts['edges_checked'], 3)
+        self.assertEqual(checker.stats.counts['edges_built'], 3)
+
+        # Assert the complete scan was kept and gives the same conflicts
+        self.assertEqual(checker.snapshot.installed_versions, {'one': '1.0', 'two': '2.0', 'three': '3.0'})
+        self.assertEqual(len(list(checker.iter_conflicts())), len(conflicts))
+        self.assertEqual(self.mock_get_installed_dists.call_count, 1)
+
+    def test_iter_conflicts_jobs(self):
+        checker = Checker(jobs=4)
+        self.assertEqual(len(list(checker.iter_conflicts())), 2)
+
+    @patch('pipconflictchecker.checker.Checker.save_metadata_cache')
+    def test_iter_conflicts_stop_early(self, mock_save):
+        checker = Checker()
+        conflicts = checker.iter_conflicts()
+        conflict = next(conflicts)
+        conflicts.close()
+
+        # Assert the scan stopped at the first conflict without keeping a partial snapshot
+        self.assertEqual((conflict.project_name, conflict.required_project_name), ('three', 'one'))
+        self.assertEqual(checker.stats.counts['distributions_scanned'], 2)
+        self.assertIsNone(checker.snapshot)
+        mock_save.assert_called_once_with()
+
+    @patch('pipconflictchecker.checker.print', create=True)
+    def test_stream_conflicts(self, mock_print):
+        conflicts = stream_conflicts(Checker().iter_conflicts())
+
+        # Assert the header is printed once before the conflicts
+        self.assertEqual(len(conflicts), 2)
+        self.assertEqual(mock_print.call_count, 5)
+
+    @patch('pipconflictchecker.checker.print', create=True)
+    def test_stream_conflicts_fail_fast(self, mock_print):
+        conflicts = Checker().iter_conflicts()
+        self.assertEqual(len(stream_conflicts(conflicts, fail_fast=True)), 1)
+
+        # Assert the check was stopped
+        self.assertEqual(list(conflicts), [])
+
+    @patch('pipconflictchecker.checker.print', create=True)
+    def test_stream_conflicts_none(self, mock_print):
+        self.assertEqual(stream_conflicts(iter([])), [])
+        self.assertFalse(mock_print.called)
+
+    def test_name_spellings(self):
+        # app requires Foo_Bar by another spelling before and after it is read
+        self.mock_get_installed_dists.return_value = [
+            make_distribution('app', '1.0', [('foo.bar', [('>=', '2.0')])]),
+            make_distribution('Foo_Bar', '1.0'),
+            make_distribution('other', '1.0', [('FOO-BAR', [('<', '1.0')])]),
+        ]
+        checker = Checker()
+        expected = [('Foo_Bar', 'app'), ('Foo_Bar', 'other')]
+
+        # Assert both the streamed and the batch check join the spellings
+        conflicts = list(checker.iter_conflicts())
+        self.assertEqual([(conflict.project_name, conflict.required_project_name) for conflict in conflicts], expected)
+        conflicts = checker.get_conflicts()
+        self.assertEqual(sorted((conflict.project_name, conflict.required_project_name) for conflict in conflicts), [
+            ('Foo_Bar', 'app'), ('Foo_Bar', 'other'),
+        ])
+
+    def test_iter_conflicts_extras(self):
+        # lib is read before app requests its socks extra, which conflicts with the installed pysocks
+        self.mock_get_installed_dists.return_value = [
+            make_distribution('lib', '1.0', extras={'socks': [('pysocks', [('>=', '2.0')])]}),
+            make_distribution('pysocks', '1.0'),
+            make_distribution('app', '1.0', [('lib', [('>=', '1.0')], ('socks',))]),
+        ]
+        checker = Checker()
+        conflicts = list(checker.iter_conflicts())
+
+        # Assert the requirements of the extra were checked once it was requested
+        self.assertEqual([(conflict.project_name, conflict.required_project_name) for conflict in conflicts], [
+            ('pysocks', 'lib'),
+        ])
+        self.assertEqual(len(checker.get_conflicts()), 1)
+
+    def test_iter_conflicts_extras_after_conflict(self):
+        # lib already conflicts with six when app requests the fast extra, which adds more specs to the same edge
+        self.mock_get_installed_dists.return_value = [
+            make_distribution('six', '1.0'),
+            make_distribution('lib', '1.0', [('six', [('>=', '2.0')])], extras={'fast': [('six', [('>=', '5.0')])]}),
+            make_distribution('app', '1.0', [('lib', [], ('fast',))]),
+        ]
+        checker = Checker()
+        conflicts = list(checker.iter_conflicts())
+
+        # Assert the edge was held back until the extra was requested and yielded once with every spec
+        self.assertEqual([(conflict.project_name, conflict.required_project_name) for conflict in conflicts], [
+            ('six', 'lib'),
+        ])
+        self.assertEqual(conflicts[0].specs, set([('>=', '2.0'), ('>=', '5.0')]))
+        self.assertEqual(checker.stats.counts['edges_checked'], 2)
+        self.assertEqual(checker.stats.counts['conflicts'], 1)
+
+    def test_iter_conflicts_duplicate(self):
+        # one is seen twice, each time conflicting with three
+        self.mock_get_installed_dists.return_value = [
+            make_distribution('three', '3.0'),
+            make_distribution('one', '1.0', [('three', [('>=', '4.0')])]),
+            make_distribution('one', '1.0', [('three', [('>=', '4.0')])]),
+        ]
+        self.assertEqual(len(list(Checker().iter_conflicts())), 1)
+
+    def test_iter_conflicts_extras_never_requested(self):
+        # Nothing requests the fast extra of lib, so its edge to six is held back until the end of the scan
+        self.mock_get_installed_dists.return_value = [
+            make_distribution('six', '1.0'),
+            make_distribution('lib', '1.0', [('six', [('>=', '2.0')])], extras={'fast': [('six', [('>=', '5.0')])]}),
+            make_distribution('app', '1.0', [('lib', [])]),
+        ]
+        conflicts = list(Checker().iter_conflicts())
+        self.assertEqual([(conflict.project_name, conflict.specs) for conflict in conflicts], [
+            ('six', set([('>=', '2.0')])),
+        ])
+
+    @patch('pipconflictchecker.checker.print', create=True)
+    def test_stream_conflicts_extras_match_get_conflicts(self, mock_print):
+        # The fast extra of lib is requested after its edge to six was read, and the socks extra before
+        self.mock_get_installed_dists.return_value = [
+            make_distribution('six', '1.0'),
+            make_distribution('pysocks', '1.0'),
+            make_distribution('tool', '1.0', [('lib', [], ('socks',))]),
+            make_distribution('lib', '1.0', [('six', [('>=', '2.0')])], extras={
+                'fast': [('six', [('>=', '5.0')])],
+                'socks': [('pysocks', [('>=', '2.0')])],
+            }),
+            make_distribution('app', '1.0', [('lib', [], ('fast',))]),
+        ]
+        conflicts = stream_conflicts(Checker().iter_conflicts())
+        streamed = [call[0][0] for call in mock_print.call_args_list]
+        mock_print.reset_mock()
+        stream_conflicts(iter(Checker().get_conflicts()))
+
+        # Assert the streamed report prints the same conflicts as the full check
+        self.assertEqual(sorted(streamed), sorted(call[0][0] for call in mock_print.call_args_list))
+        self.assertEqual(len(conflicts), 2)
+
+
+class SnapshotCommandsTest(TestCase):
+    def setUp(self):
+        super(SnapshotCommandsTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def save_snapshot(self, file_name, distributions):
+        snapshot = EnvironmentSnapshot()
+        for dist_metadata in distributions:
+            snapshot.add_distribution(*dist_metadata)
+        path = os.path.join(self.directory, file_name)
+        snapshot.save(path)
+        return path
+
+    def test_format_diff(self):
+        conflict = Conflict('one', 'two', '1.0', [('>=', '2.0')])
+        diff = SnapshotDiff(
+            [('four', '1.0')],
+            [('gone', '1.0')],
+            [('one', '1.0', '2.0'), ('two', '1.0', '1.0')],
+            [('two', 'one', {('>=', '2.0'), ('<', '3.0')})],
+            ConflictDelta([conflict], [conflict])
+        )
+        self.assertEqual(format_diff(diff), [
+            '-' * 50,
+            ' Snapshot Diff',
+            '-' * 50,
+            ' + four(1.0)',
+            ' - gone(1.0)',
+            ' ~ one(1.0 -> 2.0)',
+            ' ~ two(1.0) requirements changed',
+            ' Affected edges:',
+            '   two -> one(<3.0,>=2.0)',
+            ' Conflicts created:',
+            ' - one(1.0) two(>=2.0)',
+            ' Conflicts resolved:',
+            ' - one(1.0) two(>=2.0)',
+        ])
+
+        # Assert empty sections are left out
+        self.assertEqual(len(format_diff(SnapshotDiff([], [], [], [], ConflictDelta([], [])))), 3)
+
+    @patch('pipconflictchecker.checker.get_installed_distributions')
+    def test_main_snapshot_out_and_in(self, mock_get_installed_dists):
+        dist = Mock(Distribution)
+        dist.project_name = 'one'
+        dist.version = '1.0'
+        dist.extras = []
+        dist.requires.return_value = []
+        mock_get_installed_dists.return_value = [dist]
+        path = os.path.join(self.directory, 'snapshot.json.gz')
+
+        # Assert the scanned environment was saved
+        self.assertEqual(main(['--snapshot-out', path]), 0)
+        self.assertEqual(EnvironmentSnapshot.load(path).installed_versions, {'one': '1.0'})
+
+        # Assert a snapshot is checked without scanning
+        mock_get_installed_dists.reset_mock()
+        conflict_path = self.save_snapshot('conflict.json', [
+            ('one', '1.0', []),
+            ('two', '1.0', [('one', [('>=', '2')])]),
+        ])
+        with patch('pipconflictchecker.checker.print', create=True):
+            self.assertEqual(main(['--snapshot-in', path]), 0)
+            self.assertEqual(main(['--snapshot-in', conflict_path]), 1)
+        self.assertFalse(mock_get_installed_dists.called)
+
+    @patch('sys.stderr')
+    def test_main_snapshot_in_invalid(self, mock_stderr):
+        path = self.save_snapshot('snapshot.json', [])
+        with self.assertRaises(SystemExit):
+            main(['--snapshot-in', os.path.join(self.directory, 'missing.json')])
+        with self.assertRaises(SystemExit):
+            main(['--snapshot-in', path, '--watch'])
+        with self.assertRaises(SystemExit):
+            main(['--snapshot-in', path, '--wheelhouse', self.directory])
+
+    @patch('pipconflictchecker.checker.print', create=True)
+    def test_main_diff(self, mock_print):
+        old_path = self.save_snapshot('old.json', [('one', '1.0', []), ('two', '1.0', [('one', [('<', '2.0')])])])
+        new_path = self.save_snapshot('new.json', [('one', '2.0', []), ('two', '1.0', [('one', [('<', '2.0')])])])
+
+        # Assert the diff was printed and the created conflict fails the command
+        self.assertEqual(main(['--diff', old_path, new_path]), 1)
+        lines = [call[0][0] for call in mock_print.call_args_list]
+        self.assertIn(' ~ one(1.0 -> 2.0)', lines)
+        self.assertIn(' - one(2.0) two(<2.0)', lines)
+
+        # Assert a diff that creates no conflicts passes
+        self.assertEqual(main(['--diff', new_path, old_path]), 0)
@@ -0,0 +1,114 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from unittest import TestCase
+
+from pipconflictchecker.checker import ValidationCache
+from pipconflictchecker.constraints import (
+    ConstraintAnalyzer, find_common_versions, get_bound_events, Unsatisfiable
+)
+from pipconflictchecker.snapshot import EnvironmentSnapshot
+from pipconflictchecker.specs import CompiledSpec, UNBOUNDED
+from pipconflictchecker.versions import parse_version
+
+
+def get_intervals(specs):
+    return CompiledSpec(specs).get_allowed_intervals()
+
+
+class FindCommonVersionsTest(TestCase):
+    def test_get_bound_events(self):
+        coverage, events = get_bound_events([get_intervals([('<=', '2.0')]), get_intervals([('>', '2.0')])])
+
+        # Assert the interval ending at 2.0 is counted before the one starting just after it
+        self.assertEqual(coverage, 1)
+        self.assertEqual(events, [(parse_version('2.0'), True, -1), (parse_version('2.0'), True, 1)])
+
+    def test_find_common_versions(self):
+        cases = [
+            ([], (True, [])),
+            ([[UNBOUNDED], [UNBOUNDED]], (True, [])),
+            ([get_intervals([('>=', '1.0')]), get_intervals([('<', '2.0')])], (True, [])),
+            ([get_intervals([('<', '1.0')]), get_intervals([('>=', '1.0')])], (False, [])),
+            ([get_intervals([('<=', '1.0')]), get_intervals([('>', '1.0')])], (False, [])),
+            ([get_intervals([('>=', '2.0')]), get_intervals([('<', '1.0')])], (False, [])),
+            ([get_intervals([('>=', '1.0')]), get_intervals([('<=', '1.0')])], (False, [parse_version('1.0')])),
+            ([get_intervals([('>=', '1.0'), ('<=', '1.0')])], (False, [parse_version('1.0')])),
+            ([get_intervals([('>=', '1.0')]), get_intervals([('<=', '1.0')]), []], (False, [])),
+        ]
+        for interval_sets, expected in cases:
+            self.assertEqual(find_common_versions(interval_sets), expected)
+
+    def test_find_common_versions_disjoint_sets(self):
+        # One set holds two ranges, only the second of which meets the other set
+        interval_sets = [
+            get_intervals([('>=', '1.0'), ('<', '2.0'), ('>=', '3.0'), ('<', '4.0')]),
+            get_intervals([('>', '2.5'), ('<=', '3.0')]),
+        ]
+        self.assertEqual(find_common_versions(interval_sets), (False, [parse_version('3.0')]))
+        interval_sets[1] = get_intervals([('>', '2.5'), ('<=', '3.5')])
+        self.assertEqual(find_common_versions(interval_sets), (True, []))
+
+
+class ConstraintAnalyzerTest(TestCase):
+    def setUp(self):
+        super(ConstraintAnalyzerTest, self).setUp()
+        self.snapshot = EnvironmentSnapshot()
+        self.analyzer = ConstraintAnalyzer(self.snapshot, ValidationCache())
+
+    def test_is_satisfiable(self):
+        cases = [
+            ([[('>=', '1.0')], [('<', '2.0')]], True),
+            ([[('>=', '2.0')], [('<', '2.0')]], False),
+            ([[('>=', '2.0')], [('<=', '2.0')]], True),
+            ([[('>=', '2.0')], [('<=', '2.0'), ('!=', '2.0')]], False),
+            ([[('>=', '2.0')], [('<', '1.0'), ('==', '2.5')]], True),
+            ([[('>=', '2.0')], [('<', '1.0'), ('==', '1.5')]], False),
+            ([[('>', '2.0'), ('<', '1.0')]], False),
+            ([[('!=', '1.0')], [('==', '1.0')]], True),
+        ]
+        for specs_list, expected in cases:
+            self.assertEqual(self.analyzer.is_satisfiable(specs_list), expected)
+
+    def test_is_satisfiable_matches_validation(self):
+        validation_cache = ValidationCache()
+        versions = ['0.5', '1.0', '1.5', '2.0', '2.5', '3.0', '3.5']
+        specs_lists = [
+            [[('>=', '1.0'), ('<', '2.0')], [('>', '2.0'), ('<=', '3.0')]],
+            [[('>=', '1.0'), ('<=', '2.0')], [('>=', '2.0'), ('!=', '2.5')]],
+            [[('<', '1.0'), ('>=', '3.0')], [('>', '0.5'), ('<', '3.0')]],
+            [[('<', '1.0'), ('>=', '3.0')], [('>', '0.5'), ('<=', '3.0')], [('!=', '3.0')]],
+        ]
+        for specs_list in specs_lists:
+            # Assert a grid version the checker accepts for every requirer always means it is satisfiable
+            if any(all(validation_cache.is_valid(version, specs) for specs in specs_list) for version in versions):
+                self.assertTrue(self.analyzer.is_satisfiable(specs_list))
+        self.assertFalse(self.analyzer.is_satisfiable(specs_lists[0]))
+        self.assertFalse(self.analyzer.is_satisfiable(specs_lists[3]))
+
+    def test_get_clashing_requirements(self):
+        requirements = [
+            ('one', [('>=', '1.0')]),
+            ('two', [('>=', '2.0')]),
+            ('three', [('<', '5.0')]),
+            ('four', [('<', '1.5')]),
+            ('five', [('!=', '3.0')]),
+        ]
+
+        # Assert only the requirers that clash on their own are kept
+        self.assertEqual(self.analyzer.get_clashing_requirements(requirements), [
+            ('two', [('>=', '2.0')]),
+            ('four', [('<', '1.5')]),
+        ])
+
+    def test_analyze(self):
+        self.snapshot.add_distribution('Lib_Core', '1.0', [])
+        self.snapshot.add_distribution('app', '1.0', [('lib.core', [('>=', '2.0')]), ('missing', [('<', '1.0')])])
+        self.snapshot.add_distribution('tool', '1.0', [('LIB-CORE', [('<', '2.0')]), ('missing', [('>', '1.0')])])
+        self.snapshot.add_distribution('web', '1.0', [('lib-core', [('>', '1.0')]), ('fine', [('>=', '1.0')])])
+
+        # Assert every project that can never be satisfied is named with the requirers that clash
+        self.assertEqual(self.analyzer.analyze(), [
+            Unsatisfiable('Lib_Core', [('app', [('>=', '2.0')]), ('tool', [('<', '2.0')])]),
+            Unsatisfiable('missing', [('app', [('<', '1.0')]), ('tool', [('>', '1.0')])]),
+        ])
@@ -0,0 +1,72 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from unittest import TestCase
+from pipconflictchecker.checker import Checker
+from pipconflictchecker.diff import diff_snapshots, get_affected_edges, get_readable_specs
+from pipconflictchecker.snapshot import EnvironmentSnapshot
+
+
+class DiffTest(TestCase):
+    def setUp(self):
+        super(DiffTest, self).setUp()
+        self.old = EnvironmentSnapshot()
+        self.old.add_distribution('one', '1.0', [])
+        self.old.add_distribution('two', '1.0', [('one', [('>=', '1.0')])])
+        self.old.add_distribution('three', '1.0', [('one', [('<', '2.0')])])
+        self.old.add_distribution('gone', '1.0', [('three', [('>=', '2.0')])])
+        self.old.add_distribution('same', '1.0', [])
+
+        self.new = EnvironmentSnapshot()
+        self.new.add_distribution('one', '2.0', [])
+        self.new.add_distribution('two', '1.0', [('one', [('>=', '1.5')])])
+        self.new.add_distribution('three', '1.0', [('one', [('<', '2.0')])])
+        self.new.add_distribution('four', '1.0', [])
+        self.new.add_distribution('same', '1.0', [])
+
+    def test_get_readable_specs(self):
+        self.assertEqual(get_readable_specs({('>=', '1.0'), ('<', '2.0')}), '<2.0,>=1.0')
+        self.assertEqual(get_readable_specs([]), '')
+
+    def test_get_affected_edges(self):
+        self.assertEqual(get_affected_edges(self.old, set(['gone'])), {('gone', 'three'): {('>=', '2.0')}})
+
+    def test_get_affected_edges_spellings(self):
+        snapshot = EnvironmentSnapshot()
+        snapshot.add_distribution('Foo_Bar', '1.0', [])
+        snapshot.add_distribution('app', '1.0', [('foo.bar', [('>=', '1.0')])])
+        self.assertEqual(get_affected_edges(snapshot, set(['Foo_Bar'])), {('app', 'Foo_Bar'): {('>=', '1.0')}})
+
+    def test_diff_snapshots(self):
+        diff = diff_snapshots(self.old, self.new, Checker())
+
+        # Assert the changed packages were found
+        self.assertEqual(diff.added, [('four', '1.0')])
+        self.assertEqual(diff.removed, [('gone', '1.0')])
+        self.assertEqual(diff.changed, [('one', '1.0', '2.0'), ('two', '1.0', '1.0')])
+
+        # Assert the edges touching them use the newest specs
+        self.assertEqual(diff.edges, [
+            ('gone', 'three', {('>=', '2.0')}),
+            ('three', 'one', {('<', '2.0')}),
+            ('two', 'one', {('>=', '1.5')}),
+        ])
+
+        # Assert the conflicts created and resolved by the change were found
+        self.assertEqual(
+            [(conflict.project_name, conflict.required_project_name) for conflict in diff.conflicts.created],
+            [('one', 'three')]
+        )
+        self.assertEqual(
+            [(conflict.project_name, conflict.required_project_name) for conflict in diff.conflicts.resolved],
+            [('three', 'gone')]
+        )
+
+        # Assert the old snapshot was left alone
+        self.assertEqual(self.old.installed_versions['one'], '1.0')
+        self.assertIn('gone', self.old.installed_versions)
+        self.assertNotIn('four', self.old.installed_versions)
+
+    def test_diff_snapshots_unchanged(self):
+        diff = diff_snapshots(self.old, self.old, Checker())
+        self.assertEqual(diff[:4], ([], [], [], []))
+        self.assertEqual(diff.conflicts, ([], []))
@@ -0,0 +1,250 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from mock import patch
+from unittest import TestCase
+from pipconflictchecker.distributions import (
+    DefaultSource, DistInfoSource, DistributionSource, evaluate_marker, get_distribution_source,
+    get_installed_distributions, InstalledDistribution, PkgResourcesSource
+)
+
+
+class DistributionsTestCase(TestCase):
+    def setUp(self):
+        super(DistributionsTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write_file(self, path, content):
+        path = os.path.join(self.directory, path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as metadata_file:
+            metadata_file.write(content)
+        return path
+
+
+class EvaluateMarkerTest(TestCase):
+    def test_evaluate_marker(self):
+        self.assertTrue(evaluate_marker('python_version >= "2.0"'))
+        self.assertFalse(evaluate_marker('python_version < "2.0"'))
+        self.assertTrue(evaluate_marker('extra == "test"', 'test'))
+        self.assertFalse(evaluate_marker('extra == "test"'))
+
+    def test_evaluate_marker_environment(self):
+        self.assertTrue(evaluate_marker('python_version < "3"', environment={'python_version': '2.7'}))
+        self.assertTrue(evaluate_marker('extra == "test"', 'test', environment={'extra': ''}))
+
+    def test_invalid_marker(self):
+        self.assertTrue(evaluate_marker('not a marker'))
+
+
+class InstalledDistributionTest(DistributionsTestCase):
+    def test_dist_info(self):
+        self.write_file('test_project-1.0.dist-info/METADATA', (
+            'Name: test_project\n'
+            'Version: 1.0\n'
+            'Requires-Dist: six (>=1.10)\n'
+            'Requires-Dist: enum34 ; python_version < "2.0"\n'
+            'Requires-Dist: pytest ; extra == "test"\n'
+        ))
+        dist = InstalledDistribution(os.path.join(self.directory, 'test_project-1.0.dist-info'))
+
+        # Assert the name and version come from the entry name
+        self.assertEqual(dist.project_name, 'test-project')
+        self.assertEqual(dist.version, '1.0')
+        self.assertIsNone(dist._metadata)
+
+        # Assert the requirements whose markers do not apply are left out
+        self.assertEqual([requirement.project_name for requirement in dist.requires()], ['six'])
+        self.assertEqual([requirement.project_name for requirement in dist.requires(['test'])], ['six', 'pytest'])
+
+    def test_extras(self):
+        self.write_file('test-1.0.egg-info/PKG-INFO', 'Name: test\nVersion: 1.0\n')
+        self.write_file('test-1.0.egg-info/requires.txt', 'six\n[Socks_Proxy]\npysocks\n[test]\npytest\nmock\n')
+        dist = InstalledDistribution(os.path.join(self.directory, 'test-1.0.egg-info'))
+
+        # Assert the extras with requirements are listed and matched regardless of their spelling
+        self.assertEqual(dist.extras, ['socks-proxy', 'test'])
+        self.assertEqual([requirement.project_name for requirement in dist.requires(['socks_proxy'])], [
+            'six',
+            'pysocks',
+        ])
+
+    def test_egg_info_directory(self):
+        self.write_file('test.egg-info/PKG-INFO', 'Name: test\nVersion: 2.0\n')
+        self.write_file('test.egg-info/requires.txt', 'six\n[test]\npytest\n')
+        dist = InstalledDistribution(os.path.join(self.directory, 'test.egg-info'))
+
+        # Assert the version is read from the metadata when the entry name has none
+        self.assertEqual(dist.project_name, 'test')
+        self.assertEqual(dist.version, '2.0')
+        self.assertEqual([requirement.project_name for requirement in dist.requires()], ['six'])
+
+    def test_egg_info_directory_no_requires(self):
+        self.write_file('test-1.0.egg-info/PKG-INFO', 'Name: test\nVersion: 1.0\n')
+        dist = InstalledDistribution(os.path.join(self.directory, 'test-1.0.egg-info'))
+        self.assertEqual(dist.requires(), [])
+
+    def test_egg_info_file(self):
+        path = self.write_file('-1.0.egg-info', 'Name: test\nVersion: 1.0\nRequires-Dist: six\n')
+        dist = InstalledDistribution(path)
+
+        # Assert the name is read from the metadata when the entry name has none
+        self.assertEqual(dist.project_name, 'test')
+        self.assertEqual([requirement.project_name for requirement in dist.requires()], ['six'])
+        self.assertEqual(repr(dist), 'InstalledDistribution({0!r})'.format(path))
+
+
+class DistributionSourceTest(DistributionsTestCase):
+    def test_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            DistributionSource().get_distributions()
+        self.assertEqual(DistributionSource().get_warnings(), [])
+
+    def test_dist_info_source(self):
+        self.write_file('first/b-1.0.dist-info/METADATA', 'Name: b\n')
+        self.write_file('first/a-1.0.dist-info/METADATA', 'Name: a\n')
+        self.write_file('first/a_module.py', '')
+        self.write_file('second/A-2.0.dist-info/METADATA', 'Name: A\n')
+        self.write_file('second/c.egg-info/PKG-INFO', 'Name: c\n')
+        paths = [
+            os.path.join(self.directory, 'first'),
+            os.path.join(self.directory, 'missing'),
+            os.path.join(self.directory, 'second'),
+        ]
+        distributions = DistInfoSource(paths).get_distributions()
+
+        # Assert the entries were found in order and the shadowed project was skipped
+        self.assertEqual(
+            [(dist.project_name, dist.version) for dist in distributions],
+            [('a', '1.0'), ('b', '1.0'), ('c', None)]
+        )
+
+    def test_dist_info_source_eggs(self):
+        # foo is an egg directory, bar a zipped egg and baz an egg that is a path of its own
+        self.write_file('site/foo-1.0-py3.8.egg/EGG-INFO/PKG-INFO', 'Name: foo\nVersion: 1.0\n')
+        self.write_file('site/bar-1.0-py3.8.egg/EGG-INFO/PKG-INFO', 'Name: bar\nVersion: 1.0\n')
+        self.write_file('site/bar-1.0-py3.8.egg/EGG-INFO/requires.txt', 'foo>=2.0\n')
+        with zipfile.ZipFile(os.path.join(self.directory, 'site', 'qux-1.0-py3.8.egg'), 'w') as egg_file:
+            egg_file.writestr('EGG-INFO/PKG-INFO', 'Metadata-Version: 1.0\nName: qux\nVersion: 1.0\n')
+            egg_file.writestr('EGG-INFO/requires.txt', 'foo>=1.0\n')
+        baz = os.path.dirname(os.path.dirname(self.write_file('baz-2.0-py3.8.egg/EGG-INFO/PKG-INFO', 'Name: baz\n')))
+        distributions = DistInfoSource([os.path.join(self.directory, 'site'), baz]).get_distributions()
+
+        # Assert every egg was found and read like pkg_resources reads it
+        self.assertEqual(
+            [(dist.project_name, dist.version) for dist in distributions],
+            [('bar', '1.0'), ('foo', '1.0'), ('qux', '1.0'), ('baz', '2.0')]
+        )
+        self.assertEqual(
+            [(req.project_name, req.specs) for req in distributions[0].requires()],
+            [('foo', [('>=', '2.0')])]
+        )
+        self.assertEqual([req.project_name for req in distributions[2].requires()], ['foo'])
+
+        # Assert the conflict with the egg is found
+        from pipconflictchecker.checker import Checker
+        conflicts = Checker(source=DistInfoSource([os.path.join(self.directory, 'site')])).get_conflicts()
+        self.assertEqual([(conflict.project_name, conflict.required_project_name) for conflict in conflicts], [
+            ('foo', 'bar'),
+        ])
+
+    @patch('pipconflictchecker.distributions.sys')
+    def test_dist_info_source_sys_path(self, mock_sys):
+        mock_sys.path = ['', self.directory]
+        self.write_file('a-1.0.dist-info/METADATA', 'Name: a\n')
+        self.assertEqual(len(DistInfoSource().get_distributions()), 1)
+
+    def test_pkg_resources_source(self):
+        distributions = PkgResourcesSource().get_distributions()
+        self.assertIn('mock', [dist.project_name for dist in distributions])
+
+    def test_get_installed_distributions(self):
+        # Assert the default source finds the same projects as pkg_resources
+        self.assertEqual(
+            sorted((dist.project_name, dist.version) for dist in get_installed_distributions()),
+            sorted((dist.project_name, dist.version) for dist in get_installed_distributions('pkg_resources'))
+        )
+
+    @patch.object(DistInfoSource, 'get_distributions', return_value=[])
+    @patch.object(PkgResourcesSource, 'get_distributions', return_value=['dist'])
+    def test_get_installed_distributions_fallback(self, *mocks):
+        self.assertEqual(get_installed_distributions(), ['dist'])
+        self.assertEqual(get_installed_distributions('dist-info'), [])
+
+    def test_get_distribution_source(self):
+        source = DistInfoSource()
+        self.assertIs(get_distribution_source(source), source)
+        self.assertIsInstance(get_distribution_source(), DefaultSource)
+        self.assertIsInstance(get_distribution_source('pkg_resources'), PkgResourcesSource)
+
+    def test_dist_info_source_unreadable_metadata(self):
+        # foo was left behind by an interrupted install and has no METADATA
+        self.write_file('a-1.0.dist-info/METADATA', 'Name: a\nVersion: 1.0\nRequires-Dist: foo (>=2.0)\n')
+        os.makedirs(os.path.join(self.directory, 'foo-1.0.dist-info'))
+        source = DistInfoSource([self.directory])
+
+        # Assert the rest is checked and foo stands in with the version of its entry name and no requirements
+        from pipconflictchecker.checker import Checker
+        conflicts = Checker(source=source).get_conflicts()
+        self.assertEqual([(conflict.project_name, conflict.installed_version) for conflict in conflicts], [
+            ('foo', '1.0'),
+        ])
+        foo = source.distributions[1]
+        self.assertEqual((foo.project_name, foo.version, foo.requires()), ('foo', '1.0', []))
+        self.assertEqual(len(source.get_warnings()), 1)
+        self.assertTrue(source.get_warnings()[0].startswith(
+            'Cannot read the metadata of {0}, its requirements were not checked'.format(foo.egg_info)
+        ))
+
+        # Assert the metadata cache reads it the same way
+        checker = Checker(source=DistInfoSource([self.directory]), cache_path=os.path.join(self.directory, 'c.json'))
+        self.assertEqual(len(checker.get_conflicts()), 1)
+
+    def test_checker_wildcard_and_legacy_versions(self):
+        # Imported here since the checker builds on the distributions
+        from pipconflictchecker.checker import Checker
+        self.write_file('a-1.0.dist-info/METADATA', (
+            'Name: a\nVersion: 1.0\nRequires-Dist: b (!=2.0.*,>=1.0)\nRequires-Dist: c (==1.*)\n'
+            'Requires-Dist: d (>=2.0)\n'
+        ))
+        self.write_file('b-2.0.1.dist-info/METADATA', 'Name: b\nVersion: 2.0.1\n')
+        self.write_file('c-1.5.dist-info/METADATA', 'Name: c\nVersion: 1.5\n')
+        self.write_file('d-1.0_custom.dist-info/METADATA', 'Name: d\nVersion: 1.0_custom\n')
+        conflicts = Checker(source=DistInfoSource([self.directory])).get_conflicts()
+
+        # Assert wildcards are matched as strings and the version that is not PEP 440 sorts before 2.0
+        self.assertEqual([(conflict.project_name, conflict.installed_version) for conflict in conflicts], [
+            ('d', '1.0_custom'),
+        ])
+
+    def test_get_installed_distributions_source_instance(self):
+        source = DistInfoSource([self.directory])
+        with patch.object(source, 'get_distributions', return_value=['dist']) as mock_get_distributions:
+            self.assertEqual(get_installed_distributions(source, jobs=2), ['dist'])
+        mock_get_distributions.assert_called_once_with(2)
+
+
+class StartupTest(TestCase):
+    def test_import_does_not_load_pkg_resources(self):
+        output = subprocess.check_output([
+            sys.executable,
+            '-c',
+            (
+                'import sys, time\n'
+                'start = time.time()\n'
+                'import pipconflictchecker.checker\n'
+                'print(time.time() - start)\n'
+                'print("pkg_resources" in sys.modules)\n'
+            )
+        ], cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))).decode('utf-8').split()
+
+        # Report the startup time with the test results
+        sys.stderr.write('\npipconflictchecker.checker import time: {0:.1f}ms\n'.format(float(output[0]) * 1000))
+        self.assertEqual(output[1], 'False')
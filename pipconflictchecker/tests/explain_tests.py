@@ -0,0 +1,65 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from unittest import TestCase
+
+from pipconflictchecker.checker import Conflict
+from pipconflictchecker.explain import DependencyPaths
+from pipconflictchecker.snapshot import EnvironmentSnapshot
+
+
+class DependencyPathsTest(TestCase):
+    def setUp(self):
+        super(DependencyPathsTest, self).setUp()
+
+        # app reaches lib directly and through web, tool also reaches it through Web_Kit
+        self.snapshot = EnvironmentSnapshot()
+        self.snapshot.add_distribution('app', '1.0', [('web-kit', []), ('lib', [('>=', '2.0')])])
+        self.snapshot.add_distribution('Web_Kit', '1.0', [('lib', []), ('core', []), ('missing', [])])
+        self.snapshot.add_distribution('tool', '1.0', [('web.kit', [])])
+        self.snapshot.add_distribution('lib', '1.0', [('core', [])])
+        self.snapshot.add_distribution('core', '1.0', [])
+
+    def test_adjacency(self):
+        paths = DependencyPaths(self.snapshot)
+
+        # Assert the nodes are numbered in name order and the edges to installed projects are kept
+        self.assertEqual(paths.names, ['Web_Kit', 'app', 'core', 'lib', 'tool'])
+        self.assertEqual(paths.offsets, [0, 2, 4, 4, 5, 6])
+        self.assertEqual(paths.targets, [2, 3, 0, 3, 2, 0])
+        self.assertEqual(sorted(paths.iter_edges()), [(0, 2), (0, 3), (1, 0), (1, 3), (3, 2), (4, 0)])
+        self.assertEqual(paths.get_roots(), [1, 4])
+
+    def test_get_path(self):
+        paths = DependencyPaths(self.snapshot)
+
+        # Assert the shortest path from the first root to reach a project is used
+        self.assertEqual(paths.get_path('lib'), ['app', 'lib'])
+        self.assertEqual(paths.get_path('CORE'), ['app', 'Web_Kit', 'core'])
+        self.assertEqual(paths.get_path('tool'), ['tool'])
+        self.assertEqual(paths.get_path('missing'), ['missing'])
+
+    def test_explain(self):
+        paths = DependencyPaths(self.snapshot)
+        conflict = Conflict('lib', 'app', '1.0', [('>=', '2.0')])
+        self.assertEqual(paths.explain(conflict), ['app', 'lib'])
+        conflict = Conflict('core', 'lib', '1.0', [('>=', '2.0')])
+        self.assertEqual(paths.explain(conflict), ['app', 'lib', 'core'])
+
+    def test_cycle(self):
+        # one and two only require each other and three is required from the cycle
+        snapshot = EnvironmentSnapshot()
+        snapshot.add_distribution('one', '1.0', [('two', []), ('one', [])])
+        snapshot.add_distribution('two', '1.0', [('one', []), ('three', [])])
+        snapshot.add_distribution('three', '1.0', [])
+        paths = DependencyPaths(snapshot)
+
+        # Assert the cycle is entered at its first project
+        self.assertEqual(paths.get_roots(), [])
+        self.assertEqual(paths.get_path('three'), ['one', 'two', 'three'])
+        self.assertEqual(paths.get_path('one'), ['one'])
+
+    def test_empty(self):
+        paths = DependencyPaths(EnvironmentSnapshot())
+        self.assertEqual(paths.parents, [])
+        self.assertEqual(paths.get_path('one'), ['one'])
@@ -0,0 +1,192 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import os
+from mock import Mock, patch
+from pipconflictchecker import fleet
+from pipconflictchecker.checker import main
+from pipconflictchecker.fleet import (
+    check_environment, check_fleet, format_fleet_report, get_content_hash, init_worker, iter_environment_paths,
+    load_environment, run_fleet
+)
+from pipconflictchecker.snapshot import EnvironmentSnapshot
+from pipconflictchecker.tests.wheelhouse_tests import WheelhouseTestCase
+
+
+class FleetTestCase(WheelhouseTestCase):
+    def setUp(self):
+        super(FleetTestCase, self).setUp()
+        self.hosts = os.path.join(self.directory, 'hosts')
+        os.makedirs(self.hosts)
+
+    def save_snapshot(self, file_name, distributions):
+        snapshot = EnvironmentSnapshot()
+        for dist_metadata in distributions:
+            snapshot.add_distribution(*dist_metadata)
+        path = os.path.join(self.hosts, file_name)
+        snapshot.save(path)
+        return path
+
+    def write_listing(self, file_name, content):
+        path = os.path.join(self.hosts, file_name)
+        with open(path, 'w') as listing_file:
+            listing_file.write(content)
+        return path
+
+
+class FleetFunctionsTest(FleetTestCase):
+    def test_check_environment(self):
+        snapshot = EnvironmentSnapshot()
+        snapshot.add_distribution('one', '1.0', [])
+        snapshot.add_distribution('two', '1.0', [('one', [('>=', '2.0')])])
+        init_worker()
+
+        # Assert the conflicts were found with the validation cache of the worker
+        conflicts = check_environment(snapshot.to_dict())
+        self.assertEqual([(conflict.project_name, conflict.required_project_name) for conflict in conflicts], [
+            ('one', 'two')
+        ])
+        self.assertEqual(fleet.worker_validation_cache.misses, 1)
+        self.assertTrue(fleet.worker_validation_cache.batch)
+        check_environment(snapshot.to_dict())
+        self.assertEqual(fleet.worker_validation_cache.hits, 1)
+
+    def test_get_content_hash(self):
+        first = EnvironmentSnapshot()
+        first.add_distribution('one', '1.0', [('two', [('>=', '1.0'), ('<', '2.0')])])
+        first.add_distribution('two', '1.0', [])
+        second = EnvironmentSnapshot()
+        second.add_distribution('two', '1.0', [])
+        second.add_distribution('one', '1.0', [('two', [('<', '2.0'), ('>=', '1.0')])])
+
+        # Assert identical environments share a hash no matter how they were built
+        self.assertEqual(get_content_hash(first.to_dict()), get_content_hash(second.to_dict()))
+        second.add_distribution('three', '1.0', [])
+        self.assertNotEqual(get_content_hash(first.to_dict()), get_content_hash(second.to_dict()))
+
+    def test_iter_environment_paths(self):
+        first = self.save_snapshot('b.json', [])
+        second = self.save_snapshot('a.json', [])
+        os.makedirs(os.path.join(self.hosts, 'nested'))
+        self.assertEqual(list(iter_environment_paths([self.hosts, first])), [second, first, first])
+
+    def test_load_environment(self):
+        self.write_wheel('requests', '2.0.0', ['six (>=1.10)'])
+        snapshot_path = self.save_snapshot('snapshot.json', [('one', '1.0', [])])
+        listing_path = self.write_listing('freeze.txt', 'requests==2.0.0\nsix==1.9.0\n')
+
+        # Assert snapshots are loaded and listings are read through the wheelhouse
+        snapshot, warnings = load_environment(snapshot_path)
+        self.assertEqual((snapshot.installed_versions, warnings), ({'one': '1.0'}, []))
+        snapshot, warnings = load_environment(listing_path, self.directory)
+        self.assertEqual(snapshot.installed_versions, {'requests': '2.0.0', 'six': '1.9.0'})
+        self.assertEqual(snapshot.requirements['requests'], {'six': set([('>=', '1.10')])})
+        self.assertEqual(warnings, ['No wheel for six==1.9.0, its requirements were not checked'])
+
+        # Assert a listing needs a wheelhouse
+        with self.assertRaises(ValueError):
+            load_environment(listing_path)
+
+        # Assert a file that pins nothing is not an environment
+        junk_path = self.write_listing('notes.md', '# Hosts\nSee the wiki.\n')
+        with self.assertRaises(ValueError):
+            load_environment(junk_path, self.directory)
+
+
+class CheckFleetTest(FleetTestCase):
+    def setUp(self):
+        super(CheckFleetTest, self).setUp()
+        conflicted = [('one', '1.0', []), ('two', '1.0', [('one', [('>=', '2.0')])])]
+        self.conflicted_paths = [self.save_snapshot('host{0}.json'.format(index), conflicted) for index in range(3)]
+        self.clean_path = self.save_snapshot('host3.json.gz', [('one', '2.0', []), ('two', '1.0', [])])
+        self.listing_path = self.write_listing('host4.txt', 'one==1.0\ntwo==1.0\n')
+
+    def test_check_fleet(self):
+        with patch('pipconflictchecker.fleet.check_environment', wraps=check_environment) as mock_check_environment:
+            report = check_fleet([self.hosts])
+
+        # Assert identical environments were checked once
+        self.assertEqual(mock_check_environment.call_count, 2)
+        self.assertEqual([environment.paths for environment in report.environments], [
+            self.conflicted_paths,
+            [self.clean_path],
+        ])
+        self.assertEqual(len(report.environments[0].conflicts), 1)
+        self.assertEqual(report.environments[1].conflicts, [])
+
+        # Assert the listing could not be read without a wheelhouse
+        self.assertEqual([path for path, _ in report.errors], [self.listing_path])
+
+    def test_check_fleet_processes(self):
+        serial_report = check_fleet([self.hosts])
+        parallel_report = check_fleet([self.hosts], jobs=2)
+        self.assertEqual(
+            [(environment.content_hash, environment.paths, len(environment.conflicts))
+             for environment in parallel_report.environments],
+            [(environment.content_hash, environment.paths, len(environment.conflicts))
+             for environment in serial_report.environments]
+        )
+
+    def test_check_fleet_wheelhouse(self):
+        self.write_wheel('two', '1.0', ['one (>=2.0)'])
+        report = check_fleet([self.listing_path], wheelhouse_path=self.directory)
+
+        # Assert the listing was read through the wheelhouse and the index was saved
+        self.assertEqual(len(report.environments[0].conflicts), 1)
+        self.assertEqual(report.errors, [])
+        self.assertEqual(report.warnings, [
+            (self.listing_path, 'No wheel for one==1.0, its requirements were not checked'),
+        ])
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, '.pipconflictchecker-index.json')))
+
+    def test_format_fleet_report(self):
+        lines = format_fleet_report(check_fleet([self.hosts]))
+
+        # Assert only the environments with conflicts were listed, followed by the summary
+        self.assertEqual(lines[3:7], ['   {0}'.format(path) for path in self.conflicted_paths] + [
+            ' - one(1.0) two(>=2.0)'
+        ])
+        self.assertNotIn('   {0}'.format(self.clean_path), lines)
+        self.assertEqual(lines[8:], [
+            ' Fleet Summary',
+            '-' * 50,
+            ' Hosts: 4 (2 distinct environments)',
+            ' Hosts with conflicts: 3 (1 distinct environments)',
+            ' Most common conflicts:',
+            '      3 hosts: one(1.0) two(>=2.0)',
+            ' Unreadable:',
+            '   {0}: not a snapshot, frozen package listings need --wheelhouse'.format(self.listing_path),
+        ])
+
+    def test_format_fleet_report_warnings(self):
+        self.write_wheel('two', '1.0', ['one (>=2.0)'])
+        junk_path = self.write_listing('README', 'Snapshots of every host\n')
+        lines = format_fleet_report(check_fleet([self.listing_path, junk_path], wheelhouse_path=self.directory))
+
+        # Assert the file without pins is unreadable and the warnings of the listing end the summary
+        self.assertEqual(lines[-4:], [
+            ' Unreadable:',
+            '   {0}: not a snapshot or a frozen package listing, nothing is pinned'.format(junk_path),
+            ' Warnings:',
+            '   {0}: No wheel for one==1.0, its requirements were not checked'.format(self.listing_path),
+        ])
+        self.assertEqual(run_fleet([junk_path], wheelhouse_path=self.directory, output=Mock()), 1)
+
+    def test_format_fleet_report_counts_shared_conflicts(self):
+        self.save_snapshot('other.json', [
+            ('one', '1.0', []),
+            ('two', '1.0', [('one', [('>=', '2.0')])]),
+            ('three', '1.0', []),
+        ])
+        lines = format_fleet_report(check_fleet([self.hosts]))
+        self.assertIn('      4 hosts: one(1.0) two(>=2.0)', lines)
+
+    def test_run_fleet(self):
+        output = Mock()
+        self.assertEqual(run_fleet([self.clean_path], output=output), 0)
+        self.assertEqual(run_fleet([self.hosts], output=output), 1)
+        self.assertEqual(run_fleet([self.listing_path], output=output), 1)
+
+    @patch('pipconflictchecker.fleet.run_fleet', return_value=0)
+    def test_main(self, mock_run_fleet):
+        self.assertEqual(main(['--fleet', self.hosts, 'other', '--jobs', '4']), 0)
+        mock_run_fleet.assert_called_once_with([self.hosts, 'other'], 4, None, None)
@@ -0,0 +1,179 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from mock import patch
+from unittest import TestCase
+from pipconflictchecker.checker import Checker
+from pipconflictchecker.graph import DependencyGraph
+from pipconflictchecker.snapshot import DistributionMetadata
+from pipconflictchecker.snapshot import EnvironmentSnapshot
+
+
+class DependencyGraphTest(TestCase):
+    def setUp(self):
+        super(DependencyGraphTest, self).setUp()
+        snapshot = EnvironmentSnapshot()
+        snapshot.add_distribution('one', '1.0', [])
+        snapshot.add_distribution('two', '1.0', [('one', [('>=', '1.0')])])
+        snapshot.add_distribution('three', '1.0', [('one', [('<', '2.0')]), ('two', [('>=', '1.0')])])
+        snapshot.add_distribution('four', '1.0', [('missing', [('>=', '1.0')])])
+        self.checker = Checker()
+        self.graph = DependencyGraph(self.checker, snapshot)
+        self.graph.check_all()
+
+    def get_edges_checked(self, function, *args, **kwargs):
+        with patch.object(self.checker, 'check_edge', wraps=self.checker.check_edge) as mock_check_edge:
+            result = function(*args, **kwargs)
+        edges = set((call[0][0], call[0][1]) for call in mock_check_edge.call_args_list)
+        return result, edges
+
+    def get_conflict_edges(self, conflicts):
+        return [(conflict.project_name, conflict.required_project_name) for conflict in conflicts]
+
+    def test_indexes(self):
+        self.assertEqual(self.graph.required_by, {
+            'one': set(['two', 'three']),
+            'two': set(['three']),
+            'missing': set(['four']),
+        })
+        self.assertEqual(self.graph.get_edges('one'), set([('one', 'two'), ('one', 'three')]))
+        self.assertEqual(self.graph.get_edges('three'), set([('one', 'three'), ('two', 'three')]))
+
+    def test_add_distribution_extras(self):
+        self.graph.add_distribution('five', '1.0', [], {'fast': [('two', [('>=', '2.0')])]}, [])
+
+        # Assert the edges of an extra requested of an installed project are returned and indexed
+        edges = self.graph.add_distribution('six', '1.0', [('five', [])], {}, [(None, 'five', 'fast')])
+        self.assertEqual(edges, set([('five', 'six'), ('two', 'five')]))
+        self.assertEqual(self.graph.required_by['two'], set(['three', 'five']))
+
+    def test_name_spellings(self):
+        self.graph.add_distribution('Zope.Interface', '4.0', [])
+        edges = self.graph.add_distribution('five', '1.0', [('zope_interface', [('>=', '5.0')])])
+        self.assertEqual(edges, set([('zope-interface', 'five')]))
+
+        # Assert the edge is checked against the installed distribution and found again when it changes
+        created, _ = self.graph.check_edges(edges)
+        self.assertEqual(self.get_conflict_edges(created), [('Zope.Interface', 'five')])
+        _, resolved = self.graph.check_delta(upgraded=[('Zope.Interface', '5.0')])
+        self.assertEqual(self.get_conflict_edges(resolved), [('Zope.Interface', 'five')])
+
+    def test_check_all(self):
+        self.assertEqual(self.graph.get_conflicts(), [])
+
+        # Assert conflicts that no longer have an edge are resolved
+        self.graph.snapshot.requirements['two']['one'] = set([('>=', '2.0')])
+        self.assertEqual(self.get_conflict_edges(self.graph.check_all().created), [('one', 'two')])
+        del self.graph.snapshot.requirements['two']['one']
+        self.assertEqual(self.get_conflict_edges(self.graph.check_all().resolved), [('one', 'two')])
+
+    def test_check_delta_upgraded(self):
+        # Assert the upgrade only checks the edges of the upgraded project
+        delta, edges = self.get_edges_checked(self.graph.check_delta, upgraded=[('one', '2.0')])
+        self.assertEqual(edges, set([('one', 'two'), ('one', 'three')]))
+        self.assertEqual(self.get_conflict_edges(delta.created), [('one', 'three')])
+        self.assertEqual(delta.resolved, [])
+
+        # Assert the requirements were kept and downgrading resolves the conflict
+        self.assertEqual(self.graph.snapshot.requirements['one'], {})
+        delta = self.graph.check_delta(upgraded=[('one', '1.5')])
+        self.assertEqual(delta.created, [])
+        self.assertEqual(self.get_conflict_edges(delta.resolved), [('one', 'three')])
+
+    def test_check_delta_upgraded_requirements(self):
+        delta = self.graph.check_delta(upgraded=[('two', '2.0', [('one', [('>=', '1.5')])])])
+        self.assertEqual(self.get_conflict_edges(delta.created), [('one', 'two')])
+        self.assertEqual(self.graph.snapshot.installed_versions['two'], '2.0')
+
+    def test_check_delta_added_and_removed(self):
+        delta = self.graph.check_delta(added=[('missing', '0.1', [])], removed=['two'])
+
+        # Assert the new project conflicts and a missing requirement is not reported, like the full check
+        self.assertEqual(self.get_conflict_edges(delta.created), [('missing', 'four')])
+        self.assertNotIn('two', self.graph.snapshot.installed_versions)
+        self.assertEqual(self.graph.required_by['one'], set(['three']))
+
+    def test_check_delta_not_committed(self):
+        delta = self.graph.check_delta(upgraded=[('one', '2.0')], added=[('missing', '0.1', [])], commit=False)
+
+        # Assert the delta was computed but the graph was left alone
+        self.assertEqual(self.get_conflict_edges(delta.created), [('missing', 'four'), ('one', 'three')])
+        self.assertEqual(self.graph.get_conflicts(), [])
+        self.assertEqual(self.graph.snapshot.installed_versions['one'], '1.0')
+        self.assertNotIn('missing', self.graph.snapshot.installed_versions)
+        self.assertEqual(self.graph.required_by['one'], set(['two', 'three']))
+
+    def test_check_delta_extras(self):
+        self.graph.add_distribution('five', '1.0', [('one', [])], {'x': [('one', [('>=', '5.0')])]}, [])
+        self.graph.add_distribution('six', '1.0', [('five', [])], {}, [(None, 'five', 'x')])
+        self.graph.check_all()
+        state = self.graph.snapshot.save_state(self.graph.snapshot.installed_versions)
+
+        # Assert a proposed change leaves the extras of every project as they were
+        self.graph.check_delta(upgraded=[('five', '2.0')], commit=False)
+        self.graph.check_delta(removed=['six'], commit=False)
+        self.assertEqual(self.graph.snapshot.save_state(self.graph.snapshot.installed_versions), state)
+
+        # Assert an extra a proposed project requests is not kept
+        self.graph.remove_distribution('six')
+        self.graph.snapshot.requirements['five']['one'] = set()
+        self.graph.snapshot.active_extras['five'] = set()
+        self.graph.check_all()
+        state = self.graph.snapshot.save_state(self.graph.snapshot.installed_versions)
+        delta = self.graph.check_delta(added=[('six', '1.0', [], {}, [(None, 'five', 'x')])], commit=False)
+        self.assertEqual(self.get_conflict_edges(delta.created), [('one', 'five')])
+        self.assertEqual(self.graph.snapshot.save_state(self.graph.snapshot.installed_versions), state)
+        self.assertEqual(self.graph.required_by['one'], set(['two', 'three', 'five']))
+
+    def test_check_delta_removed_requester(self):
+        # five requests the x extra of lib, which conflicts with one, and six requests its y extra
+        extra_requirements = {'x': [('one', [('>=', '2.0')])], 'y': [('one', [('!=', '1.5')])]}
+        self.graph.add_distribution('lib', '1.0', [], extra_requirements)
+        self.graph.add_distribution('five', '1.0', [('lib', [])], {}, [(None, 'lib', 'x')])
+        self.graph.add_distribution('six', '1.0', [('lib', [])], {}, [(None, 'lib', 'y')])
+        self.graph.check_all()
+        self.assertEqual(self.get_conflict_edges(self.graph.get_conflicts()), [('one', 'lib')])
+
+        # Assert removing five takes the x extra back out of lib and resolves its conflict
+        delta = self.graph.check_delta(removed=['five'])
+        self.assertEqual(self.get_conflict_edges(delta.resolved), [('one', 'lib')])
+        self.assertEqual(self.graph.get_conflicts(), [])
+        self.assertEqual(self.graph.snapshot.requirements['lib'], {'one': set([('!=', '1.5')])})
+        self.assertEqual(self.graph.snapshot.active_extras['lib'], set(['y']))
+
+        # Assert removing six leaves lib with what it declares itself
+        self.graph.check_delta(removed=['six'])
+        self.assertEqual(self.graph.snapshot.requirements['lib'], {})
+        self.assertEqual(self.graph.required_by['one'], set(['two', 'three']))
+
+    def test_check_delta_upgraded_extras(self):
+        self.graph.add_distribution('five', '1.0', [], {'x': [('one', [('>=', '5.0')])]}, [(None, 'two', 'y')])
+
+        # Assert upgrading without new requirements keeps the extras of the project
+        self.graph.check_delta(upgraded=[('five', '2.0')])
+        self.assertEqual(self.graph.snapshot.extra_requirements['five'], {'x': [('one', [('>=', '5.0')])]})
+        self.assertEqual(self.graph.snapshot.requested_extras['five'], [(None, 'two', 'y')])
+
+    def test_check_delta_upgraded_requirements_extras(self):
+        self.graph.add_distribution('five', '1.0', [], {'x': [('one', [('>=', '5.0')])]})
+        self.graph.add_distribution('six', '1.0', [('five', [])], {}, [(None, 'five', 'x')])
+        self.graph.check_all()
+
+        # Assert upgrading with only new requirements keeps the extra six requests of five
+        delta = self.graph.check_delta(upgraded=[('five', '1.1', [])], commit=False)
+        self.assertEqual(delta.created, [])
+        self.assertEqual(delta.resolved, [])
+
+        # Assert full metadata replaces the extras of the project
+        delta = self.graph.check_delta(upgraded=[DistributionMetadata('five', '2.0', [], {}, [])])
+        self.assertEqual(self.get_conflict_edges(delta.resolved), [('one', 'five')])
+        self.assertNotIn('five', self.graph.snapshot.extra_requirements)
+
+    def test_checker_get_dependency_graph(self):
+        checker = Checker()
+        checker.snapshot = self.graph.snapshot
+        checker.snapshot.requirements['two']['one'] = set([('>=', '2.0')])
+        graph = checker.get_dependency_graph()
+
+        # Assert the graph was checked and shares the snapshot
+        self.assertIs(graph.snapshot, checker.snapshot)
+        self.assertEqual(self.get_conflict_edges(graph.get_conflicts()), [('one', 'two')])
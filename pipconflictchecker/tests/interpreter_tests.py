@@ -0,0 +1,117 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import os
+import subprocess
+import sys
+from mock import patch
+from unittest import TestCase
+from pipconflictchecker.checker import Checker, main
+from pipconflictchecker.distributions import DistInfoSource
+from pipconflictchecker.interpreter import (
+    get_payload_source, InterpreterSource, RemoteDistribution, run_payload
+)
+
+
+def get_requirements(distributions):
+    return sorted(
+        (dist.project_name, dist.version, sorted((req.project_name, tuple(req.specs)) for req in dist.requires()))
+        for dist in distributions
+    )
+
+
+class RunPayloadTest(TestCase):
+    def test_get_payload_source(self):
+        source = get_payload_source()
+
+        # Assert the payload only needs the standard library
+        self.assertIn('def main(', source)
+        self.assertNotIn('pipconflictchecker', source.split('"""')[2])
+
+    def test_run_payload(self):
+        dump = run_payload(sys.executable)
+
+        # Assert the payload sees the same distributions as this interpreter
+        distributions = InterpreterSource(sys.executable).get_distributions()
+        self.assertEqual(len(distributions), len(dump['distributions']))
+        self.assertEqual(get_requirements(distributions), get_requirements(DistInfoSource().get_distributions()))
+
+    def test_run_payload_fails(self):
+        with self.assertRaises(ValueError):
+            run_payload('false')
+        with self.assertRaises(OSError):
+            run_payload(os.path.join(os.path.dirname(__file__), 'missing-python'))
+
+    @patch('pipconflictchecker.interpreter.subprocess.Popen')
+    def test_run_payload_unexpected_output(self, mock_popen):
+        mock_popen.return_value.returncode = 0
+        for stdout in (b'not json', b'{"version": 0}', b'[]'):
+            mock_popen.return_value.communicate.return_value = (stdout, b'')
+            with self.assertRaises(ValueError):
+                run_payload(sys.executable)
+
+        # Assert the payload was sent on stdin
+        mock_popen.assert_called_with(
+            [sys.executable, '-'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+
+
+class RemoteDistributionTest(TestCase):
+    def test_dist_info(self):
+        dist = RemoteDistribution(
+            '/site-packages/test_project-1.0.dist-info',
+            'Name: test_project\nVersion: 1.0\nRequires-Dist: enum34 ; python_version < "3"\nRequires-Dist: six\n',
+            None,
+            {'python_version': '2.7'}
+        )
+
+        # Assert markers are evaluated against the other interpreter
+        self.assertEqual((dist.project_name, dist.version), ('test-project', '1.0'))
+        self.assertEqual([requirement.project_name for requirement in dist.requires()], ['enum34', 'six'])
+        self.assertIs(dist.get_metadata(), dist.get_metadata())
+
+    def test_egg_info(self):
+        dist = RemoteDistribution('/site-packages/test.egg-info', None, 'six>=1.0\n\n[test]\npytest\n', {})
+        self.assertEqual(dist.get_metadata()[:2], (None, None))
+        self.assertEqual([requirement.specs for requirement in dist.requires()], [[('>=', '1.0')]])
+
+
+class InterpreterSourceTest(TestCase):
+    @patch('pipconflictchecker.interpreter.run_payload')
+    def test_load_once(self, mock_run_payload):
+        mock_run_payload.return_value = {
+            'environment': {'python_version': '2.7'},
+            'distributions': [['/site-packages/one-1.0.dist-info', 'Name: one\nRequires-Dist: six\n', None]],
+        }
+        source = InterpreterSource('/usr/bin/python2')
+        distributions = source.get_distributions()
+        source.get_distributions()
+
+        # Assert the payload ran once and the distributions carry the other marker environment
+        mock_run_payload.assert_called_once_with('/usr/bin/python2')
+        self.assertEqual(distributions[0].marker_environment, {'python_version': '2.7'})
+        self.assertEqual(get_requirements(distributions), [('one', '1.0', [('six', ())])])
+
+    def test_checker(self):
+        checker = Checker(source=InterpreterSource(sys.executable))
+        self.assertEqual(checker.get_installed_versions(), Checker().get_installed_versions())
+
+    @patch('pipconflictchecker.checker.Checker')
+    def test_main(self, mock_checker):
+        mock_checker.return_value.get_conflicts.return_value = []
+        self.assertEqual(main(['--python', sys.executable]), 0)
+        source = mock_checker.call_args[1]['source']
+        self.assertIsInstance(source, InterpreterSource)
+        self.assertEqual(source.python, sys.executable)
+
+    @patch('sys.stderr')
+    def test_main_invalid(self, mock_stderr):
+        for args in (
+            ['--python', 'false'],
+            ['--python', sys.executable, '--wheelhouse', '.'],
+            ['--python', sys.executable, '--watch'],
+        ):
+            with self.assertRaises(SystemExit):
+                main(args)
@@ -0,0 +1,144 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import os
+from mock import patch
+from pipconflictchecker.checker import Checker, main
+from pipconflictchecker.lockfile import (
+    get_pinned_version, iter_requirement_lines, LockfileSource, PinnedDistribution
+)
+from pipconflictchecker.metadata import Requirement
+from pipconflictchecker.tests.wheelhouse_tests import WheelhouseTestCase
+
+
+class LockfileTestCase(WheelhouseTestCase):
+    def write_requirements(self, content, filename='requirements.txt'):
+        path = os.path.join(self.directory, filename)
+        with open(path, 'w') as requirements_file:
+            requirements_file.write(content)
+        return path
+
+
+class IterRequirementLinesTest(LockfileTestCase):
+    def test_iter_requirement_lines(self):
+        self.write_requirements('six==1.16.0\n-r requirements.txt\n', filename='base.txt')
+        path = self.write_requirements((
+            '# a comment\n'
+            '--index-url https://example.com/simple\n'
+            '-r base.txt\n'
+            '--requirement=base.txt\n'
+            'requests==2.0.0 \\\n'
+            '    --hash=sha256:abcd\n'
+            '\n'
+            'idna==2.0  # via requests\n'
+        ))
+
+        # Assert every file is only read once even when included again
+        self.assertEqual(list(iter_requirement_lines(path)), ['six==1.16.0', 'requests==2.0.0', 'idna==2.0'])
+
+
+class GetPinnedVersionTest(LockfileTestCase):
+    def test_get_pinned_version(self):
+        self.assertEqual(get_pinned_version(Requirement('six', [('==', '1.0')])), '1.0')
+        self.assertEqual(get_pinned_version(Requirement('six', [('===', '1.0')])), '1.0')
+        self.assertIsNone(get_pinned_version(Requirement('six', [('==', '1.*')])))
+        self.assertIsNone(get_pinned_version(Requirement('six', [('>=', '1.0')])))
+        self.assertIsNone(get_pinned_version(Requirement('six', [])))
+        self.assertIsNone(get_pinned_version(Requirement('six', [('>=', '1.0'), ('<', '2.0')])))
+
+
+class PinnedDistributionTest(LockfileTestCase):
+    def test_pinned_distribution(self):
+        dist = PinnedDistribution('six', '1.0')
+        self.assertEqual((dist.project_name, dist.version, dist.requires()), ('six', '1.0', []))
+        self.assertEqual(repr(dist), "PinnedDistribution('six', '1.0')")
+
+
+class LockfileSourceTest(LockfileTestCase):
+    def setUp(self):
+        super(LockfileSourceTest, self).setUp()
+        self.write_wheel('requests', '2.0.0', ['idna (<3,>=2.5)', 'six'])
+        self.write_wheel('idna', '2.0')
+        self.requirements_path = self.write_requirements((
+            'requests==2.0.0\n'
+            'idna==2.0\n'
+            'IDNA==3.0\n'
+            'six==1.16.0\n'
+            'enum34==1.1 ; python_version < "3"\n'
+            'pytest>=3\n'
+            'git+https://example.com/project.git\n'
+        ))
+
+    def test_get_distributions(self):
+        source = LockfileSource(self.requirements_path, self.directory)
+        distributions = source.get_distributions()
+
+        # Assert pins with a wheel read it and the others stand in without requirements
+        self.assertEqual(
+            [(dist.project_name, dist.version) for dist in distributions],
+            [('requests', '2.0.0'), ('idna', '2.0'), ('six', '1.16.0')]
+        )
+        self.assertIsInstance(distributions[2], PinnedDistribution)
+        self.assertEqual(source.missing, [('six', '1.16.0')])
+        self.assertEqual(source.unpinned, ['pytest>=3', 'git+https://example.com/project.git'])
+
+        # Assert the lists are rebuilt on every call
+        source.get_distributions()
+        self.assertEqual(source.missing, [('six', '1.16.0')])
+
+    def test_get_warnings(self):
+        source = LockfileSource(self.requirements_path, self.directory)
+        source.get_distributions()
+        self.assertEqual(source.get_warnings(), [
+            'Skipped a requirement that does not pin a version: pytest>=3',
+            'Skipped a requirement that does not pin a version: git+https://example.com/project.git',
+            'No wheel for six==1.16.0, its requirements were not checked',
+        ])
+
+    def test_get_warnings_bad_wheel(self):
+        bad_path = os.path.join(self.directory, 'six-1.16.0-py2.py3-none-any.whl')
+        with open(bad_path, 'w') as wheel_file:
+            wheel_file.write('not a zip')
+        source = LockfileSource(self.requirements_path, self.directory)
+        distributions = source.get_distributions()
+
+        # Assert the pin stands in without requirements and the wheel is reported instead of as missing
+        self.assertIsInstance(distributions[2], PinnedDistribution)
+        self.assertEqual(source.missing, [])
+        self.assertEqual(source.unreadable, [bad_path])
+        warning = 'Skipped a wheel that cannot be read: {0}'.format(bad_path)
+        self.assertTrue(source.get_warnings()[-1].startswith(warning))
+
+        # Assert a source sharing the wheelhouse only reports the wheels of its own pins
+        other_source = LockfileSource(self.write_requirements('idna==2.0\n', 'other.txt'), source.wheelhouse)
+        other_source.get_distributions()
+        self.assertEqual(other_source.get_warnings(), [])
+
+    def test_checker(self):
+        checker = Checker(source=LockfileSource(self.requirements_path, self.directory))
+        conflicts = checker.get_conflicts()
+
+        # Assert the pinned set was checked without installing anything
+        self.assertEqual(
+            [(conflict.project_name, conflict.required_project_name) for conflict in conflicts],
+            [('idna', 'requests')]
+        )
+
+    @patch('pipconflictchecker.checker.sys.stderr')
+    @patch('pipconflictchecker.checker.print', create=True)
+    def test_main(self, mock_print, mock_stderr):
+        self.assertEqual(main(['--requirements', self.requirements_path, '--wheelhouse', self.directory]), 1)
+
+        # Assert the conflict was printed and the warnings went to stderr
+        lines = [call[0][0] for call in mock_print.call_args_list]
+        self.assertTrue(lines[-1].startswith(' - idna(2.0) requests('))
+        output = ''.join(call[0][0] for call in mock_stderr.write.call_args_list)
+        self.assertIn('No wheel for six==1.16.0', output)
+
+    @patch('sys.stderr')
+    def test_main_invalid(self, mock_stderr):
+        with self.assertRaises(SystemExit):
+            main(['--requirements', self.requirements_path])
+        with self.assertRaises(SystemExit):
+            main(['--requirements', os.path.join(self.directory, 'missing.txt'), '--wheelhouse', self.directory])
+        with self.assertRaises(SystemExit):
+            main(['--requirements', self.requirements_path, '--wheelhouse', self.directory, '--watch'])
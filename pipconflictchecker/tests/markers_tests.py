@@ -0,0 +1,69 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from mock import patch
+from unittest import TestCase
+from pipconflictchecker import markers
+from pipconflictchecker.markers import evaluate_marker, get_extra_key, marker_cache, MarkerCache
+
+
+class MarkerCacheTest(TestCase):
+    def test_evaluate_memoized(self):
+        cache = MarkerCache()
+        self.assertTrue(cache.evaluate('python_version >= "2.0"'))
+        self.assertTrue(cache.evaluate('python_version >= "2.0"'))
+        self.assertFalse(cache.evaluate('python_version < "3"', environment={'python_version': '3.8'}))
+        self.assertTrue(cache.evaluate('python_version < "3"', environment={'python_version': '2.7'}))
+
+        # Assert every distinct marker was parsed once and each result evaluated once
+        self.assertEqual(len(cache.markers), 2)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 3)
+
+    def test_evaluate_extra(self):
+        cache = MarkerCache()
+        self.assertTrue(cache.evaluate('extra == "test"', 'test'))
+        self.assertFalse(cache.evaluate('extra == "test"'))
+        self.assertFalse(cache.evaluate('extra == "test"', ''))
+
+        # Assert no extra and the empty extra share a result
+        self.assertEqual(cache.hits, 1)
+
+    def test_invalid_marker(self):
+        cache = MarkerCache()
+        self.assertTrue(cache.evaluate('not a marker'))
+        self.assertTrue(cache.evaluate('not a marker', environment={'python_version': '2.7'}))
+        self.assertIs(cache.get_marker('not a marker'), markers.INVALID_MARKER)
+
+    def test_evaluate_error(self):
+        cache = MarkerCache()
+        with patch.object(cache, 'get_marker') as mock_get_marker:
+            mock_get_marker.return_value.evaluate.side_effect = ValueError
+
+            # Assert a marker that fails to evaluate does not hide the requirement
+            self.assertTrue(cache.evaluate('python_version < "2"'))
+
+    def test_no_marker_implementation(self):
+        cache = MarkerCache()
+        with patch('pipconflictchecker.markers._load_marker_class', return_value=None):
+            self.assertTrue(cache.evaluate('python_version < "2"'))
+
+    def test_clear(self):
+        cache = MarkerCache()
+        cache.evaluate('python_version >= "2.0"')
+        cache.evaluate('python_version >= "2.0"')
+        cache.clear()
+        self.assertEqual((cache.markers, cache.results, cache.hits, cache.misses), ({}, {}, 0, 0))
+
+
+class EvaluateMarkerTest(TestCase):
+    def test_shared_cache(self):
+        marker = 'python_version >= "2.0" and os_name != "shared-cache-test"'
+        self.assertTrue(evaluate_marker(marker))
+        self.assertIn(marker, marker_cache.markers)
+
+
+class GetExtraKeyTest(TestCase):
+    def test_get_extra_key(self):
+        self.assertEqual(get_extra_key('Socks_Proxy'), 'socks-proxy')
+        self.assertEqual(get_extra_key('socks.proxy'), 'socks-proxy')
+        self.assertEqual(get_extra_key('socks--proxy'), 'socks-proxy')
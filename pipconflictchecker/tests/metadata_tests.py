@@ -0,0 +1,196 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import json
+import os
+import shutil
+import tempfile
+from mock import patch
+from unittest import TestCase
+from pipconflictchecker.metadata import (
+    dump_requirement, get_project_key, load_requirement, parse_metadata, parse_metadata_headers, parse_requirement,
+    parse_requires_txt, read_metadata, read_requires_txt, Requirement, safe_name
+)
+
+
+class SafeNameTest(TestCase):
+    def test_safe_name(self):
+        self.assertEqual(safe_name('prompt_toolkit'), 'prompt-toolkit')
+        self.assertEqual(safe_name('zope.interface'), 'zope.interface')
+
+    def test_get_project_key(self):
+        self.assertEqual(get_project_key('Foo_Bar'), 'foo-bar')
+        self.assertEqual(get_project_key('foo.bar'), 'foo-bar')
+        self.assertEqual(get_project_key('Foo.-_Bar'), 'foo-bar')
+
+
+class ParseRequirementTest(TestCase):
+    def test_plain(self):
+        requirement = parse_requirement('six')
+        self.assertEqual(requirement.project_name, 'six')
+        self.assertEqual(requirement.specs, [])
+        self.assertEqual(requirement.extras, ())
+        self.assertIsNone(requirement.marker)
+        self.assertIsNone(requirement.extra)
+
+    def test_specs(self):
+        requirement = parse_requirement('prompt_toolkit!=3.0.37,<3.1.0,>=3.0.30')
+        self.assertEqual(requirement.project_name, 'prompt-toolkit')
+        self.assertEqual(requirement.specs, [('!=', '3.0.37'), ('<', '3.1.0'), ('>=', '3.0.30')])
+
+    def test_parenthesized_specs_and_extras(self):
+        requirement = parse_requirement('requests[security, socks] (>=2.0, ~=2.1)')
+        self.assertEqual(requirement.project_name, 'requests')
+        self.assertEqual(requirement.specs, [('>=', '2.0'), ('~=', '2.1')])
+        self.assertEqual(requirement.extras, ('security', 'socks'))
+
+    def test_marker(self):
+        requirement = parse_requirement('pexpect>4.3; sys_platform != "win32"')
+        self.assertEqual(requirement.specs, [('>', '4.3')])
+        self.assertEqual(requirement.marker, 'sys_platform != "win32"')
+        self.assertIsNone(requirement.extra)
+
+    def test_extra_marker(self):
+        requirement = parse_requirement('PySocks!=1.5.7,>=1.5.6; extra == "socks"')
+        self.assertEqual(requirement.extra, 'socks')
+        self.assertIsNone(requirement.marker)
+
+        # Assert the rest of a combined marker is kept
+        requirement = parse_requirement('pytest ; python_version < "3" and extra == \'test\'')
+        self.assertEqual(requirement.extra, 'test')
+        self.assertEqual(requirement.marker, 'python_version < "3" and extra == \'test\'')
+
+    def test_section_marker(self):
+        requirement = parse_requirement('enum34; python_version < "3.4"', marker='sys_platform == "linux"', extra='x')
+        self.assertEqual(requirement.marker, '(sys_platform == "linux") and (python_version < "3.4")')
+        self.assertEqual(requirement.extra, 'x')
+
+        # Assert the section marker is used on its own
+        requirement = parse_requirement('enum34', marker='python_version < "3.4"')
+        self.assertEqual(requirement.marker, 'python_version < "3.4"')
+
+    def test_direct_reference(self):
+        requirement = parse_requirement('pip @ https://example.com/pip-1.0.tar.gz')
+        self.assertEqual(requirement.project_name, 'pip')
+        self.assertEqual(requirement.specs, [])
+
+    def test_invalid(self):
+        self.assertIsNone(parse_requirement('-e .'))
+
+    def test_repr(self):
+        self.assertEqual(repr(parse_requirement('six>=1.0')), "Requirement('six', [('>=', '1.0')])")
+
+
+class RequirementDataTest(TestCase):
+    def test_dump_and_load_requirement(self):
+        requirement = Requirement('six', [('>=', '1.0')], extras=('socks',), marker='python_version < "3"', extra='a')
+        data = dump_requirement(requirement)
+        self.assertEqual(data, ['six', [['>=', '1.0']], ['socks'], 'python_version < "3"', 'a'])
+
+        # Assert the requirement survives a trip through JSON
+        loaded = load_requirement(json.loads(json.dumps(data)))
+        self.assertEqual(
+            (loaded.project_name, loaded.specs, loaded.extras, loaded.marker, loaded.extra),
+            ('six', [('>=', '1.0')], ('socks',), 'python_version < "3"', 'a')
+        )
+
+
+class ReadMetadataTest(TestCase):
+    def setUp(self):
+        super(ReadMetadataTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write_file(self, file_name, content):
+        path = os.path.join(self.directory, file_name)
+        with open(path, 'w') as metadata_file:
+            metadata_file.write(content)
+        return path
+
+    def test_read_metadata(self):
+        path = self.write_file('METADATA', (
+            'Metadata-Version: 2.1\n'
+            'Name: test\n'
+            'Version: 1.0\n'
+            'Requires-Dist: six (>=1.10)\n'
+            'Requires-Dist: -e .\n'
+            'Requires-Dist: PySocks ; extra == "socks"\n'
+            '\n'
+            'Requires-Dist: not-a-header\n'
+        ))
+        name, version, requirements = read_metadata(path)
+        self.assertEqual(name, 'test')
+        self.assertEqual(version, '1.0')
+        self.assertEqual([requirement.project_name for requirement in requirements], ['six', 'PySocks'])
+
+    def test_parse_metadata_headers(self):
+        lines = [
+            'Name: test\n',
+            'Description: first line\n',
+            '        |second line\n',
+            'Requires-Dist: six\n',
+            '  (>=1.10)\n',
+            'Requires-Dist: mock\n',
+            'not a header\n',
+            'Version: 1.0\n',
+        ]
+
+        # Assert only the wanted headers are kept, with their continuation lines
+        self.assertEqual(parse_metadata_headers(lines), {
+            'Name': ['test'],
+            'Requires-Dist': ['six (>=1.10)', 'mock'],
+        })
+
+        # Assert other headers can be asked for
+        self.assertEqual(parse_metadata_headers(lines, names=('Description',)), {
+            'Description': ['first line |second line'],
+        })
+
+    @patch('pipconflictchecker.metadata.open_metadata')
+    def test_read_metadata_stops_at_description(self, mock_open_metadata):
+        lines = iter(['Name: test\n', '\r\n', 'A very long description\n'])
+        mock_open_metadata.return_value.__enter__.return_value = lines
+
+        # Assert the headers were read and the description was never reached
+        self.assertEqual(read_metadata('METADATA'), ('test', None, []))
+        self.assertEqual(list(lines), ['A very long description\n'])
+
+    def test_parse_metadata(self):
+        lines = iter(['Name: test\n', 'Version: 1.0\n', 'Requires-Dist: six\n', '\n', 'Description\n'])
+
+        # Assert any iterable of lines can be parsed and is only read up to the description
+        name, version, requirements = parse_metadata(lines)
+        self.assertEqual((name, version), ('test', '1.0'))
+        self.assertEqual([requirement.project_name for requirement in requirements], ['six'])
+        self.assertEqual(list(lines), ['Description\n'])
+
+    def test_read_metadata_no_requirements(self):
+        path = self.write_file('PKG-INFO', 'Name: test\nVersion: 1.0\n')
+        self.assertEqual(read_metadata(path), ('test', '1.0', []))
+
+    def test_parse_requires_txt(self):
+        requirements = parse_requires_txt(['six>=1.0\n', '[test]\n', 'pytest\n'])
+        self.assertEqual([(req.project_name, req.extra) for req in requirements], [('six', None), ('pytest', 'test')])
+
+    def test_read_requires_txt(self):
+        path = self.write_file('requires.txt', (
+            'six>=1.10\n'
+            '# comment\n'
+            '\n'
+            '[:python_version < "3"]\n'
+            'enum34\n'
+            '[socks]\n'
+            'PySocks\n'
+            '[test:sys_platform == "win32"]\n'
+            'pywin32\n'
+            '-e .\n'
+        ))
+        requirements = read_requires_txt(path)
+        self.assertEqual(
+            [(requirement.project_name, requirement.extra, requirement.marker) for requirement in requirements],
+            [
+                ('six', None, None),
+                ('enum34', None, 'python_version < "3"'),
+                ('PySocks', 'socks', None),
+                ('pywin32', 'test', 'sys_platform == "win32"'),
+            ]
+        )
@@ -0,0 +1,72 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import threading
+from unittest import TestCase
+from pipconflictchecker.parallel import process_map, thread_imap, thread_map
+
+
+class ThreadMapTest(TestCase):
+    def test_serial(self):
+        threads = set()
+
+        def square(number):
+            threads.add(threading.current_thread())
+            return number * number
+
+        # Assert a single job runs in the calling thread
+        self.assertEqual(thread_map(square, range(5)), [0, 1, 4, 9, 16])
+        self.assertEqual(threads, set([threading.current_thread()]))
+
+    def test_parallel_keeps_order(self):
+        self.assertEqual(thread_map(lambda number: number * number, iter(range(50)), jobs=8), [
+            number * number for number in range(50)
+        ])
+
+    def test_single_item(self):
+        self.assertEqual(thread_map(str, [1], jobs=8), ['1'])
+
+
+class ThreadImapTest(TestCase):
+    def test_serial_is_lazy(self):
+        calls = []
+
+        def square(number):
+            calls.append(number)
+            return number * number
+
+        # Assert items are only processed as the results are consumed
+        results = thread_imap(square, range(5))
+        self.assertEqual(next(results), 0)
+        self.assertEqual(calls, [0])
+        results.close()
+        self.assertEqual(list(results), [])
+
+    def test_parallel_keeps_order(self):
+        self.assertEqual(list(thread_imap(lambda number: number * number, range(50), jobs=8)), [
+            number * number for number in range(50)
+        ])
+
+    def test_parallel_close(self):
+        results = thread_imap(lambda number: number, range(50), jobs=8)
+        self.assertEqual(next(results), 0)
+
+        # Assert closing stops the results
+        results.close()
+        self.assertEqual(list(results), [])
+
+
+def square(number):
+    return number * number
+
+
+class ProcessMapTest(TestCase):
+    def test_serial(self):
+        calls = []
+        self.assertEqual(process_map(square, range(5), initializer=lambda: calls.append(1)), [0, 1, 4, 9, 16])
+
+        # Assert the initializer ran once in this process
+        self.assertEqual(calls, [1])
+        self.assertEqual(process_map(square, [3]), [9])
+
+    def test_parallel_keeps_order(self):
+        self.assertEqual(process_map(square, iter(range(20)), jobs=2), [number * number for number in range(20)])
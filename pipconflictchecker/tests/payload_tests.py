@@ -0,0 +1,97 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import io
+import json
+import os
+import sys
+import zipfile
+from mock import patch
+from pipconflictchecker.payload import (
+    dump_distribution, format_full_version, get_distributions, get_entry_key, get_marker_environment, main,
+    PAYLOAD_FORMAT_VERSION, read_text
+)
+from pipconflictchecker.tests.distributions_tests import DistributionsTestCase
+
+
+class PayloadTest(DistributionsTestCase):
+    def test_format_full_version(self):
+        self.assertEqual(format_full_version((3, 8, 1, 'final', 0)), '3.8.1')
+        self.assertEqual(format_full_version((3, 9, 0, 'beta', 2)), '3.9.0b2')
+
+    def test_get_marker_environment(self):
+        environment = get_marker_environment()
+        self.assertEqual(environment['python_version'], '{0}.{1}'.format(*sys.version_info))
+        self.assertEqual(environment['sys_platform'], sys.platform)
+
+        # Assert interpreters without sys.implementation are described too
+        with patch('pipconflictchecker.payload.sys') as mock_sys:
+            del mock_sys.implementation
+            environment = get_marker_environment()
+        self.assertEqual((environment['implementation_name'], environment['implementation_version']), ('', '0'))
+
+    def test_read_text(self):
+        path = self.write_file('PKG-INFO', 'Name: test\nVersion: 1.0\n\nDescription\n')
+        self.assertEqual(read_text(path), 'Name: test\nVersion: 1.0\n\nDescription\n')
+        self.assertEqual(read_text(path, headers_only=True), 'Name: test\nVersion: 1.0\n')
+        self.assertIsNone(read_text(os.path.join(self.directory, 'missing')))
+
+    def test_get_entry_key(self):
+        self.assertEqual(get_entry_key('Foo_Bar-1.0.dist-info'), 'foo-bar')
+        self.assertEqual(get_entry_key('zope.interface-5.0.egg-info'), 'zope-interface')
+
+    def test_dump_distribution(self):
+        dist_info = os.path.dirname(self.write_file('one-1.0.dist-info/METADATA', 'Name: one\n\nText\n'))
+        egg_info = os.path.dirname(self.write_file('two-1.0.egg-info/PKG-INFO', 'Name: two\n'))
+        self.write_file('two-1.0.egg-info/requires.txt', 'six\n')
+        bare_egg_info = os.path.dirname(self.write_file('three-1.0.egg-info/PKG-INFO', 'Name: three\n'))
+        egg_info_file = self.write_file('four-1.0.egg-info', 'Name: four\n')
+
+        self.assertEqual(dump_distribution(dist_info), [dist_info, 'Name: one\n', None])
+        self.assertEqual(dump_distribution(egg_info), [egg_info, 'Name: two\n', 'six\n'])
+        self.assertEqual(dump_distribution(bare_egg_info), [bare_egg_info, 'Name: three\n', ''])
+        self.assertEqual(dump_distribution(egg_info_file), [egg_info_file, 'Name: four\n', None])
+
+    def test_dump_distribution_egg(self):
+        egg = os.path.dirname(os.path.dirname(self.write_file('one-1.0-py3.8.egg/EGG-INFO/PKG-INFO', 'Name: one\n')))
+        self.write_file('one-1.0-py3.8.egg/EGG-INFO/requires.txt', 'six\n')
+        zipped_egg = os.path.join(self.directory, 'two-1.0-py3.8.egg')
+        with zipfile.ZipFile(zipped_egg, 'w') as egg_file:
+            egg_file.writestr('EGG-INFO/PKG-INFO', 'Name: two\n\nText\n')
+            egg_file.writestr('EGG-INFO/requires.txt', 'six\n')
+        bad_egg = self.write_file('three-1.0-py3.8.egg', 'not a zip')
+
+        self.assertEqual(dump_distribution(egg), [egg, 'Name: one\n', 'six\n'])
+        self.assertEqual(dump_distribution(zipped_egg), [zipped_egg, 'Name: two\n', 'six\n'])
+        self.assertEqual(dump_distribution(bad_egg), [bad_egg, None, ''])
+
+    def test_get_distributions_eggs(self):
+        self.write_file('site/one-1.0-py3.8.egg/EGG-INFO/PKG-INFO', 'Name: one\n')
+        two = os.path.dirname(os.path.dirname(self.write_file('two-1.0-py3.8.egg/EGG-INFO/PKG-INFO', 'Name: two\n')))
+        distributions = get_distributions([os.path.join(self.directory, 'site'), two])
+        self.assertEqual([os.path.basename(dump[0]) for dump in distributions], [
+            'one-1.0-py3.8.egg',
+            'two-1.0-py3.8.egg',
+        ])
+
+    def test_get_distributions(self):
+        first = os.path.join(self.directory, 'first')
+        second = os.path.join(self.directory, 'second')
+        self.write_file('first/one-1.0.dist-info/METADATA', 'Name: one\n')
+        self.write_file('second/One-2.0.dist-info/METADATA', 'Name: One\n')
+        self.write_file('second/two-1.0.dist-info/METADATA', 'Name: two\n')
+        self.write_file('second/two.py', '')
+
+        # Assert the first path wins and empty or missing paths are skipped
+        distributions = get_distributions(['', first, os.path.join(self.directory, 'missing'), second])
+        self.assertEqual([os.path.basename(dump[0]) for dump in distributions], [
+            'one-1.0.dist-info',
+            'two-1.0.dist-info',
+        ])
+
+    def test_main(self):
+        output = io.StringIO()
+        main(output)
+        dump = json.loads(output.getvalue())
+        self.assertEqual(dump['version'], PAYLOAD_FORMAT_VERSION)
+        self.assertEqual(dump['environment'], get_marker_environment())
+        self.assertTrue(dump['distributions'])
@@ -0,0 +1,257 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from mock import Mock, patch
+from pip._vendor.pkg_resources import Distribution, Requirement
+from unittest import TestCase
+from pipconflictchecker.distributions import InstalledDistribution
+from pipconflictchecker.snapshot import EnvironmentSnapshot, read_distribution, SNAPSHOT_FORMAT_VERSION
+
+
+class EnvironmentSnapshotTest(TestCase):
+    """
+    Tests the environment snapshot
+    """
+    def create_distribution(self, project_name, version, requirements):
+        dist = Mock(Distribution)
+        dist.project_name = project_name
+        dist.version = version
+        dist.extras = []
+        dist.requires.return_value = []
+        for required_project_name, specs in requirements:
+            requirement = Mock(Requirement)
+            requirement.project_name = required_project_name
+            requirement.specs = specs
+            requirement.extras = ()
+            dist.requires.return_value.append(requirement)
+        return dist
+
+    def test_from_distributions_single_pass(self):
+        dists = [
+            self.create_distribution('one', '1.0', []),
+            self.create_distribution('two', '2.0', [('one', [('>=', '1.0')])]),
+        ]
+        snapshot = EnvironmentSnapshot.from_distributions(dists)
+
+        # Assert each distribution was only asked for its requirements once
+        for dist in dists:
+            self.assertEqual(dist.requires.call_count, 1)
+
+        # Assert the installed versions and requirements were recorded
+        self.assertEqual(snapshot.installed_versions, {'one': '1.0', 'two': '2.0'})
+        self.assertEqual(snapshot.requirements, {'one': {}, 'two': {'one': {('>=', '1.0')}}})
+
+    def test_from_distributions_jobs(self):
+        dists = [
+            self.create_distribution('dist{0}'.format(index), '1.0', [('req', [('>=', '{0}.0'.format(index))])])
+            for index in range(20)
+        ]
+        serial_snapshot = EnvironmentSnapshot.from_distributions(dists)
+        parallel_snapshot = EnvironmentSnapshot.from_distributions(dists, jobs=4)
+
+        # Assert the threaded read gives the same snapshot
+        self.assertEqual(parallel_snapshot.installed_versions, serial_snapshot.installed_versions)
+        self.assertEqual(parallel_snapshot.get_requirement_versions(), serial_snapshot.get_requirement_versions())
+
+    def test_add_distribution_merges_requirements(self):
+        snapshot = EnvironmentSnapshot()
+        snapshot.add_distribution('test', '1.0', [('req', [('>=', '1.0')])])
+        snapshot.add_distribution('test', '1.0', [('req', [('<', '2.0')])])
+
+        # Assert the specs of both were merged
+        self.assertEqual(snapshot.requirements['test']['req'], {('>=', '1.0'), ('<', '2.0')})
+
+    def test_add_distribution_extras(self):
+        snapshot = EnvironmentSnapshot()
+
+        # Add a project with extras before anything requests them
+        snapshot.add_distribution('lib', '1.0', [('six', [])], {
+            'socks': [('pysocks', [('>=', '1.5')])],
+            'fast': [('cython', [])],
+        }, [('socks', 'pysocks', 'win')])
+        self.assertEqual(snapshot.requirements['lib'], {'six': set()})
+
+        # Assert requesting an extra adds its requirements and follows the extras it requests in turn
+        edges = snapshot.add_distribution('app', '1.0', [('lib', [])], {}, [(None, 'lib', 'socks')])
+        self.assertEqual(sorted(edges), [('app', 'lib'), ('lib', 'pysocks')])
+        self.assertEqual(sorted(snapshot.requirements['lib']), ['pysocks', 'six'])
+        self.assertEqual(snapshot.active_extras, {'lib': {'socks'}, 'pysocks': {'win'}})
+
+        # Assert an extra requested before its project is added applies when it is added
+        edges = snapshot.add_distribution('pysocks', '1.6', [], {'win': [('win-inet-pton', [])]}, [])
+        self.assertEqual(edges, [('pysocks', 'win-inet-pton')])
+
+        # Assert requesting an extra twice does not add its requirements again
+        self.assertEqual(snapshot.add_distribution('other', '1.0', [('lib', [])], {}, [(None, 'lib', 'socks')]), [
+            ('other', 'lib'),
+        ])
+
+        # Assert removing a project forgets its extras
+        snapshot.remove_distribution('lib')
+        self.assertNotIn('lib', snapshot.extra_requirements)
+        self.assertNotIn('lib', snapshot.requested_extras)
+
+    def test_read_distribution_extras(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        os.makedirs(os.path.join(directory, 'lib-1.0.dist-info'))
+        with open(os.path.join(directory, 'lib-1.0.dist-info', 'METADATA'), 'w') as metadata_file:
+            metadata_file.write(
+                'Name: lib\n'
+                'Version: 1.0\n'
+                'Requires-Dist: six\n'
+                'Requires-Dist: urllib3[secure] (>=1.21)\n'
+                'Requires-Dist: PySocks (>=1.5) ; extra == "Socks"\n'
+                'Requires-Dist: cryptography[ssh] ; extra == "socks"\n'
+                'Requires-Dist: enum34 ; python_version < "2.0" and extra == "socks"\n'
+            )
+
+        # Assert the requirements of each extra and the extras requested are read
+        dist_metadata = read_distribution(InstalledDistribution(os.path.join(directory, 'lib-1.0.dist-info')))
+        self.assertEqual(dist_metadata.requirements, [('six', []), ('urllib3', [('>=', '1.21')])])
+        self.assertEqual(dist_metadata.extra_requirements, {
+            'socks': [('PySocks', [('>=', '1.5')]), ('cryptography', [])],
+        })
+        self.assertEqual(dist_metadata.requested_extras, [
+            (None, 'urllib3', 'secure'),
+            ('socks', 'cryptography', 'ssh'),
+        ])
+
+    def test_save_state(self):
+        snapshot = EnvironmentSnapshot()
+        snapshot.add_distribution('lib', '1.0', [('six', [('>=', '1.0')])], {'x': [('six', [('<', '2.0')])]}, [])
+        state = snapshot.save_state(['lib', 'app'])
+
+        # app requests the extra of lib and lib is changed
+        snapshot.add_distribution('app', '1.0', [('lib', [])], {}, [(None, 'lib', 'x')])
+        snapshot.remove_distribution('lib')
+        snapshot.add_distribution('lib', '2.0', [])
+
+        # Assert everything is put back and the project that was not installed is forgotten
+        snapshot.restore_state(state)
+        self.assertEqual(snapshot.installed_versions, {'lib': '1.0'})
+        self.assertEqual(snapshot.requirements, {'lib': {'six': set([('>=', '1.0')])}})
+        self.assertEqual(snapshot.extra_requirements, {'lib': {'x': [('six', [('<', '2.0')])]}})
+        self.assertEqual(snapshot.requested_extras, {})
+        self.assertEqual(snapshot.active_extras, {})
+        self.assertEqual(snapshot.get_installed_name('LIB'), 'lib')
+
+    def test_get_requirement_versions(self):
+        snapshot = EnvironmentSnapshot()
+        snapshot.add_distribution('one', '1.0', [])
+        snapshot.add_distribution('two', '2.0', [('one', [('>=', '1.0')]), ('missing', [])])
+        snapshot.add_distribution('three', '3.0', [('one', [('<', '2.0')])])
+
+        self.assertEqual(snapshot.get_requirement_versions(), {
+            'one': {
+                'two': {('>=', '1.0')},
+                'three': {('<', '2.0')},
+            },
+            'two': {},
+            'three': {},
+            'missing': {
+                'two': set(),
+            },
+        })
+
+    def test_name_index(self):
+        snapshot = EnvironmentSnapshot()
+        snapshot.add_distribution('app', '1.0', [('foo-bar', [('>=', '1.0')]), ('FOO.BAR', [('<', '2.0')])])
+        snapshot.add_distribution('Foo_Bar', '1.5', [('Missing_Project', [])])
+
+        # Assert every spelling of a required project joins the installed distribution
+        self.assertEqual(snapshot.requirements['app'], {'foo-bar': {('>=', '1.0'), ('<', '2.0')}})
+        self.assertEqual(snapshot.get_installed_name('foo.bar'), 'Foo_Bar')
+        self.assertEqual(snapshot.get_requirement_versions()['Foo_Bar'], {'app': {('>=', '1.0'), ('<', '2.0')}})
+        self.assertEqual(snapshot.get_display_name('missing-project'), 'Missing_Project')
+        self.assertEqual(
+            snapshot.to_dict()['distributions']['app'], ['1.0', {'Foo_Bar': [['<', '2.0'], ['>=', '1.0']]}]
+        )
+
+        # Assert each spelling is only normalized once
+        with patch('pipconflictchecker.snapshot.get_project_key') as mock_get_project_key:
+            snapshot.get_name_key('FOO.BAR')
+        self.assertFalse(mock_get_project_key.called)
+
+        # Assert removing the distribution removes it from the index
+        snapshot.remove_distribution('Foo_Bar')
+        self.assertIsNone(snapshot.get_installed_name('foo-bar'))
+        self.assertEqual(snapshot.get_display_name('foo-bar'), 'foo-bar')
+
+    def test_get_installed_versions(self):
+        snapshot = EnvironmentSnapshot()
+        snapshot.add_distribution('one', '1.0', [])
+        installed_versions = snapshot.get_installed_versions()
+
+        # Assert a copy is returned
+        self.assertEqual(installed_versions, {'one': '1.0'})
+        installed_versions['two'] = '2.0'
+        self.assertNotIn('two', snapshot.installed_versions)
+
+
+class SnapshotFileTest(TestCase):
+    """
+    Tests saving and loading snapshot files
+    """
+    def setUp(self):
+        super(SnapshotFileTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.snapshot = EnvironmentSnapshot()
+        self.snapshot.add_distribution('one', '1.0', [])
+        self.snapshot.add_distribution('two', '2.0', [('one', [('>=', '1.0'), ('<', '2.0')]), ('missing', [])])
+
+    def assert_same_snapshot(self, snapshot):
+        self.assertEqual(snapshot.installed_versions, self.snapshot.installed_versions)
+        self.assertEqual(snapshot.requirements, self.snapshot.requirements)
+
+    def test_to_dict(self):
+        self.assertEqual(self.snapshot.to_dict(), {
+            'version': SNAPSHOT_FORMAT_VERSION,
+            'distributions': {
+                'one': ['1.0', {}],
+                'two': ['2.0', {'one': [['<', '2.0'], ['>=', '1.0']], 'missing': []}],
+            },
+        })
+        self.assert_same_snapshot(EnvironmentSnapshot.from_dict(self.snapshot.to_dict()))
+
+    def test_from_dict_invalid(self):
+        for data in (
+            None,
+            {'version': SNAPSHOT_FORMAT_VERSION + 1, 'distributions': {}},
+            {'version': SNAPSHOT_FORMAT_VERSION},
+            {'version': SNAPSHOT_FORMAT_VERSION, 'distributions': {'one': '1.0'}},
+        ):
+            with self.assertRaises(ValueError):
+                EnvironmentSnapshot.from_dict(data)
+
+    def test_save_and_load(self):
+        path = os.path.join(self.directory, 'snapshot.json')
+        self.snapshot.save(path)
+
+        # Assert the file is compact JSON that loads back into the same snapshot
+        with open(path) as snapshot_file:
+            content = snapshot_file.read()
+        self.assertNotIn(' ', content)
+        self.assertEqual(json.loads(content), self.snapshot.to_dict())
+        self.assert_same_snapshot(EnvironmentSnapshot.load(path))
+
+    def test_save_and_load_gzip(self):
+        path = os.path.join(self.directory, 'snapshot.json.gz')
+        self.snapshot.save(path)
+
+        # Assert the file was compressed
+        with gzip.open(path, 'rb') as snapshot_file:
+            self.assertEqual(json.loads(snapshot_file.read().decode('utf-8')), self.snapshot.to_dict())
+        self.assert_same_snapshot(EnvironmentSnapshot.load(path))
+
+    def test_load_invalid(self):
+        path = os.path.join(self.directory, 'snapshot.json')
+        with open(path, 'w') as snapshot_file:
+            snapshot_file.write('not json')
+        with self.assertRaises(ValueError):
+            EnvironmentSnapshot.load(path)
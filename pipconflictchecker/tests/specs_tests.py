@@ -0,0 +1,184 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from unittest import TestCase
+from pipconflictchecker.versions import parse_version
+from pipconflictchecker.specs import (
+    Comparator, CompiledSpec, compile_specs, intersect_intervals, Interval, normalize_intervals, UNBOUNDED
+)
+
+
+class ComparatorTest(TestCase):
+    """
+    Tests the compiled comparators
+    """
+    def test_behaves_like_spec(self):
+        comparator = Comparator('>=', '1.0')
+
+        # Assert the comparator is interchangeable with the plain spec
+        self.assertEqual(comparator, ('>=', '1.0'))
+        self.assertEqual(hash(comparator), hash(('>=', '1.0')))
+        self.assertEqual(comparator[0], '>=')
+        self.assertEqual(comparator[1], '1.0')
+        self.assertEqual(comparator.comparison, '>=')
+        self.assertEqual(comparator.version, '1.0')
+
+    def test_compile_specs(self):
+        compiled = Comparator('<', '2.0')
+        specs = compile_specs([('>=', '1.0'), compiled])
+
+        # Assert the plain spec was compiled and the compiled one was reused
+        self.assertIsInstance(specs[0], Comparator)
+        self.assertIs(specs[1], compiled)
+
+
+class IntervalTest(TestCase):
+    """
+    Tests the version intervals
+    """
+    def create_interval(self, lower, lower_inclusive, upper, upper_inclusive):
+        return Interval(
+            parse_version(lower) if lower else None,
+            lower_inclusive,
+            parse_version(upper) if upper else None,
+            upper_inclusive,
+        )
+
+    def test_from_range(self):
+        interval = Interval.from_range((Comparator('>', '1.0'), Comparator('<=', '2.0')))
+        self.assertEqual(interval, self.create_interval('1.0', False, '2.0', True))
+
+        # Assert missing specs are unbounded
+        interval = Interval.from_range((None, Comparator('<', '2.0')))
+        self.assertEqual(interval, self.create_interval(None, False, '2.0', False))
+
+    def test_is_empty(self):
+        self.assertFalse(self.create_interval(None, False, '1.0', False).is_empty())
+        self.assertFalse(self.create_interval('1.0', True, '1.0', True).is_empty())
+        self.assertTrue(self.create_interval('1.0', True, '1.0', False).is_empty())
+        self.assertTrue(self.create_interval('2.0', True, '1.0', True).is_empty())
+
+    def test_normalize_intervals(self):
+        intervals = normalize_intervals([
+            self.create_interval('3.0', True, '4.0', False),
+            self.create_interval('1.0', True, '2.0', False),
+            self.create_interval('2.0', True, '2.5', True),
+            self.create_interval('2.2', True, '2.4', True),
+            self.create_interval('2.6', True, '3.0', False),
+            self.create_interval('5.0', True, '4.0', True),
+            self.create_interval('6.0', False, None, False),
+            self.create_interval('7.0', True, '8.0', True),
+            self.create_interval(None, False, '0.5', True),
+        ])
+
+        # Assert the intervals were merged, sorted and the empty one dropped
+        self.assertEqual(intervals, [
+            self.create_interval(None, False, '0.5', True),
+            self.create_interval('1.0', True, '2.5', True),
+            self.create_interval('2.6', True, '4.0', False),
+            self.create_interval('6.0', False, None, False),
+        ])
+
+    def test_merge_same_upper(self):
+        interval = self.create_interval('1.0', True, '2.0', False).merge(self.create_interval('1.5', True, '2.0', True))
+        self.assertEqual(interval, self.create_interval('1.0', True, '2.0', True))
+
+    def test_intersect(self):
+        interval = self.create_interval('1.0', True, '2.0', False)
+
+        # Assert the tighter bound wins and equal bounds are only inclusive when both are
+        self.assertEqual(interval.intersect(UNBOUNDED), interval)
+        self.assertEqual(UNBOUNDED.intersect(interval), interval)
+        self.assertEqual(
+            interval.intersect(self.create_interval('1.0', False, '2.0', True)),
+            self.create_interval('1.0', False, '2.0', False)
+        )
+        self.assertEqual(
+            interval.intersect(self.create_interval('1.5', True, '1.8', True)),
+            self.create_interval('1.5', True, '1.8', True)
+        )
+        self.assertTrue(interval.intersect(self.create_interval('2.0', True, None, False)).is_empty())
+
+    def test_ends_before(self):
+        interval = self.create_interval('1.0', True, '2.0', False)
+        self.assertTrue(interval.ends_before(UNBOUNDED))
+        self.assertFalse(UNBOUNDED.ends_before(interval))
+        self.assertTrue(interval.ends_before(self.create_interval(None, False, '3.0', False)))
+        self.assertTrue(interval.ends_before(self.create_interval(None, False, '2.0', True)))
+        self.assertFalse(interval.ends_before(self.create_interval(None, False, '2.0', False)))
+        self.assertFalse(interval.ends_before(self.create_interval(None, False, '1.5', False)))
+
+    def test_intersect_intervals(self):
+        intervals = intersect_intervals(
+            [
+                self.create_interval(None, False, '1.0', True),
+                self.create_interval('2.0', True, '3.0', False),
+                self.create_interval('4.0', True, None, False),
+            ],
+            [
+                self.create_interval('1.0', True, '2.5', True),
+                self.create_interval('2.8', False, '4.5', False),
+            ]
+        )
+
+        # Assert only the versions both lists contain are kept
+        self.assertEqual(intervals, [
+            self.create_interval('1.0', True, '1.0', True),
+            self.create_interval('2.0', True, '2.5', True),
+            self.create_interval('2.8', False, '3.0', False),
+            self.create_interval('4.0', True, '4.5', False),
+        ])
+        self.assertEqual(intersect_intervals([UNBOUNDED], []), [])
+
+
+class CompiledSpecTest(TestCase):
+    """
+    Tests the compiled spec sets
+    """
+    def test_normalized(self):
+        compiled_spec = CompiledSpec([
+            ('>=', '3.0'),
+            ('<=', '2.0'),
+            ('>=', '1.0'),
+            ('==', '5.0'),
+            ('!=', '1.5'),
+        ])
+
+        # Assert the specs were split into intervals, exacts and excludes
+        self.assertEqual(len(compiled_spec.intervals), 2)
+        self.assertEqual(compiled_spec.exacts, frozenset(['5.0']))
+        self.assertEqual(compiled_spec.excludes, frozenset(['1.5']))
+
+    def test_in_ranges(self):
+        compiled_spec = CompiledSpec([
+            ('>=', '1.0'),
+            ('<', '2.0'),
+            ('>', '3.0'),
+        ])
+        cases = [
+            ('0.9', False),
+            ('1.0', True),
+            ('1.9', True),
+            ('2.0', False),
+            ('3.0', False),
+            ('3.1', True),
+        ]
+        for version, expected in cases:
+            self.assertEqual(compiled_spec.in_ranges(parse_version(version)), expected)
+
+    def test_in_ranges_unbounded_below(self):
+        compiled_spec = CompiledSpec([('<', '2.0')])
+        self.assertTrue(compiled_spec.in_ranges(parse_version('0.1')))
+        self.assertFalse(compiled_spec.in_ranges(parse_version('2.0')))
+
+    def test_in_ranges_empty(self):
+        # Assert no ranges means any version is in range
+        self.assertTrue(CompiledSpec([]).in_ranges(parse_version('1.0')))
+
+        # Assert ranges that cannot contain anything do not match
+        self.assertFalse(CompiledSpec([('<', '1.0'), ('>', '2.0')]).in_ranges(parse_version('1.5')))
+
+    def test_get_allowed_intervals(self):
+        self.assertEqual(CompiledSpec([('==', '1.0')]).get_allowed_intervals(), [UNBOUNDED])
+        self.assertEqual(CompiledSpec([('<', '1.0'), ('>', '2.0')]).get_allowed_intervals(), [])
+        compiled_spec = CompiledSpec([('>=', '1.0')])
+        self.assertEqual(compiled_spec.get_allowed_intervals(), compiled_spec.intervals)
@@ -0,0 +1,71 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import os
+import shutil
+import tempfile
+from mock import patch
+from unittest import TestCase
+from pipconflictchecker.stats import format_stats, profile_call, Stats
+
+
+class StatsTest(TestCase):
+    @patch('pipconflictchecker.stats.timeit.default_timer')
+    def test_phase(self, mock_timer):
+        mock_timer.side_effect = [0.0, 1.0, 3.0, 10.0]
+        stats = Stats()
+        with stats.phase('outer'):
+            with stats.phase('inner'):
+                pass
+
+        # Assert the nested time only counted towards the inner phase
+        self.assertEqual(stats.timings, {'outer': 8.0, 'inner': 2.0})
+
+    @patch('pipconflictchecker.stats.timeit.default_timer')
+    def test_phase_adds_up(self, mock_timer):
+        mock_timer.side_effect = [0.0, 1.0, 5.0, 7.0]
+        stats = Stats()
+        for _ in range(2):
+            with stats.phase('phase'):
+                pass
+        self.assertEqual(stats.timings, {'phase': 3.0})
+
+    def test_count(self):
+        stats = Stats()
+        stats.count('edges')
+        stats.count('edges', 2)
+        self.assertEqual(stats.to_dict(), {'timings': {}, 'counts': {'edges': 3}})
+
+    def test_format_stats(self):
+        lines = format_stats({'timings': {'validate': 0.5}, 'counts': {'edges_checked': 10}})
+        self.assertEqual(lines[1], ' Stats')
+        self.assertEqual(lines[3].split(), ['validate', '500.00ms'])
+        self.assertEqual(lines[4].split(), ['edges', 'checked', '10'])
+
+
+class ProfileCallTest(TestCase):
+    def setUp(self):
+        super(ProfileCallTest, self).setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'profile.txt')
+
+    def test_profile_call(self):
+        path = self.path
+
+        # Assert the result is passed through and both files were written
+        self.assertEqual(profile_call(lambda: [0] * 1000, path), [0] * 1000)
+        with open(path) as report_file:
+            report = report_file.read()
+        self.assertIn('tracemalloc peak', report)
+        self.assertIn('function calls', report)
+        self.assertTrue(os.path.exists('{0}.prof'.format(path)))
+
+    @patch('pipconflictchecker.stats.tracemalloc', None)
+    def test_profile_call_without_tracemalloc(self):
+        profile_call(lambda: None, self.path)
+
+        # Assert only the profile was written
+        with open(self.path) as report_file:
+            report = report_file.read()
+        self.assertNotIn('tracemalloc peak', report)
+        self.assertIn('function calls', report)
@@ -0,0 +1,46 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import os
+import shutil
+import tempfile
+from mock import Mock
+from unittest import TestCase
+from pipconflictchecker.store import load_entries, save_entries, save_quietly
+
+
+class StoreTest(TestCase):
+    def setUp(self):
+        super(StoreTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'nested', 'store.json')
+
+    def test_save_entries(self):
+        save_entries(self.path, 1, {'one': [1]})
+
+        # Assert the directory was created and an existing file is replaced
+        self.assertEqual(load_entries(self.path, 1), {'one': [1]})
+        save_entries(self.path, 1, {'two': [2]})
+        self.assertEqual(load_entries(self.path, 1), {'two': [2]})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ['store.json'])
+
+    def test_load_entries_other_version(self):
+        save_entries(self.path, 1, {'one': [1]})
+        self.assertEqual(load_entries(self.path, 2), {})
+
+    def test_load_entries_missing(self):
+        self.assertEqual(load_entries(self.path, 1), {})
+
+    def test_load_entries_invalid(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as store_file:
+            store_file.write('not json')
+        self.assertEqual(load_entries(self.path, 1), {})
+
+    def test_save_quietly(self):
+        store = Mock()
+        store.save.side_effect = IOError
+
+        # Assert a store that cannot be written is ignored
+        save_quietly(store)
+        store.save.assert_called_once_with()
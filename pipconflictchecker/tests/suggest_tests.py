@@ -0,0 +1,106 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from pipconflictchecker.checker import Conflict, ValidationCache
+from pipconflictchecker.snapshot import EnvironmentSnapshot
+from pipconflictchecker.specs import Interval
+from pipconflictchecker.suggest import get_index_range, Suggestion, VersionSuggester
+from pipconflictchecker.versions import parse_version
+from pipconflictchecker.wheelhouse import Wheelhouse
+
+
+class GetIndexRangeTest(TestCase):
+    def test_get_index_range(self):
+        parsed_versions = [parse_version(version) for version in ['1.0', '2.0', '2.0.0', '3.0']]
+        two = parse_version('2.0')
+        self.assertEqual(get_index_range(parsed_versions, Interval(two, True, None, False)), (1, 4))
+        self.assertEqual(get_index_range(parsed_versions, Interval(two, False, None, False)), (3, 4))
+        self.assertEqual(get_index_range(parsed_versions, Interval(None, False, two, True)), (0, 3))
+        self.assertEqual(get_index_range(parsed_versions, Interval(None, False, two, False)), (0, 1))
+
+
+class VersionSuggesterTest(TestCase):
+    def setUp(self):
+        super(VersionSuggesterTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        for name, version in [
+            ('six', '1.9.0'), ('six', '1.10.0'), ('six', '1.12.0'), ('six', '1.16.0'),
+            ('Lib_Core', '1.0'), ('lib_core', '3.0'),
+        ]:
+            open(os.path.join(self.directory, '{0}-{1}-py2.py3-none-any.whl'.format(name, version)), 'w').close()
+
+        self.snapshot = EnvironmentSnapshot()
+        self.snapshot.add_distribution('six', '1.9.0', [])
+        self.snapshot.add_distribution('app', '1.0', [('six', [('>=', '1.10')]), ('lib.core', [('>=', '2.0')])])
+        self.snapshot.add_distribution('tool', '1.0', [('six', [('<', '1.16'), ('!=', '1.12.0')])])
+        self.snapshot.add_distribution('lib-core', '1.0', [])
+        self.suggester = VersionSuggester(self.snapshot, Wheelhouse(self.directory), ValidationCache())
+
+    def test_get_candidates(self):
+        versions, parsed_versions, indexes = self.suggester.get_candidates('SIX')
+        self.assertEqual(versions, ['1.9.0', '1.10.0', '1.12.0', '1.16.0'])
+        self.assertEqual(parsed_versions[1], parse_version('1.10'))
+        self.assertEqual(indexes['1.12.0'], 2)
+
+        # Assert the versions of a project are only sorted once
+        self.assertIs(self.suggester.get_candidates('six')[0], versions)
+        self.assertEqual(self.suggester.get_candidates('missing'), ([], [], {}))
+
+    def test_get_requirements(self):
+        self.assertEqual(self.suggester.get_requirements('six'), [
+            ('app', [('>=', '1.10')]),
+            ('tool', [('!=', '1.12.0'), ('<', '1.16')]),
+        ])
+
+    def test_find_version(self):
+        # Assert the newest version in every range that is not excluded is found
+        specs_list = [[('>=', '1.10')], [('<', '1.16'), ('!=', '1.12.0')]]
+        self.assertEqual(self.suggester.find_version('six', specs_list), '1.10.0')
+        self.assertEqual(self.suggester.find_version('six', [[('>=', '1.10')], []]), '1.16.0')
+        self.assertEqual(self.suggester.find_version('Lib.Core', [[('>=', '2.0')]]), '3.0')
+
+        # Assert nothing is found when the ranges do not meet or no candidate is left in them
+        self.assertIsNone(self.suggester.find_version('six', [[('>=', '1.12')], [('<', '1.12')]]))
+        self.assertIsNone(self.suggester.find_version('six', [[('>', '1.16.0')]]))
+        self.assertIsNone(self.suggester.find_version('missing', [[('>=', '1.0')]]))
+
+    def test_find_version_exacts(self):
+        # Assert a version pinned with == satisfies its requirer outside of the ranges the same way it is validated
+        self.assertEqual(self.suggester.find_version('six', [[('<', '1.10'), ('==', '1.12.0')]]), '1.12.0')
+        self.assertEqual(self.suggester.find_version('six', [[('<', '1.12'), ('==', '1.9.0')]]), '1.10.0')
+        self.assertIsNone(self.suggester.find_version('six', [[('<', '1.0'), ('==', '9.9')]]))
+
+    def test_matches_validation(self):
+        validation_cache = ValidationCache()
+        versions = self.suggester.get_candidates('six')[0]
+        for specs_list in [
+            [[('>=', '1.10'), ('<', '1.12')], [('!=', '1.10.0'), ('<=', '1.12.0')]],
+            [[('>=', '1.10'), ('<=', '1.16.0')], [('!=', '1.16.0'), ('>', '1.9.0')]],
+            [[('<', '1.10'), ('>', '1.12.0')], [('!=', '1.9.0')]],
+            [[('==', '1.9.0'), ('>', '1.12.0')], [('<', '1.12')]],
+        ]:
+            # Assert the suggestion is the newest version the checker accepts for every requirer
+            valid = [
+                version for version in versions
+                if all(validation_cache.is_valid(version, specs) for specs in specs_list)
+            ]
+            self.assertEqual(self.suggester.find_version('six', specs_list), valid[-1] if valid else None)
+
+    def test_suggest(self):
+        conflicts = [
+            Conflict('six', 'app', '1.9.0', [('>=', '1.10')]),
+            Conflict('lib-core', 'app', '1.0', [('>=', '2.0')]),
+            Conflict('six', 'tool', '1.9.0', [('>=', '1.10')]),
+        ]
+
+        # Assert every conflicting project gets one suggestion in the order of the conflicts
+        self.assertEqual(self.suggester.suggest(conflicts), [
+            Suggestion('six', '1.10.0', [('app', [('>=', '1.10')]), ('tool', [('!=', '1.12.0'), ('<', '1.16')])]),
+            Suggestion('lib-core', '3.0', [('app', [('>=', '2.0')])]),
+        ])
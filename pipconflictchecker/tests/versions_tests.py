@@ -0,0 +1,80 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+from mock import patch
+from unittest import TestCase
+from pipconflictchecker.versions import get_legacy_key, LegacyVersion, parse_version, version_cache, VersionCache
+
+
+class VersionCacheTest(TestCase):
+    """
+    Tests the shared version cache
+    """
+    def test_parse_once(self):
+        cache = VersionCache()
+        parsed_version = cache.parse('1.10.0')
+
+        # Assert the second parse is served from the cache
+        self.assertIs(cache.parse('1.10.0'), parsed_version)
+        self.assertEqual(cache.get_stats(), {
+            'hits': 1,
+            'misses': 1,
+            'size': 1,
+            'maxsize': cache.maxsize,
+        })
+
+    def test_bounded(self):
+        cache = VersionCache(maxsize=2)
+        cache.parse('1.0')
+        cache.parse('2.0')
+        cache.parse('3.0')
+
+        # Assert the oldest version was evicted
+        self.assertEqual(list(cache.versions), ['2.0', '3.0'])
+
+    def test_clear(self):
+        cache = VersionCache()
+        cache.parse('1.0')
+        cache.parse('1.0')
+        cache.clear()
+
+        # Assert the versions and counters were reset
+        self.assertEqual(cache.get_stats()['size'], 0)
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 0)
+
+    @patch('pipconflictchecker.versions._parse_version')
+    def test_parse_version_uses_shared_cache(self, mock_parse_version):
+        version_cache.clear()
+        parse_version('2.0')
+        parse_version('2.0')
+
+        # Assert the version was parsed exactly once
+        mock_parse_version.assert_called_once_with('2.0')
+        version_cache.clear()
+
+
+class LegacyVersionTest(TestCase):
+    """
+    Tests the versions that are not PEP 440
+    """
+    def test_parse_version(self):
+        self.assertEqual(parse_version('2.0.*'), LegacyVersion('2.0.*'))
+        self.assertEqual(str(parse_version('1.0_custom')), '1.0_custom')
+        self.assertEqual(repr(LegacyVersion('2.0.*')), "<LegacyVersion('2.0.*')>")
+        self.assertNotIsInstance(parse_version('1.0'), LegacyVersion)
+
+    def test_ordering(self):
+        # Assert they sort before every PEP 440 version and among themselves like setuptools sorted them
+        versions = [
+            parse_version('0.1'), LegacyVersion('1.0-custom'), LegacyVersion('1.0dev-x'), LegacyVersion('1.0.x')
+        ]
+        self.assertEqual(sorted(versions), [versions[2], versions[1], versions[3], versions[0]])
+        self.assertLess(LegacyVersion('9.0-x'), parse_version('0.1'))
+        self.assertGreater(parse_version('0.1'), LegacyVersion('9.0-x'))
+        self.assertLess(LegacyVersion('1.0dev-x'), LegacyVersion('1.0-x'))
+        self.assertNotEqual(LegacyVersion('1.0-x'), parse_version('1.0'))
+        self.assertEqual(hash(LegacyVersion('1.0.0-x')), hash(LegacyVersion('1.0.0-x')))
+
+    def test_get_legacy_key(self):
+        self.assertEqual(get_legacy_key('1.0-x'), ('00000001', '*final-', '*x', '*final'))
+        self.assertEqual(get_legacy_key('1.0rc1-x'), ('00000001', '*c', '00000001', '*final-', '*x', '*final'))
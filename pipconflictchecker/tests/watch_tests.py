@@ -0,0 +1,199 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import os
+import shutil
+import tempfile
+from mock import Mock, patch
+from unittest import TestCase
+from pipconflictchecker.checker import Checker, main
+from pipconflictchecker.distributions import DistInfoSource, InstalledDistribution
+from pipconflictchecker.watch import get_stat_key, Watcher
+
+
+class WatcherTest(TestCase):
+    def setUp(self):
+        super(WatcherTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.checker = Checker()
+        self.watcher = Watcher(paths=[self.directory], checker=self.checker)
+
+    def install(self, project_name, version, requirements=()):
+        """
+        Writes a dist-info entry for the project, replacing any installed version
+        """
+        self.uninstall(project_name)
+        dist_info = os.path.join(self.directory, '{0}-{1}.dist-info'.format(project_name, version))
+        os.makedirs(dist_info)
+        with open(os.path.join(dist_info, 'METADATA'), 'w') as metadata_file:
+            metadata_file.write('Name: {0}\nVersion: {1}\n'.format(project_name, version))
+            for requirement in requirements:
+                metadata_file.write('Requires-Dist: {0}\n'.format(requirement))
+
+    def uninstall(self, project_name):
+        for entry in os.listdir(self.directory):
+            if entry.startswith('{0}-'.format(project_name)):
+                shutil.rmtree(os.path.join(self.directory, entry))
+
+    def get_edges_checked(self, function):
+        with patch.object(self.checker, 'check_edge', wraps=self.checker.check_edge) as mock_check_edge:
+            result = function()
+        edges = set((call[0][0], call[0][1]) for call in mock_check_edge.call_args_list)
+        return result, edges
+
+    def test_update(self):
+        self.install('one', '1.0')
+        self.install('two', '1.0', ['one>=2.0'])
+        self.install('three', '1.0', ['two>=1.0'])
+
+        # Assert the first update checks everything
+        (new_conflicts, resolved_conflicts), edges = self.get_edges_checked(self.watcher.update)
+        self.assertEqual([conflict.project_name for conflict in new_conflicts], ['one'])
+        self.assertEqual(resolved_conflicts, [])
+        self.assertEqual(edges, set([('one', 'two'), ('two', 'three')]))
+
+        # Assert nothing is checked when nothing changed
+        self.assertEqual(self.get_edges_checked(self.watcher.update), (([], []), set()))
+
+        # Upgrade one and assert only its edges were checked
+        self.install('one', '2.0')
+        (new_conflicts, resolved_conflicts), edges = self.get_edges_checked(self.watcher.update)
+        self.assertEqual(new_conflicts, [])
+        self.assertEqual([conflict.project_name for conflict in resolved_conflicts], ['one'])
+        self.assertEqual(edges, set([('one', 'two')]))
+        self.assertEqual(self.watcher.get_conflicts(), [])
+
+    def test_update_modified_requirements(self):
+        self.install('one', '1.0')
+        self.install('two', '1.0', ['one>=1.0'])
+        self.watcher.update()
+
+        # Change the requirements of two without changing its version
+        self.install('two', '1.0', ['one>=1.5'])
+        new_conflicts, resolved_conflicts = self.watcher.update()
+        self.assertEqual([conflict.readable_specs for conflict in new_conflicts], ['>=1.5'])
+
+        # Tighten them again and assert the changed conflict is reported again
+        self.install('two', '1.0', ['one>=1.7'])
+        new_conflicts, resolved_conflicts = self.watcher.update()
+        self.assertEqual([conflict.readable_specs for conflict in new_conflicts], ['>=1.7'])
+        self.assertEqual(len(self.watcher.get_conflicts()), 1)
+
+        # Assert an unchanged conflict is not reported again
+        self.install('two', '1.0', ['one>=1.7', 'three'])
+        self.assertEqual(self.watcher.update(), ([], []))
+        self.assertEqual(len(self.watcher.get_conflicts()), 1)
+
+    def test_update_removed(self):
+        self.install('one', '1.0')
+        self.install('two', '1.0', ['one>=2.0'])
+        self.watcher.update()
+
+        # Assert removing the requirer resolves its conflict
+        self.uninstall('two')
+        new_conflicts, resolved_conflicts = self.watcher.update()
+        self.assertEqual([conflict.required_project_name for conflict in resolved_conflicts], ['two'])
+        self.assertNotIn('two', self.watcher.snapshot.installed_versions)
+
+        # Assert removing a required project does not report a conflict
+        self.install('three', '1.0', ['one>=2.0'])
+        self.watcher.update()
+        self.uninstall('one')
+        new_conflicts, resolved_conflicts = self.watcher.update()
+        self.assertEqual(new_conflicts, [])
+        self.assertEqual([conflict.required_project_name for conflict in resolved_conflicts], ['three'])
+
+    def test_update_uninstalled_extra_requester(self):
+        # app requests the x extra of lib, which conflicts with the installed one
+        self.install('one', '1.0')
+        self.install('lib', '1.0', ['one>=2.0; extra == "x"'])
+        self.install('app', '1.0', ['lib[x]'])
+        new_conflicts, _ = self.watcher.update()
+        self.assertEqual([conflict.required_project_name for conflict in new_conflicts], ['lib'])
+
+        # Assert uninstalling app resolves the conflict of the extra only it requested
+        self.uninstall('app')
+        new_conflicts, resolved_conflicts = self.watcher.update()
+        self.assertEqual(new_conflicts, [])
+        self.assertEqual([conflict.required_project_name for conflict in resolved_conflicts], ['lib'])
+        self.assertEqual(self.watcher.get_conflicts(), [])
+
+    def test_get_stat_key_missing(self):
+        self.assertIsNone(get_stat_key(InstalledDistribution(os.path.join(self.directory, 'a-1.0.dist-info'))))
+        with patch('pipconflictchecker.watch.get_metadata_path', return_value=None):
+            self.assertIsNone(get_stat_key(InstalledDistribution(os.path.join(self.directory, 'a-1.0.dist-info'))))
+
+    def test_get_stat_key_no_metadata_file(self):
+        # Assert the entry itself is watched when it has no metadata file yet
+        egg_info = os.path.join(self.directory, 'a-1.0.dist-info')
+        os.makedirs(egg_info)
+        stat = os.stat(egg_info)
+        self.assertEqual(get_stat_key(InstalledDistribution(egg_info)), [stat.st_mtime, stat.st_size])
+
+    def test_run(self):
+        self.install('one', '1.0')
+        self.install('two', '1.0', ['one>=2.0'])
+        output = Mock()
+
+        def upgrade(interval):
+            self.install('one', '2.0')
+
+        # Assert the conflict was reported and then resolved
+        self.assertEqual(self.watcher.run(interval=5, output=output, iterations=2, sleep=upgrade), 0)
+        lines = [call[0][0] for call in output.call_args_list]
+        self.assertEqual(lines, [' + one(1.0) two(>=2.0)', ' ~ resolved: one(1.0) two(>=2.0)'])
+
+    def test_run_interrupted(self):
+        self.install('one', '1.0')
+        self.install('two', '1.0', ['one>=2.0'])
+
+        # Assert an interrupt stops watching and reports the remaining conflicts
+        sleep = Mock(side_effect=KeyboardInterrupt)
+        self.assertEqual(self.watcher.run(output=Mock(), sleep=sleep), 1)
+        sleep.assert_called_once_with(1.0)
+
+    def test_checker_source(self):
+        self.install('one', '1.0')
+        source = DistInfoSource([self.directory])
+        watcher = Watcher(checker=Checker(source=source))
+
+        # Assert the source of the checker is watched when no paths are given
+        self.assertIs(watcher.source, source)
+        watcher.update()
+        self.assertEqual(watcher.snapshot.installed_versions, {'one': '1.0'})
+
+    def test_metadata_cache(self):
+        self.install('one', '1.0')
+        self.install('two', '1.0', ['one>=2.0'])
+        cache_path = os.path.join(self.directory, 'cache', 'metadata.json')
+        checker = Checker(cache_path=cache_path)
+        Watcher(paths=[self.directory], checker=checker).update()
+
+        # Assert the metadata was read through the cache, which was saved
+        self.assertEqual(checker.metadata_cache.misses, 2)
+        self.assertTrue(os.path.isfile(cache_path))
+
+        # Assert another watcher reads the saved metadata and finds the same conflict
+        checker = Checker(cache_path=cache_path)
+        new_conflicts, _ = Watcher(paths=[self.directory], checker=checker).update()
+        self.assertEqual((checker.metadata_cache.hits, checker.metadata_cache.misses), (2, 0))
+        self.assertEqual([conflict.project_name for conflict in new_conflicts], ['one'])
+
+    @patch('pipconflictchecker.watch.Watcher')
+    def test_main_watch(self, mock_watcher):
+        mock_watcher.return_value.run.return_value = 1
+        self.assertEqual(main(['--watch', '--interval', '0.5']), 1)
+        mock_watcher.return_value.run.assert_called_once_with(interval=0.5)
+
+    @patch('pipconflictchecker.watch.Watcher')
+    def test_main_watch_source_and_cache(self, mock_watcher):
+        cache_path = os.path.join(self.directory, 'metadata.json')
+        main(['--watch', '--source', 'pkg_resources', '--cache', cache_path])
+
+        # Assert the watcher gets the checker with the source and the cache
+        checker = mock_watcher.call_args[1]['checker']
+        self.assertEqual(checker.source, 'pkg_resources')
+        self.assertEqual(checker.metadata_cache.path, cache_path)
+
+    def test_default_checker(self):
+        self.assertIsInstance(Watcher().checker, Checker)
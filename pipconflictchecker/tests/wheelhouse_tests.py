@@ -0,0 +1,259 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from mock import patch
+from unittest import TestCase
+from pipconflictchecker.checker import Checker, main
+from pipconflictchecker.wheelhouse import (
+    INDEX_FILE_NAME, INDEX_FORMAT_VERSION, parse_wheel_filename, read_wheel_metadata, WheelDistribution, Wheelhouse,
+    WheelhouseIndex, WheelhouseSource
+)
+
+
+class WheelhouseTestCase(TestCase):
+    def setUp(self):
+        super(WheelhouseTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write_wheel(self, name, version, requirements=(), filename=None):
+        """
+        Writes a wheel with a METADATA file declaring the requirements and returns its path
+        """
+        filename = filename or '{0}-{1}-py2.py3-none-any.whl'.format(name.replace('-', '_'), version)
+        path = os.path.join(self.directory, filename)
+        lines = ['Metadata-Version: 2.1', 'Name: {0}'.format(name), 'Version: {0}'.format(version)]
+        lines.extend('Requires-Dist: {0}'.format(requirement) for requirement in requirements)
+        lines.extend(['', 'Requires-Dist: not-a-header', ''])
+        metadata = '\n'.join(lines)
+        with zipfile.ZipFile(path, 'w') as wheel_file:
+            wheel_file.writestr('{0}/__init__.py'.format(name), '')
+            wheel_file.writestr('{0}-{1}.dist-info/METADATA'.format(name.replace('-', '_'), version), metadata)
+        return path
+
+
+class ParseWheelFilenameTest(TestCase):
+    def test_parse_wheel_filename(self):
+        self.assertEqual(parse_wheel_filename('six-1.16.0-py2.py3-none-any.whl'), ('six', '1.16.0'))
+        self.assertEqual(
+            parse_wheel_filename('foo_bar-2.0-1-cp38-cp38-manylinux1_x86_64.whl'),
+            ('foo_bar', '2.0')
+        )
+        self.assertIsNone(parse_wheel_filename('six-1.16.0.tar.gz'))
+        self.assertIsNone(parse_wheel_filename('six-1.16.0.whl'))
+
+
+class ReadWheelMetadataTest(WheelhouseTestCase):
+    def test_read_wheel_metadata(self):
+        path = self.write_wheel('test-project', '1.0', ['six (>=1.10)', 'pytest ; extra == "test"'])
+        name, version, requirements = read_wheel_metadata(path)
+
+        # Assert only the headers were read
+        self.assertEqual((name, version), ('test-project', '1.0'))
+        self.assertEqual([requirement.project_name for requirement in requirements], ['six', 'pytest'])
+        self.assertEqual(requirements[0].specs, [('>=', '1.10')])
+
+    def test_read_wheel_metadata_missing(self):
+        path = os.path.join(self.directory, 'empty-1.0-py3-none-any.whl')
+        with zipfile.ZipFile(path, 'w') as wheel_file:
+            wheel_file.writestr('empty/__init__.py', '')
+        self.assertEqual(read_wheel_metadata(path), (None, None, []))
+
+
+class WheelDistributionTest(WheelhouseTestCase):
+    def test_wheel_distribution(self):
+        dist = WheelDistribution(self.write_wheel('test-project', '1.0', ['six', 'pytest ; extra == "test"']))
+
+        # Assert the name and version come from the file name and the requirements from the wheel
+        self.assertEqual(dist.project_name, 'test-project')
+        self.assertEqual(dist.version, '1.0')
+        self.assertIsNone(dist._metadata)
+        self.assertEqual([requirement.project_name for requirement in dist.requires()], ['six'])
+        self.assertIs(dist.get_metadata(), dist.get_metadata())
+
+    def test_wheel_distribution_metadata(self):
+        metadata = ('test-project', '1.0', [])
+        dist = WheelDistribution(os.path.join(self.directory, 'test_project-1.0-py3-none-any.whl'), metadata)
+
+        # Assert metadata that was already read is used without opening the wheel
+        self.assertIs(dist.get_metadata(), metadata)
+
+
+class WheelhouseTest(WheelhouseTestCase):
+    def test_get_wheels(self):
+        six_path = self.write_wheel('six', '1.16.0')
+        foo_path = self.write_wheel('Foo.Bar', '2.0')
+        self.write_wheel('six', '1.16.0', filename='six-1.16.0-py3-none-win32.whl')
+        with open(os.path.join(self.directory, 'README.txt'), 'w') as readme_file:
+            readme_file.write('')
+
+        # Assert wheels are keyed on the project key and the first wheel of a version wins
+        wheelhouse = Wheelhouse(self.directory)
+        self.assertEqual(wheelhouse.get_wheels(), {
+            'six': {'1.16.0': six_path},
+            'foo-bar': {'2.0': foo_path},
+        })
+        self.assertIs(wheelhouse.get_wheels(), wheelhouse.get_wheels())
+
+    def test_get_wheels_missing_directory(self):
+        self.assertEqual(Wheelhouse(os.path.join(self.directory, 'missing')).get_wheels(), {})
+
+    def test_find_wheel(self):
+        path = self.write_wheel('six', '1.16.0')
+        self.write_wheel('six', '1.15.0')
+        wheelhouse = Wheelhouse(self.directory)
+
+        # Assert versions are matched exactly or parsed
+        self.assertEqual(wheelhouse.find_wheel('six', '1.16.0'), path)
+        self.assertEqual(wheelhouse.find_wheel('Six', '1.16'), path)
+        self.assertIsNone(wheelhouse.find_wheel('six', '1.17'))
+        self.assertIsNone(wheelhouse.find_wheel('seven', '1.0'))
+
+    def test_get_distribution(self):
+        path = self.write_wheel('six', '1.16.0')
+        wheelhouse = Wheelhouse(self.directory)
+        self.assertEqual(wheelhouse.get_distribution('six', '1.16.0').egg_info, path)
+        self.assertIsNone(wheelhouse.get_distribution('six', '1.0'))
+
+
+class WheelhouseIndexTest(WheelhouseTestCase):
+    def setUp(self):
+        super(WheelhouseIndexTest, self).setUp()
+        self.six_path = self.write_wheel('six', '1.16.0')
+        self.requests_path = self.write_wheel('requests', '2.0.0', ['six', 'idna (>=2.5) ; python_version >= "3"'])
+
+    def test_update_is_incremental(self):
+        index = WheelhouseIndex(self.directory).load().update(jobs=2)
+        self.assertEqual((index.hits, index.misses), (0, 2))
+        index.save()
+
+        # Assert the index was written inside the wheelhouse and a new index reads no unchanged wheels
+        self.assertTrue(os.path.isfile(os.path.join(self.directory, INDEX_FILE_NAME)))
+        with patch('pipconflictchecker.wheelhouse.read_wheel_metadata') as mock_read_wheel_metadata:
+            index = WheelhouseIndex(self.directory).load().update()
+            self.assertEqual(index.get_metadata(self.requests_path)[2][1].marker, 'python_version >= "3"')
+        self.assertFalse(mock_read_wheel_metadata.called)
+        self.assertEqual((index.hits, index.misses), (3, 0))
+
+        # Assert only an added wheel is read
+        idna_path = self.write_wheel('idna', '2.8')
+        index = WheelhouseIndex(self.directory).load().update()
+        self.assertEqual((index.hits, index.misses), (2, 1))
+        self.assertEqual(index.get_metadata(idna_path)[:2], ('idna', '2.8'))
+
+    def test_changed_wheel_is_read_again(self):
+        index = WheelhouseIndex(self.directory).load().update()
+        index.save()
+        self.write_wheel('six', '1.16.0', ['enum34'])
+
+        # Assert the changed wheel is read again
+        index = WheelhouseIndex(self.directory).load()
+        os.utime(self.six_path, (0, 0))
+        self.assertEqual([req.project_name for req in index.get_metadata(self.six_path)[2]], ['enum34'])
+        self.assertEqual(index.misses, 1)
+
+    def test_save(self):
+        index_path = os.path.join(self.directory, 'index', 'wheels.json')
+        os.makedirs(os.path.dirname(index_path))
+        index = WheelhouseIndex(self.directory, index_path)
+
+        # Assert nothing is written until something changed
+        index.save()
+        self.assertFalse(os.path.exists(index_path))
+
+        # Assert entries of removed wheels are dropped
+        index.update()
+        index.save()
+        os.remove(self.six_path)
+        index.dirty = True
+        index.save()
+        with open(index_path) as index_file:
+            data = json.load(index_file)
+        self.assertEqual(data['version'], INDEX_FORMAT_VERSION)
+        self.assertEqual(sorted(data['entries']), [os.path.basename(self.requests_path)])
+
+    def test_load_invalid(self):
+        index_path = os.path.join(self.directory, 'index.json')
+        for content in ('not json', json.dumps({'version': INDEX_FORMAT_VERSION + 1, 'entries': {'a': []}})):
+            with open(index_path, 'w') as index_file:
+                index_file.write(content)
+            self.assertEqual(WheelhouseIndex(self.directory, index_path).load().entries, {})
+
+    def test_get_distribution(self):
+        index = WheelhouseIndex(self.directory)
+        dist = index.get_distribution('requests', '2.0.0')
+        self.assertEqual(dist.egg_info, self.requests_path)
+        self.assertEqual(dist.get_metadata()[:2], ('requests', '2.0.0'))
+        self.assertIsNone(index.get_distribution('requests', '3.0'))
+
+    def test_bad_wheel(self):
+        bad_path = os.path.join(self.directory, 'six-2.0-py2.py3-none-any.whl')
+        with open(bad_path, 'w') as wheel_file:
+            wheel_file.write('not a zip')
+        index = WheelhouseIndex(self.directory).update()
+
+        # Assert the bad wheel was skipped and reported without being indexed
+        self.assertIsNone(index.get_metadata(bad_path))
+        self.assertNotIn(os.path.basename(bad_path), index.entries)
+        self.assertEqual(len(index.get_warnings()), 1)
+        self.assertTrue(index.get_warnings()[0].startswith('Skipped a wheel that cannot be read: {0}'.format(bad_path)))
+
+        # Assert the newest wheel that can be read is used instead
+        self.assertIsNone(index.get_distribution('six', '2.0'))
+        self.assertEqual(
+            [(dist.project_name, dist.version) for dist in index.get_latest_distributions()],
+            [('requests', '2.0.0'), ('six', '1.16.0')]
+        )
+        os.remove(self.six_path)
+        self.assertEqual(len(index.get_latest_distributions()), 1)
+
+    def test_get_latest_distributions(self):
+        self.write_wheel('six', '1.9.0')
+        self.write_wheel('six', '1.10.0')
+        distributions = WheelhouseIndex(self.directory).get_latest_distributions()
+        self.assertEqual(
+            [(dist.project_name, dist.version) for dist in distributions],
+            [('requests', '2.0.0'), ('six', '1.16.0')]
+        )
+
+
+class WheelhouseSourceTest(WheelhouseTestCase):
+    def setUp(self):
+        super(WheelhouseSourceTest, self).setUp()
+        self.write_wheel('requests', '2.0.0', ['six (>=1.10)'])
+        self.write_wheel('six', '1.9.0')
+
+    def test_checker(self):
+        source = WheelhouseSource(self.directory)
+        conflicts = Checker(source=source).get_conflicts()
+
+        # Assert the wheelhouse was checked as a working set and the index was saved
+        self.assertEqual(
+            [(conflict.project_name, conflict.required_project_name) for conflict in conflicts],
+            [('six', 'requests')]
+        )
+        self.assertTrue(os.path.isfile(source.index.index_path))
+        self.assertEqual(source.get_warnings(), [])
+
+    def test_get_warnings(self):
+        bad_path = os.path.join(self.directory, 'six-2.0-py2.py3-none-any.whl')
+        with open(bad_path, 'w') as wheel_file:
+            wheel_file.write('not a zip')
+        source = WheelhouseSource(self.directory)
+        self.assertEqual(len(source.get_distributions()), 2)
+        self.assertEqual(source.get_warnings(), source.index.get_warnings())
+        self.assertEqual(len(source.get_warnings()), 1)
+
+    def test_index_not_writable(self):
+        source = WheelhouseSource(self.directory, os.path.join(self.directory, 'missing', 'index.json'))
+        self.assertEqual(len(source.get_distributions()), 2)
+
+    @patch('pipconflictchecker.checker.print', create=True)
+    def test_main(self, mock_print):
+        index_path = os.path.join(self.directory, 'index.json')
+        self.assertEqual(main(['--wheelhouse', self.directory, '--wheelhouse-index', index_path]), 1)
+        self.assertTrue(os.path.isfile(index_path))
@@ -0,0 +1,164 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import re
+import timeit
+from collections import OrderedDict
+from functools import total_ordering
+
+# Default number of distinct version strings kept by the shared cache
+DEFAULT_MAXSIZE = 65536
+
+# Splits a version that is not PEP 440 into its numbers, words and separators
+LEGACY_COMPONENT_RE = re.compile(r'(\d+|[a-z]+|\.|-)')
+
+# Words of a version that is not PEP 440 that sort like another word
+LEGACY_REPLACEMENTS = {'pre': 'c', 'preview': 'c', '-': 'final-', 'rc': 'c', 'dev': '@'}
+
+
+def get_legacy_key(version):
+    """
+    Returns the sort key setuptools used for a version that is not PEP 440
+    """
+    parts = []
+    for part in LEGACY_COMPONENT_RE.split(version.lower()) + ['final']:
+        part = LEGACY_REPLACEMENTS.get(part, part)
+        if not part or part == '.':
+            continue
+        if part[:1] in '0123456789':
+            parts.append(part.zfill(8))
+            continue
+
+        # Drop the trailing zeros and final markers before a pre-release word
+        part = '*{0}'.format(part)
+        if part < '*final':
+            while parts and parts[-1] == '*final-':
+                parts.pop()
+        while parts and parts[-1] == '00000000':
+            parts.pop()
+        parts.append(part)
+    return tuple(parts)
+
+
+@total_ordering
+class LegacyVersion(object):
+    """
+    A version that is not PEP 440, such as 2.0.* or 1.0-custom. These sort before every PEP 440 version and among
+    themselves the way setuptools sorted them, so environments pkg_resources could check still can be.
+    """
+    def __init__(self, version):
+        super(LegacyVersion, self).__init__()
+        self.version = version
+        self.key = get_legacy_key(version)
+
+    def __str__(self):
+        return self.version
+
+    def __repr__(self):
+        return '<LegacyVersion({0!r})>'.format(self.version)
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        return isinstance(other, LegacyVersion) and self.key == other.key
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __lt__(self, other):
+        return not isinstance(other, LegacyVersion) or self.key < other.key
+
+
+def _parse_version(version):
+    """
+    Parses a version string, importing the parser on first use so importing the checker stays fast.
+    packaging is preferred and pkg_resources is only imported when nothing else is available. Versions the
+    parser rejects become a LegacyVersion.
+    """
+    global _parse_version
+    try:
+        from packaging.version import parse
+    except ImportError:  # pragma: no cover
+        try:
+            from pip._vendor.packaging.version import parse
+        except ImportError:
+            from pkg_resources import parse_version as parse
+
+    def _parse_version(version):
+        try:
+            return parse(version)
+        except ValueError:
+            # InvalidVersion of the strict parsers
+            return LegacyVersion(version)
+    return _parse_version(version)
+
+
+class VersionCache(object):
+    """
+    Bounded cache of parsed versions so each distinct version string is only parsed once
+    """
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        super(VersionCache, self).__init__()
+        self.maxsize = maxsize
+        self.versions = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        # Wall time spent actually parsing, which only happens on misses
+        self.parse_seconds = 0.0
+
+    def parse(self, version):
+        """
+        Returns the parsed version for a version string, parsing it on the first request only
+        """
+        try:
+            parsed_version = self.versions[version]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return parsed_version
+
+        # Parse the version and evict the oldest entry if we are full
+        self.misses += 1
+        start = timeit.default_timer()
+        parsed_version = _parse_version(version)
+        self.parse_seconds += timeit.default_timer() - start
+        if len(self.versions) >= self.maxsize:
+            self.versions.popitem(last=False)
+        self.versions[version] = parsed_version
+
+        # Return the parsed version
+        return parsed_version
+
+    def clear(self):
+        """
+        Empties the cache and resets the counters
+        """
+        self.versions.clear()
+        self.hits = 0
+        self.misses = 0
+        self.parse_seconds = 0.0
+
+    def get_stats(self):
+        """
+        Returns a dict of the cache counters
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.versions),
+            'maxsize': self.maxsize,
+        }
+
+
+# Process wide cache shared by everything that parses versions
+version_cache = VersionCache()
+
+
+def parse_version(version):
+    """
+    Parses a version string through the shared version cache
+    """
+    return version_cache.parse(version)
@@ -0,0 +1,115 @@
+from __future__ import absolute_import
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import time
+
+from pipconflictchecker.cache import get_metadata_path, get_stat_key as get_metadata_stat_key
+from pipconflictchecker.checker import Checker, format_conflict
+from pipconflictchecker.distributions import DistInfoSource
+from pipconflictchecker.graph import DependencyGraph
+
+# Seconds between polls of the paths
+DEFAULT_INTERVAL = 1.0
+
+
+def get_stat_key(dist):
+    """
+    Returns the mtime and size of every metadata file of a distribution, or of its entry when it has no metadata
+    file, or None if it cannot be read
+    """
+    if get_metadata_path(dist):
+        return get_metadata_stat_key(dist)
+    try:
+        stat = os.stat(dist.egg_info)
+    except OSError:
+        return None
+    return [stat.st_mtime, stat.st_size]
+
+
+class Watcher(object):
+    """
+    Class that keeps the dependency graph of an environment in memory and re-validates only the edges
+    touching distributions that were added, removed or modified since the last poll. The given paths are
+    watched, or else the source of the checker, and metadata is read through the checker's metadata cache.
+    """
+    def __init__(self, paths=None, checker=None):
+        super(Watcher, self).__init__()
+        self.checker = checker if checker is not None else Checker()
+        self.source = DistInfoSource(paths) if paths is not None else self.checker.get_source()
+        self.graph = DependencyGraph(self.checker)
+        self.snapshot = self.checker.snapshot = self.graph.snapshot
+
+        # egg_info path => (project_name, stat key) of every distribution read so far
+        self.entries = {}
+
+    @property
+    def conflicts(self):
+        return self.graph.conflicts
+
+    def scan(self):
+        """
+        Returns a dict of egg_info path => (distribution, stat key) for the distributions currently on the paths
+        """
+        return dict(
+            (dist.egg_info, (dist, get_stat_key(dist)))
+            for dist in self.source.get_distributions(self.checker.jobs)
+        )
+
+    def update(self):
+        """
+        Applies the changes since the last poll and returns the lists of new and resolved conflicts
+        """
+        current = self.scan()
+        changed = sorted(
+            egg_info for egg_info, (_, stat_key) in current.items()
+            if egg_info not in self.entries or self.entries[egg_info][1] != stat_key
+        )
+        removed = sorted(egg_info for egg_info in self.entries if egg_info not in current)
+
+        # Modified distributions are removed and added again
+        removed_project_names = [
+            self.entries.pop(egg_info)[0]
+            for egg_info in removed + [egg_info for egg_info in changed if egg_info in self.entries]
+        ]
+        added = []
+        reader = self.checker.get_reader()
+        for egg_info in changed:
+            dist, stat_key = current[egg_info]
+            dist_metadata = reader(dist)
+            self.entries[egg_info] = (dist_metadata[0], stat_key)
+            added.append(dist_metadata)
+        if changed:
+            self.checker.save_metadata_cache()
+
+        # Re-validate only the edges touching those distributions
+        return self.graph.check_delta(added=added, removed=removed_project_names)
+
+    def get_conflicts(self):
+        """
+        Returns the current conflicts
+        """
+        return self.graph.get_conflicts()
+
+    def run(self, interval=DEFAULT_INTERVAL, output=print, iterations=None, sleep=time.sleep):
+        """
+        Polls the paths until interrupted, writing every new and resolved conflict to output, and
+        returns 1 if conflicts remain at the end and 0 otherwise
+        """
+        iteration = 0
+        try:
+            while iterations is None or iteration < iterations:
+                if iteration:
+                    sleep(interval)
+                iteration += 1
+
+                new_conflicts, resolved_conflicts = self.update()
+                for conflict in new_conflicts:
+                    output(format_conflict(conflict, prefix=' + '))
+                for conflict in resolved_conflicts:
+                    output(format_conflict(conflict, prefix=' ~ resolved: '))
+        except KeyboardInterrupt:
+            pass
+
+        return 1 if self.conflicts else 0
@@ -0,0 +1,252 @@
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import io
+import os
+import re
+import threading
+import zipfile
+
+from pipconflictchecker.distributions import DistributionSource, InstalledDistribution
+from pipconflictchecker.metadata import dump_requirement, get_project_key, load_requirement, parse_metadata
+from pipconflictchecker.parallel import thread_map
+from pipconflictchecker.store import load_entries, save_entries, save_quietly
+from pipconflictchecker.versions import parse_version
+
+# Matches the name and version at the start of a wheel file name
+WHEEL_NAME_RE = re.compile(r'^(?P<name>[^-]+)-(?P<version>[^-]+)(?:-[^-]+)?-[^-]+-[^-]+-[^-]+\.whl$', re.IGNORECASE)
+
+# Matches the METADATA file of the dist-info directory at the top of a wheel
+WHEEL_METADATA_RE = re.compile(r'^[^/]+\.dist-info/METADATA$')
+
+# Bumped whenever the layout of the index entries changes
+INDEX_FORMAT_VERSION = 1
+
+# Name of the index file kept inside a wheelhouse when no other path is given
+INDEX_FILE_NAME = '.pipconflictchecker-index.json'
+
+
+def parse_wheel_filename(filename):
+    """
+    Returns the (name, version) of a wheel file name or None if it is not one
+    """
+    match = WHEEL_NAME_RE.match(filename)
+    if not match:
+        return None
+    return match.group('name'), match.group('version')
+
+
+def read_wheel_metadata(path):
+    """
+    Returns the name, version and requirements declared in the METADATA of a wheel, streaming only the
+    headers straight out of the archive
+    """
+    with zipfile.ZipFile(path) as wheel_file:
+        metadata_names = sorted(name for name in wheel_file.namelist() if WHEEL_METADATA_RE.match(name))
+        if not metadata_names:
+            return None, None, []
+        with wheel_file.open(metadata_names[0]) as metadata_file:
+            return parse_metadata(io.TextIOWrapper(metadata_file, encoding='utf-8', errors='replace'))
+
+
+class WheelDistribution(InstalledDistribution):
+    """
+    Class that reads a distribution from a wheel file without installing or extracting it
+    """
+    def __init__(self, egg_info, metadata=None):
+        super(WheelDistribution, self).__init__(egg_info)
+
+        # Metadata that was already read, such as from a wheelhouse index
+        self._metadata = metadata
+
+    def get_metadata(self):
+        """
+        Returns the name, version and requirements, reading the wheel only once
+        """
+        if self._metadata is None:
+            self._metadata = read_wheel_metadata(self.egg_info)
+        return self._metadata
+
+
+class Wheelhouse(object):
+    """
+    Class that finds the wheels for pinned versions in a local directory of wheels
+    """
+    def __init__(self, path):
+        super(Wheelhouse, self).__init__()
+        self.path = path
+        self._wheels = None
+
+    def get_wheels(self):
+        """
+        Returns a dict of project key => dict of version => wheel path, listing the directory only once
+        """
+        if self._wheels is None:
+            self._wheels = {}
+            try:
+                filenames = sorted(os.listdir(self.path))
+            except OSError:
+                filenames = []
+            for filename in filenames:
+                name_version = parse_wheel_filename(filename)
+                if name_version is None:
+                    continue
+                versions = self._wheels.setdefault(get_project_key(name_version[0]), {})
+                versions.setdefault(name_version[1], os.path.join(self.path, filename))
+        return self._wheels
+
+    def find_wheel(self, project_name, version):
+        """
+        Returns the path of a wheel for the project at the version or None if there is none. Versions are
+        compared parsed so a pin of 1.0 finds a 1.0.0 wheel.
+        """
+        versions = self.get_wheels().get(get_project_key(project_name), {})
+        if version in versions:
+            return versions[version]
+
+        parsed_version = parse_version(version)
+        for wheel_version in sorted(versions):
+            if parse_version(wheel_version) == parsed_version:
+                return versions[wheel_version]
+        return None
+
+    def get_distribution(self, project_name, version):
+        """
+        Returns the distribution for the project at the version or None if there is no wheel for it
+        """
+        path = self.find_wheel(project_name, version)
+        return WheelDistribution(path) if path is not None else None
+
+
+class WheelhouseIndex(Wheelhouse):
+    """
+    Wheelhouse that persists the name, version and requirements of every wheel it reads, keyed on the wheel
+    file name, mtime and size, so each wheel is only opened again when it changes
+    """
+    def __init__(self, path, index_path=None):
+        super(WheelhouseIndex, self).__init__(path)
+        self.index_path = index_path or os.path.join(path, INDEX_FILE_NAME)
+
+        # wheel file name => [mtime, size, name, version, requirements]
+        self.entries = {}
+
+        self.loaded = False
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+        # wheel path => error of every wheel that could not be read
+        self.bad_wheels = {}
+
+        # Wheels can be read from several threads at once
+        self.lock = threading.Lock()
+
+    def load(self):
+        """
+        Loads the index file once, starting empty if it is missing, unreadable or from another format version
+        """
+        if self.loaded:
+            return self
+        self.loaded = True
+        self.entries = load_entries(self.index_path, INDEX_FORMAT_VERSION)
+        return self
+
+    def save(self):
+        """
+        Writes the index file if anything changed, dropping entries whose wheel no longer exists
+        """
+        if not self.dirty:
+            return
+
+        self.entries = dict(
+            (filename, entry) for filename, entry in self.entries.items()
+            if os.path.exists(os.path.join(self.path, filename))
+        )
+        save_entries(self.index_path, INDEX_FORMAT_VERSION, self.entries)
+        self.dirty = False
+
+    def get_metadata(self, path):
+        """
+        Returns the name, version and requirements of a wheel, only opening it when it is not in the index
+        or changed since it was indexed, or None if it cannot be read
+        """
+        try:
+            stat = os.stat(path)
+            filename = os.path.basename(path)
+            entry = self.entries.get(filename)
+            if entry and entry[0] == stat.st_mtime and entry[1] == stat.st_size:
+                with self.lock:
+                    self.hits += 1
+                return entry[2], entry[3], [load_requirement(data) for data in entry[4]]
+
+            # Read the wheel and remember it
+            name, version, requirements = read_wheel_metadata(path)
+        except (IOError, OSError, KeyError, zipfile.BadZipfile) as error:
+            with self.lock:
+                self.bad_wheels[path] = error
+            return None
+        entry = [stat.st_mtime, stat.st_size, name, version, [dump_requirement(req) for req in requirements]]
+        with self.lock:
+            self.misses += 1
+            self.entries[filename] = entry
+            self.dirty = True
+        return name, version, requirements
+
+    def update(self, jobs=1):
+        """
+        Indexes every wheel that is new or changed with up to jobs threads and returns the index
+        """
+        paths = sorted(path for versions in self.get_wheels().values() for path in versions.values())
+        thread_map(self.get_metadata, paths, jobs)
+        return self
+
+    def get_distribution(self, project_name, version):
+        """
+        Returns the distribution for the project at the version with its metadata from the index, or None if
+        there is no wheel for it
+        """
+        path = self.find_wheel(project_name, version)
+        metadata = self.get_metadata(path) if path is not None else None
+        return WheelDistribution(path, metadata) if metadata is not None else None
+
+    def get_latest_distributions(self):
+        """
+        Returns the distribution of the newest version of every project in the wheelhouse, skipping the wheels
+        that cannot be read
+        """
+        distributions = []
+        for _, versions in sorted(self.get_wheels().items()):
+            for version in sorted(versions, key=parse_version, reverse=True):
+                metadata = self.get_metadata(versions[version])
+                if metadata is not None:
+                    distributions.append(WheelDistribution(versions[version], metadata))
+                    break
+        return distributions
+
+    def get_warnings(self, paths=None):
+        """
+        Returns a line for every wheel that could not be read, or only for those of the given paths
+        """
+        return [
+            'Skipped a wheel that cannot be read: {0} ({1})'.format(path, error)
+            for path, error in sorted(self.bad_wheels.items())
+            if paths is None or path in paths
+        ]
+
+
+class WheelhouseSource(DistributionSource):
+    """
+    Treats the newest version of every project in a wheelhouse as installed, reading the wheels through
+    a persistent index
+    """
+    def __init__(self, path, index_path=None):
+        super(WheelhouseSource, self).__init__()
+        self.index = WheelhouseIndex(path, index_path)
+
+    def get_distributions(self, jobs=1):
+        self.index.load().update(jobs)
+        save_quietly(self.index)
+        return self.index.get_latest_distributions()
+
+    def get_warnings(self):
+        return self.index.get_warnings()
@@ -35,11 +35,10 @@ setup(
     license='MIT',
     install_requires=[
         'pip>=1.4.1',
-        'nose>=1.3.0',
-        'mock>=1.0.1',
-        'flake8',
-        'coverage'
     ],
+    extras_require={
+        'batch': ['numpy'],
+    },
     packages=['pipconflictchecker'],
     entry_points={
         'console_scripts': [